@@ -14,6 +14,10 @@ sys.path.insert(0, str(project_root))
 PYTHON_SCRIPT_DIR = "src"
 PYTHON_MAIN_MODULE = "main"
 FLASK_APP_PATH = "src/web.py"
+MIGRATE_STORE_PATH = "src/utils/migrateStore.py"
+BENCH_PATH = "benchmarks/run.py"
+TUNE_PATH = "benchmarks/tune.py"
+EMBEDDER_PATH = "src/utils/embeddingDaemon.py"
 SCRIPTS_DIR = "scripts"
 
 def colored_print(message, color_code):
@@ -67,6 +71,40 @@ def run_web_mode():
     except Exception as e:
         print_error_msg(f"Web mode exited with an error: {e}")
 
+def run_migrate_store(args):
+    """Converts conversation stores to a local vector backend."""
+    print_boot_msg(" Migrating vector stores...")
+    try:
+        subprocess.run([sys.executable, MIGRATE_STORE_PATH, *args], check=True)
+    except subprocess.CalledProcessError as e:
+        print_error_msg(f"Migration exited with an error: {e}")
+
+def run_bench(args):
+    """Runs the benchmark suite and writes its JSON results."""
+    print_boot_msg(" Running benchmarks...")
+    try:
+        subprocess.run([sys.executable, BENCH_PATH, *args], check=True)
+    except subprocess.CalledProcessError as e:
+        print_error_msg(f"Benchmarks exited with an error: {e}")
+
+def run_tune(args):
+    """Measures llama.cpp thread and batch settings and optionally stores the fastest."""
+    print_boot_msg(" Tuning llama.cpp runtime settings...")
+    try:
+        subprocess.run([sys.executable, TUNE_PATH, *args], check=True)
+    except subprocess.CalledProcessError as e:
+        print_error_msg(f"Tuning exited with an error: {e}")
+
+def run_embedder(args):
+    """Serves the embedding model to terminal and web sessions."""
+    print_boot_msg(" Starting the embedding service...")
+    try:
+        subprocess.run([sys.executable, EMBEDDER_PATH, *args], check=True)
+    except KeyboardInterrupt:
+        print_ok_msg(" Embedding service stopped.")
+    except subprocess.CalledProcessError as e:
+        print_error_msg(f"Embedding service exited with an error: {e}")
+
 def display_menu_and_execute():
     """Displays the main menu and handles user input."""
     print("\033[38;5;160m___________________________________________________\033[0m")
@@ -114,8 +152,16 @@ if __name__ == "__main__":
             run_terminal_mode()
         elif command == "web":
             run_web_mode()
+        elif command == "migrate-store":
+            run_migrate_store(sys.argv[2:])
+        elif command == "bench":
+            run_bench(sys.argv[2:])
+        elif command == "tune":
+            run_tune(sys.argv[2:])
+        elif command == "embedder":
+            run_embedder(sys.argv[2:])
         else:
-            print_error_msg(f"Invalid command-line argument: '{command}'. Please use 'terminal' or 'web'.", exit_script=False)
+            print_error_msg(f"Invalid command-line argument: '{command}'. Please use 'terminal', 'web', 'migrate-store', 'bench', 'tune' or 'embedder'.", exit_script=False)
             display_menu_and_execute()
     else:
         # No arguments, show the menu
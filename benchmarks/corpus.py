@@ -0,0 +1,63 @@
+# benchmarks/corpus.py
+from pathlib import Path
+
+import numpy as np
+
+# A fixed vocabulary keeps corpora identical across runs and machines.
+VOCABULARY = (
+    "memory vector index query model token context answer search document chunk "
+    "embedding latency throughput cache batch thread store segment summary history "
+    "conversation question knowledge source metadata score ranking recall window "
+    "prompt sampling temperature layer weight matrix tensor graph node edge path "
+    "river mountain city harbor market garden library museum bridge station forest "
+    "engine signal sensor circuit battery motor voltage current frequency channel"
+).split()
+
+
+def _sentence(rng: np.random.Generator, words: int) -> str:
+    picked = rng.choice(VOCABULARY, size=words)
+    return " ".join(picked).capitalize() + "."
+
+
+def _paragraph(rng: np.random.Generator, sentences: int) -> str:
+    return " ".join(_sentence(rng, int(rng.integers(6, 18))) for _ in range(sentences))
+
+
+def synthesizeText(rng: np.random.Generator, approx_words: int, markdown: bool) -> str:
+    blocks, words = [], 0
+    section = 0
+    while words < approx_words:
+        if markdown and words % 400 < 60:
+            section += 1
+            blocks.append(f"## Section {section}: {' '.join(rng.choice(VOCABULARY, size=3))}")
+        paragraph = _paragraph(rng, int(rng.integers(3, 7)))
+        blocks.append(paragraph)
+        words += len(paragraph.split())
+    title = f"# {' '.join(rng.choice(VOCABULARY, size=4)).title()}\n\n" if markdown else ""
+    return title + "\n\n".join(blocks) + "\n"
+
+
+def generateCorpus(target_dir: Path, documents: int, words_per_document: int,
+                   formats: tuple = ("md", "txt"), seed: int = 0) -> list[Path]:
+    """Writes a reproducible corpus of markdown and text files."""
+    target_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(documents):
+        suffix = formats[i % len(formats)]
+        path = target_dir / f"doc-{i:05d}.{suffix}"
+        path.write_text(synthesizeText(rng, words_per_document, suffix == "md"), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def generateChunks(count: int, words_per_chunk: int = 60, seed: int = 1) -> list[str]:
+    """Chunk-sized texts for filling a store directly, without the splitter."""
+    rng = np.random.default_rng(seed)
+    return [_paragraph(rng, max(1, words_per_chunk // 12)) for _ in range(count)]
+
+
+def generateQueries(count: int, seed: int = 2) -> list[str]:
+    rng = np.random.default_rng(seed)
+    return [" ".join(rng.choice(VOCABULARY, size=int(rng.integers(3, 9)))) + "?"
+            for _ in range(count)]
@@ -0,0 +1,71 @@
+# benchmarks/fakes.py
+import hashlib
+import re
+import time
+from typing import Iterator
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+WORD_RE = re.compile(r"\w+")
+
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic stand-in for LlamaCppEmbeddings.
+
+    Each word adds a signed unit to a hashed dimension, so texts that share
+    words land close together and retrieval results stay meaningful.
+    """
+
+    def __init__(self, dimensions: int = 768):
+        self.dimensions = dimensions
+        self.model_path = f"fake-embeddings-{dimensions}"
+        self.client = None
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for word in WORD_RE.findall(text.lower()):
+            h = _seed(word)
+            vector[h % self.dimensions] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[_seed(text) % self.dimensions] = 1.0
+            norm = 1.0
+        return (vector / norm).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+class FakeLLM:
+    """Deterministic stand-in for LlamaCpp with an optional per-token delay."""
+
+    def __init__(self, token_delay_ms: float = 0.0, max_tokens: int = 64):
+        self.token_delay = token_delay_ms / 1000.0
+        self.max_tokens = max_tokens
+        self.model_path = "fake-llm"
+        self.client = None
+
+    def _tokens(self, prompt: str, max_tokens: int) -> list[str]:
+        rng = np.random.default_rng(_seed(prompt))
+        words = WORD_RE.findall(prompt) or ["aeon"]
+        return [f" {words[i]}" for i in rng.integers(0, len(words), size=max_tokens)]
+
+    def stream(self, prompt: str, max_tokens: int = None, **kwargs) -> Iterator[str]:
+        for token in self._tokens(prompt, max_tokens or self.max_tokens):
+            if self.token_delay:
+                time.sleep(self.token_delay)
+            yield token
+
+    def invoke(self, prompt: str, max_tokens: int = None, **kwargs) -> str:
+        return "".join(self.stream(prompt, max_tokens))
+
+    def get_num_tokens(self, text: str) -> int:
+        return len(WORD_RE.findall(text))
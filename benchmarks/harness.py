@@ -0,0 +1,72 @@
+# benchmarks/harness.py
+import os
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+import psutil
+
+RSS_SAMPLE_SECONDS = 0.01
+
+
+def percentiles(samples_ms: list[float]) -> dict:
+    if not samples_ms:
+        return {"count": 0}
+    values = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        "count": int(values.size),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p90_ms": round(float(np.percentile(values, 90)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def processPeakRss() -> int:
+    """Lifetime peak RSS of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """Peak RSS while a block runs, sampled from a background thread.
+
+    ru_maxrss only ever grows, so it cannot attribute a peak to one stage.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.process = psutil.Process(os.getpid())
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = self.process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, name="bench-rss", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+        return False
+
+    def report(self) -> dict:
+        return {"start_rss_bytes": self.start_rss, "peak_rss_bytes": self.peak_rss,
+                "peak_rss_delta_bytes": self.peak_rss - self.start_rss}
+
+
+def elapsedMs(start: float) -> float:
+    return (time.perf_counter() - start) * 1000.0
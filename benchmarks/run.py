@@ -0,0 +1,161 @@
+# benchmarks/run.py
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import psutil  # noqa: E402
+
+from src.config import OUTPUT_DIR, EMB_VECTOR_STORE, config  # noqa: E402
+from src.core.vectorStores import VECTOR_STORE_BACKENDS  # noqa: E402
+from src.libs.messages import (  # noqa: E402
+    print_info_message, print_success_message, print_error_message
+)
+from benchmarks.fakes import FakeEmbeddings, FakeLLM  # noqa: E402
+from benchmarks.harness import processPeakRss  # noqa: E402
+from benchmarks.suites import benchGeneration, benchIngestion, benchRetrieval  # noqa: E402
+
+SUITES = ("ingest", "retrieval", "generation")
+RESULTS_DIR = project_root / OUTPUT_DIR / "bench"
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=project_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _environment(args) -> dict:
+    return {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "ram_total_bytes": psutil.virtual_memory().total,
+        "fake_models": args.fake,
+        "backend": args.backend,
+        "emb_model": "fake" if args.fake else config["emb_config"]["model"],
+        "chunk_size": config["emb_config"]["chunk_size"],
+        "chunk_overlap": config["emb_config"]["chunk_overlap"],
+        "embedding_cache": "bypassed",
+        "arguments": vars(args),
+    }
+
+
+def _embeddings(args):
+    if args.fake:
+        return FakeEmbeddings(args.fake_dimensions)
+    from src.core.modelCache import getEmbeddings
+    # Seeded corpora repeat across runs; cached vectors would measure SQLite.
+    return getEmbeddings(config["emb_config"], cache=False)
+
+
+def _llms(args):
+    if args.fake:
+        yield FakeLLM(args.fake_token_ms, args.max_tokens)
+        return
+    from src.core.modelCache import getLlm
+    for model_path in args.llm_models or [config["llm_config"]["model"]]:
+        yield getLlm({**config["llm_config"], "model": model_path})
+
+
+def runBenchmarks(args) -> dict:
+    results = {"environment": _environment(args)}
+    store_config = {**EMB_VECTOR_STORE, "backend": args.backend, "background": False}
+    work_dir = Path(tempfile.mkdtemp(prefix="aeon-bench-"))
+    try:
+        embeddings = _embeddings(args) if {"ingest", "retrieval"} & set(args.suites) else None
+        if "ingest" in args.suites:
+            print_info_message(f"Ingestion: {args.documents} documents of ~{args.words} words...")
+            results["ingest"] = benchIngestion(
+                work_dir, embeddings, store_config, args.documents, args.words)
+            print_success_message(
+                f"Ingestion: {results['ingest']['chunks_per_sec']} chunks/s, "
+                f"{results['ingest']['documents_per_sec']} documents/s.")
+        if "retrieval" in args.suites:
+            print_info_message(f"Retrieval at store sizes {args.store_sizes}...")
+            results["retrieval"] = benchRetrieval(
+                work_dir, embeddings, store_config, args.store_sizes, args.queries, args.k)
+            for row in results["retrieval"]:
+                print_success_message(
+                    f"Retrieval @{row['store_size']}: p50 {row['total']['p50_ms']} ms, "
+                    f"p99 {row['total']['p99_ms']} ms.")
+        if "generation" in args.suites:
+            results["generation"] = []
+            for llm in _llms(args):
+                print_info_message(f"Generation: {getattr(llm, 'model_path', llm)}...")
+                row = benchGeneration(llm, args.gen_runs, args.max_tokens)
+                results["generation"].append(row)
+                print_success_message(
+                    f"Generation: TTFT p50 {row['ttft'].get('p50_ms')} ms, "
+                    f"{row['decode_tokens_per_sec_mean']} tokens/s.")
+    finally:
+        if args.keep_temp:
+            print_info_message(f"Benchmark files kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    results["process_peak_rss_bytes"] = processPeakRss()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="aeon.py bench",
+        description="Benchmark ingestion, retrieval and generation; results are written as JSON.")
+    parser.add_argument("--suites", type=lambda v: [s for s in v.split(",") if s],
+                        default=list(SUITES), help=f"Comma-separated subset of {', '.join(SUITES)}.")
+    parser.add_argument("--fake", action="store_true",
+                        help="Use the deterministic fake embedder and LLM; no model files needed.")
+    parser.add_argument("--backend", choices=VECTOR_STORE_BACKENDS,
+                        default=EMB_VECTOR_STORE.get("backend", "chroma"))
+    parser.add_argument("--documents", type=int, default=200, help="Synthetic documents to ingest.")
+    parser.add_argument("--words", type=int, default=800, help="Approximate words per document.")
+    parser.add_argument("--store-sizes", type=_int_list, default=[1000, 10000, 50000],
+                        help="Comma-separated chunk counts to measure retrieval at.")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per store size.")
+    parser.add_argument("--k", type=int, default=config["emb_config"].get("retrieval_k", 4))
+    parser.add_argument("--llm-models", nargs="*", default=None,
+                        help="GGUF files to benchmark; defaults to llm_config.model.")
+    parser.add_argument("--gen-runs", type=int, default=5)
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--fake-dimensions", type=int, default=768)
+    parser.add_argument("--fake-token-ms", type=float, default=0.0,
+                        help="Per-token delay of the fake LLM.")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Result file; defaults to data/output/bench/bench-<time>-<commit>.json.")
+    parser.add_argument("--keep-temp", action="store_true")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.suites) - set(SUITES)
+    if unknown:
+        print_error_message(f"Unknown suites: {', '.join(sorted(unknown))}.")
+        return 1
+
+    results = runBenchmarks(args)
+    output = args.output or RESULTS_DIR / (
+        f"bench-{time.strftime('%Y%m%d-%H%M%S')}-{results['environment']['commit']}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, default=str)
+    print_success_message(f"Benchmark results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
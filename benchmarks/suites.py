@@ -0,0 +1,155 @@
+# benchmarks/suites.py
+import contextlib
+import io
+import time
+import uuid
+from pathlib import Path
+
+from benchmarks.corpus import generateChunks, generateCorpus, generateQueries
+from benchmarks.harness import RssSampler, elapsedMs, percentiles
+from src.core.speculative import draftOf
+from src.core.vectorStores import openVectorStore
+from src.libs.splitter import buildTextSplitter
+from src.utils.ingestion import ingestDocuments
+
+ADD_BATCH_SIZE = 256
+WARMUP_QUERIES = 5
+GENERATION_PROMPT = (
+    "<|im_start|>system\nAnswer using only the CONTEXT.<|im_end|>\n"
+    "<|im_start|>user\nCONTEXT:{context}\nQUESTION:{question}\n<|im_end|>\n"
+    "<|im_start|>assistant\nRESPONSE:"
+)
+
+
+def _store_count(vectorstore) -> int:
+    return len(vectorstore.get(include=[])["ids"])
+
+
+def benchIngestion(work_dir: Path, embeddings, store_config: dict,
+                   documents: int, words_per_document: int) -> dict:
+    """Throughput of ingestDocuments on a fresh store, corpus loading included."""
+    corpus_dir = work_dir / "corpus"
+    paths = generateCorpus(corpus_dir, documents, words_per_document)
+    corpus_bytes = sum(p.stat().st_size for p in paths)
+    vectorstore = openVectorStore(work_dir / "ingest-store", embeddings, store_config)
+    text_splitter = buildTextSplitter(embeddings)
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        # ingestDocuments reports progress per chunk; keep it out of the timing.
+        with contextlib.redirect_stdout(io.StringIO()):
+            ingestDocuments(str(corpus_dir), vectorstore, text_splitter, embeddings)
+        seconds = elapsedMs(start) / 1000.0
+
+    chunks = _store_count(vectorstore)
+    return {
+        "documents": documents,
+        "corpus_bytes": corpus_bytes,
+        "chunks": chunks,
+        "seconds": round(seconds, 3),
+        "documents_per_sec": round(documents / seconds, 2) if seconds else None,
+        "chunks_per_sec": round(chunks / seconds, 2) if seconds else None,
+        "mb_per_sec": round(corpus_bytes / 1e6 / seconds, 3) if seconds else None,
+        **rss.report(),
+    }
+
+
+def benchRetrieval(work_dir: Path, embeddings, store_config: dict,
+                   store_sizes: list[int], queries: int, k: int) -> list[dict]:
+    """Query latency percentiles as one store grows through store_sizes."""
+    vectorstore = openVectorStore(work_dir / "retrieval-store", embeddings, store_config)
+    texts = generateChunks(max(store_sizes))
+    query_texts = generateQueries(queries + WARMUP_QUERIES)
+    results, filled = [], 0
+
+    for size in sorted(store_sizes):
+        with RssSampler() as rss:
+            start = time.perf_counter()
+            for batch_start in range(filled, size, ADD_BATCH_SIZE):
+                batch = texts[batch_start:min(batch_start + ADD_BATCH_SIZE, size)]
+                vectorstore.add_texts(batch, ids=[str(uuid.uuid4()) for _ in batch])
+            fill_ms = elapsedMs(start)
+            if hasattr(vectorstore, "wait_for_maintenance"):
+                vectorstore.wait_for_maintenance()
+            added, filled = size - filled, size
+
+            embed_ms, search_ms, total_ms = [], [], []
+            for i, query in enumerate(query_texts):
+                start = time.perf_counter()
+                vector = embeddings.embed_query(query)
+                embedded = time.perf_counter()
+                vectorstore.similarity_search_by_vector_with_relevance_scores(vector, k=k)
+                if i < WARMUP_QUERIES:
+                    continue
+                embed_ms.append((embedded - start) * 1000.0)
+                search_ms.append(elapsedMs(embedded))
+                total_ms.append(elapsedMs(start))
+
+        results.append({
+            "store_size": size,
+            "k": k,
+            "fill_rows_per_sec": round(added / (fill_ms / 1000.0), 2) if fill_ms else None,
+            "embed": percentiles(embed_ms),
+            "search": percentiles(search_ms),
+            "total": percentiles(total_ms),
+            **rss.report(),
+        })
+    return results
+
+
+def _token_counter(llm):
+    client = getattr(llm, "client", None)
+    if client is not None and hasattr(client, "tokenize"):
+        return lambda text: len(client.tokenize(text.encode("utf-8"), add_bos=False))
+    return llm.get_num_tokens
+
+
+def benchGeneration(llm, runs: int, max_tokens: int, context_words: int = 300) -> dict:
+    """Time to first token and decode speed for one model, streamed."""
+    count_tokens = _token_counter(llm)
+    draft = draftOf(llm)
+    drafted_before, accepted_before = draft.counts() if draft else (0, 0)
+    contexts = generateChunks(runs, words_per_chunk=context_words, seed=3)
+    questions = generateQueries(runs, seed=4)
+    ttft_ms, decode_tps, e2e_tps, output_tokens, prompt_tokens = [], [], [], [], []
+
+    with RssSampler() as rss:
+        for context, question in zip(contexts, questions):
+            prompt = GENERATION_PROMPT.format(context=context, question=question)
+            start = time.perf_counter()
+            first = None
+            pieces = []
+            for piece in llm.stream(prompt, max_tokens=max_tokens):
+                if first is None:
+                    first = time.perf_counter()
+                pieces.append(piece)
+            end = time.perf_counter()
+            if first is None:
+                continue
+            tokens = max(count_tokens("".join(pieces)), len(pieces))
+            ttft_ms.append((first - start) * 1000.0)
+            if tokens > 1 and end > first:
+                decode_tps.append((tokens - 1) / (end - first))
+            e2e_tps.append(tokens / (end - start))
+            output_tokens.append(tokens)
+            prompt_tokens.append(count_tokens(prompt))
+
+    def _mean(values):
+        return round(sum(values) / len(values), 2) if values else None
+
+    drafted, accepted = draft.counts() if draft else (0, 0)
+    drafted -= drafted_before
+    accepted -= accepted_before
+
+    return {
+        "model": str(getattr(llm, "model_path", "unknown")),
+        "runs": len(ttft_ms),
+        "max_tokens": max_tokens,
+        "prompt_tokens_mean": _mean(prompt_tokens),
+        "output_tokens_mean": _mean(output_tokens),
+        "ttft": percentiles(ttft_ms),
+        "decode_tokens_per_sec_mean": _mean(decode_tps),
+        "end_to_end_tokens_per_sec_mean": _mean(e2e_tps),
+        "draft_acceptance_rate": round(accepted / drafted, 3) if drafted else None,
+        **rss.report(),
+    }
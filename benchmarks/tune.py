@@ -0,0 +1,188 @@
+# benchmarks/tune.py
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import psutil  # noqa: E402
+
+from src.config import CONFIG_FILE, OUTPUT_DIR, config  # noqa: E402
+from src.core.llamaRuntime import runtimeParams, updateRuntimeBlock  # noqa: E402
+from src.libs.messages import (  # noqa: E402
+    print_info_message, print_success_message, print_error_message
+)
+from benchmarks.corpus import generateChunks  # noqa: E402
+
+TARGETS = ("llm", "emb")
+TUNED_KEYS = ("n_threads", "n_threads_batch", "n_batch", "n_ubatch")
+RESULTS_DIR = project_root / OUTPUT_DIR / "bench"
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _default_threads() -> list[int]:
+    logical = os.cpu_count() or 1
+    physical = psutil.cpu_count(logical=False) or logical
+    return sorted({max(1, physical // 4), max(1, physical // 2), physical, logical})
+
+
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def _load(model_path: str, n_ctx: int, params: dict, **extra):
+    from llama_cpp import Llama
+
+    return Llama(model_path=model_path, n_ctx=n_ctx, verbose=False, **params, **extra)
+
+
+def _base_params(model_config: dict, kind: str) -> dict:
+    """Configured settings other than the ones being tuned, e.g. use_mlock or the KV cache type."""
+    return {key: value for key, value in runtimeParams(model_config, kind).items()
+            if key not in TUNED_KEYS}
+
+
+def tuneLlm(llm_config: dict, threads: list[int], batches: list[int],
+            prompt_tokens: int, gen_tokens: int, repeats: int) -> tuple[dict, list[dict]]:
+    """Prompt evaluation speed for each (threads, n_batch) and decode speed for each thread count."""
+    base = _base_params(llm_config, "llm")
+    n_ctx = max(prompt_tokens + gen_tokens + 16, max(batches))
+    text = " ".join(generateChunks(prompt_tokens // 20 + 1, seed=5))
+    rows = []
+    for batch in batches:
+        for thread_count in threads:
+            llm = _load(llm_config["model"], n_ctx, {
+                **base, "n_threads": thread_count, "n_threads_batch": thread_count,
+                "n_batch": batch, "n_ubatch": batch})
+            tokens = llm.tokenize(text.encode("utf-8"))[:prompt_tokens]
+            prompt_seconds, decode_seconds = [], []
+            for _ in range(repeats):
+                llm.reset()
+                start = time.perf_counter()
+                llm.eval(tokens)
+                prompt_seconds.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                for _ in range(gen_tokens):
+                    llm.eval([llm.sample(top_k=1, temp=0.0)])
+                decode_seconds.append(time.perf_counter() - start)
+            del llm
+            row = {
+                "n_threads": thread_count, "n_batch": batch,
+                "prompt_tokens_per_sec": round(len(tokens) / _median(prompt_seconds), 2),
+                "decode_tokens_per_sec": round(gen_tokens / _median(decode_seconds), 2),
+            }
+            rows.append(row)
+            print_info_message(
+                f"LLM threads={thread_count} n_batch={batch}: prompt {row['prompt_tokens_per_sec']} tok/s, "
+                f"decode {row['decode_tokens_per_sec']} tok/s")
+
+    # Decoding does not depend on n_batch, so its thread count is chosen on its own.
+    decode_best = max(rows, key=lambda r: r["decode_tokens_per_sec"])
+    prompt_best = max(rows, key=lambda r: r["prompt_tokens_per_sec"])
+    best = {
+        "n_threads": decode_best["n_threads"],
+        "n_threads_batch": prompt_best["n_threads"],
+        "n_batch": prompt_best["n_batch"],
+        "n_ubatch": prompt_best["n_batch"],
+    }
+    return best, rows
+
+
+def tuneEmbeddings(emb_config: dict, threads: list[int], batches: list[int],
+                   texts: int, repeats: int) -> tuple[dict, list[dict]]:
+    """Chunks embedded per second for each (threads, n_batch)."""
+    base = _base_params(emb_config, "emb")
+    n_ctx = emb_config["n_ctx"]
+    # Roughly chunk_size tokens per text, as ingestion produces.
+    chunks = generateChunks(texts, words_per_chunk=int(emb_config["chunk_size"] * 0.7), seed=6)
+    rows = []
+    for batch in [b for b in batches if b <= n_ctx]:
+        for thread_count in threads:
+            model = _load(emb_config["model"], n_ctx, {
+                **base, "n_threads": thread_count, "n_threads_batch": thread_count,
+                "n_batch": batch, "n_ubatch": batch}, embedding=True)
+            model.embed(chunks[:2])
+            seconds = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                model.embed(chunks)
+                seconds.append(time.perf_counter() - start)
+            del model
+            row = {"n_threads": thread_count, "n_batch": batch,
+                   "chunks_per_sec": round(len(chunks) / _median(seconds), 2)}
+            rows.append(row)
+            print_info_message(
+                f"EMB threads={thread_count} n_batch={batch}: {row['chunks_per_sec']} chunks/s")
+    if not rows:
+        return {}, rows
+    best_row = max(rows, key=lambda r: r["chunks_per_sec"])
+    best = {"n_threads": best_row["n_threads"], "n_threads_batch": best_row["n_threads"],
+            "n_batch": best_row["n_batch"]}
+    return best, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="aeon.py tune",
+        description="Measure llama.cpp thread and batch settings on this host and pick the fastest.")
+    parser.add_argument("--target", type=lambda v: [t for t in v.split(",") if t],
+                        default=list(TARGETS), help="Comma-separated subset of llm, emb.")
+    parser.add_argument("--threads", type=_int_list, default=None,
+                        help="Thread counts to try; defaults to fractions of the physical cores.")
+    parser.add_argument("--llm-batches", type=_int_list, default=[64, 128, 256, 512, 1024])
+    parser.add_argument("--emb-batches", type=_int_list, default=[512, 1024, 2048])
+    parser.add_argument("--prompt-tokens", type=int, default=512)
+    parser.add_argument("--gen-tokens", type=int, default=32)
+    parser.add_argument("--texts", type=int, default=64, help="Chunks embedded per measurement.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--config", type=Path, default=project_root / CONFIG_FILE,
+                        help="config.yml to update with --write.")
+    parser.add_argument("--write", action="store_true",
+                        help="Store the fastest settings in the runtime blocks of --config.")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.target) - set(TARGETS)
+    if unknown:
+        print_error_message(f"Unknown targets: {', '.join(sorted(unknown))}.")
+        return 1
+    threads = args.threads or _default_threads()
+    print_info_message(f"Trying thread counts {threads}.")
+
+    results = {"started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpu_count": os.cpu_count(),
+               "physical_cores": psutil.cpu_count(logical=False), "threads": threads}
+    if "llm" in args.target:
+        results["llm"], results["llm_rows"] = tuneLlm(
+            config["llm_config"], threads, args.llm_batches,
+            args.prompt_tokens, args.gen_tokens, args.repeats)
+        print_success_message(f"Fastest LLM settings: {results['llm']}")
+    if "emb" in args.target:
+        results["emb"], results["emb_rows"] = tuneEmbeddings(
+            config["emb_config"], threads, args.emb_batches, args.texts, args.repeats)
+        print_success_message(f"Fastest embedding settings: {results['emb']}")
+
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    output = RESULTS_DIR / f"tune-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print_success_message(f"Tuning results written to {output}")
+
+    if args.write:
+        text = args.config.read_text(encoding="utf-8")
+        for target in TARGETS:
+            if results.get(target):
+                text = updateRuntimeBlock(text, f"{target}_config", results[target])
+        args.config.write_text(text, encoding="utf-8")
+        print_success_message(f"Runtime settings written to {args.config}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
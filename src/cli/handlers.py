@@ -1,5 +1,5 @@
 import sys
-import os
+import time
 from pathlib import Path
 from src.utils.ingestion import ingestDocuments
 from src.utils.webSearch import webSearch
@@ -12,7 +12,16 @@ from src.utils.load import loadBackup
 from src.utils.delete import deleteConversation
 from src.utils.rename import renameConversation
 
+from src.core.knowledgeBase import refreshKnowledgeBase, registerFolder, registeredFolders
+from src.core.dedup import addUniqueDocuments, runDeduplication, scheduleDeduplication
+from src.core.memoryTiers import llmLock, scheduleMemoryConsolidation, turnMetadata
+from src.core.ragSystem import refreshRagSystem
+from src.libs.catalog import get_catalog
+from src.libs.embeddingCache import embeddingCacheStats
+from src.libs.historyIndex import get_history_index
+from src.libs.metrics import CHAT_SECONDS, INGEST_SECONDS, get_metrics
 from src.libs.messages import print_error_message, print_info_message, print_aeon_message,print_source_message, print_think_message
+from src.cli.session import closeSession, reloadSession, restartSession
 from src.cli.termPrompts import startup_prompt
 from langchain.docstore.document import Document
 
@@ -31,9 +40,9 @@ def _initialize_session(memory_dir_path: Path):
         
     try:
         choice_int = int(user_choice)
-        conversation_dirs = [d for d in memory_dir_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
+        conversation_count = get_catalog().count()
 
-        if 1 <= choice_int <= len(conversation_dirs):
+        if 1 <= choice_int <= conversation_count:
             return openConversation(
                 str(choice_int),
                 memory_dir_path,
@@ -42,7 +51,7 @@ def _initialize_session(memory_dir_path: Path):
                 None,
                 None,
                 None)
-        elif (choice_int == len(conversation_dirs) + 1 or (not conversation_dirs and choice_int == 1)):
+        elif choice_int == conversation_count + 1:
             return newConversation(memory_dir_path)
         else:
             print_error_message("Invalid choice. Exiting.")
@@ -70,9 +79,11 @@ def _handle_ingest(user_input, session_vars):
 
 def _handle_zip(user_input, session_vars):
     print_info_message("Zipping memory folder contents...")
+    incremental = user_input[len("/zip"):].strip().lower() == "incremental"
     try:
         archive_path = zipBackup(
-            session_vars["current_memory_path"], session_vars["output_dir_path"])
+            session_vars["current_memory_path"], session_vars["output_dir_path"],
+            incremental=incremental)
         if archive_path:
             print_info_message(f"Conversation successfully zipped to {archive_path}.")
         else:
@@ -83,7 +94,7 @@ def _handle_zip(user_input, session_vars):
 
 def _handle_load(user_input, session_vars):
     zip_path = user_input[len("/load "):].strip()
-    loadBackup(zip_path, session_vars)
+    loadBackup(zip_path, session_vars["memory_dir_path"])
 
 
 def _handle_search(user_input, session_vars):
@@ -105,27 +116,101 @@ def _handle_search(user_input, session_vars):
     session_vars["current_chat_history"].append(
         {"user": user_input, "aeon": summarized_search_results})
 
-def _ingest_conversation_turn(user_input, aeon_output, vectorstore, text_splitter, llama_embeddings):
+def _handle_find(user_input, session_vars):
+    query = user_input[len("/find "):].strip()
+    page = 1
+    if " --page " in f" {query}":
+        query, _, page_str = query.rpartition("--page")
+        query = query.strip()
+        page = int(page_str) if page_str.strip().isdigit() else 1
+
+    if not query:
+        print_error_message("Usage: /find <TERM> [--page <NUMBER>]")
+        return
+
+    found = get_history_index().search(query, page=page)
+    if not found["results"]:
+        print_info_message(f"No past turns match '{query}'.")
+        return
+
+    print_info_message(f"{found['total']} turns match '{query}' (page {found['page']}):")
+    for hit in found["results"]:
+        print_source_message(f"{hit['conv_id']} {hit['timestamp'] or ''}")
+        print(f"  USER: {hit['user_snippet']}")
+        print(f"  AEON: {hit['aeon_snippet']}")
+
+
+def _handle_reindex(user_input, session_vars):
+    print_info_message("Rebuilding chat history index...")
+    get_history_index().rebuild()
+
+
+def _handle_dedup(user_input, session_vars):
+    vectorstore = session_vars.get("vectorstore")
+    if vectorstore is None:
+        print_error_message("RAG system not initialized. Type /restart to begin.")
+        return
+    print_info_message("Removing duplicate chunks from conversation memory...")
+    runDeduplication(vectorstore, Path(session_vars["current_memory_path"]) / "db")
+
+
+def _handle_watch(user_input, session_vars):
+    folder = user_input[len("/watch"):].strip()
+    if not folder:
+        folders = registeredFolders()
+        if not folders:
+            print_info_message("No registered folders. Usage: /watch <PATH>")
+        for registered in folders:
+            print_info_message(f"Watching '{registered}'")
+        return
+
+    embeddings = session_vars.get("llama_embeddings")
+    if embeddings is None:
+        print_error_message("RAG system not initialized. Type /restart to begin.")
+        return
+    root = registerFolder(folder)
+    if root is None:
+        return
+    print_info_message(f"Indexing '{root}' into the knowledge base...")
+    changed, _ = refreshKnowledgeBase(
+        embeddings, session_vars["text_splitter"], embeddings.model_path, {root})
+    if not changed:
+        print_info_message("No new files to index.")
+
+
+def _handle_profile(user_input, session_vars):
+    session_vars["profile_next"] = True
+    print_info_message("The next question will be profiled; the profile is written to data/output/profiles.")
+
+
+def _handle_stats(user_input, session_vars):
+    lines = get_metrics().summary_lines()
+    cache = embeddingCacheStats()
+    if cache is not None and (cache["hits"] or cache["misses"]):
+        lines.append(
+            f"embedding cache: hit rate {cache['hit_rate']:.1%} ({cache['hits']} hits, "
+            f"{cache['misses']} misses), {cache['entries']}/{cache['max_entries']} entries, "
+            f"{cache['vector_bytes'] / 1e6:.1f} MB")
+    if not lines:
+        print_info_message("No measurements yet.")
+        return
+    print_info_message("Session metrics (percentiles over recent samples):")
+    for line in lines:
+        print(f"  {line}")
+
+
+def _ingest_conversation_turn(user_input, aeon_output, vectorstore, text_splitter, llama_embeddings, turn=None):
     try:
         conversation_text = f"{user_input}\n\n{aeon_output}"
         
         conversation_document = Document(
             page_content=conversation_text,
-            metadata={"source": "memory"}
+            metadata=turnMetadata(turn)
         )
         
-        docs = text_splitter.split_documents([conversation_document])
-        success, failed = 0, 0
-        for i, chunk in enumerate(docs, start=1):
-            try:
-                vectorstore.add_documents([chunk])
-                success += 1
-               
-            except Exception as e:
-                failed += 1
-                print_error_message(f" Failed on chunk {i}: {e}")
-
-        
+        with INGEST_SECONDS.time(kind="memory"):
+            docs = text_splitter.split_documents([conversation_document])
+            addUniqueDocuments(vectorstore, docs)
     except Exception as e:
         print_error_message(f"Failed to ingest conversation turn: {e}")
 
@@ -134,17 +219,21 @@ def _handle_rag_chat(user_input, session_vars):
     if not rag_chain:
         print_error_message("RAG system not initialized. Type /restart to begin.")
         return
+    if refreshRagSystem(session_vars):
+        rag_chain = session_vars["rag_chain"]
 
     print_think_message("Thinking...")
+    started = time.perf_counter()
     
     try:
-        result = rag_chain.invoke(
-            user_input,
-            config={
-                "max_new_tokens": MAX_NEW_TOKEN,
-                "max_length": MAX_LENGTH
-            }
-        )
+        with llmLock(session_vars.get("llm_instance")):
+            result = rag_chain.invoke(
+                {"question": user_input, "history": session_vars.get("current_chat_history")},
+                config={
+                    "max_new_tokens": MAX_NEW_TOKEN,
+                    "max_length": MAX_LENGTH
+                }
+            )
 
         answer = result.get("answer", "No answer found.")
         context_docs = result.get("context", [])
@@ -161,7 +250,7 @@ def _handle_rag_chat(user_input, session_vars):
         formatted_sources = "\n".join(formatted_list) if formatted_list else "No sources found."
 
         
-        saveConversation(
+        turn = saveConversation(
             user_input,
             answer,
             formatted_sources,
@@ -177,9 +266,15 @@ def _handle_rag_chat(user_input, session_vars):
             answer,
             session_vars["vectorstore"],
             session_vars["text_splitter"],
-            session_vars["llama_embeddings"]
+            session_vars["llama_embeddings"],
+            turn
         )
-
+        scheduleDeduplication(session_vars["vectorstore"],
+                              Path(session_vars["current_memory_path"]) / "db")
+        scheduleMemoryConsolidation(session_vars["vectorstore"],
+                                    session_vars.get("llm_instance"),
+                                    session_vars["current_memory_path"])
+        CHAT_SECONDS.observe(time.perf_counter() - started)
 
         print_aeon_message(f"{answer}")
         print_source_message(f"\n{formatted_sources}")
@@ -191,17 +286,18 @@ def _handle_rag_chat(user_input, session_vars):
 
 def _handle_delete(user_input, session_vars):
     deleteConversation(user_input, session_vars)
-    python = sys.executable
-    os.execv(python, [python] + sys.argv)
 
 
 def _handle_rename(user_input, session_vars):
-    renameConversation(user_input, session_vars)
-    python = sys.executable
-    os.execv(python, [python] + sys.argv)
+    parts = user_input.split(" ", 2)
+    entry = get_catalog().resolve(parts[1].strip()) if len(parts) == 3 else None
+    is_active = bool(entry) and Path(session_vars["current_memory_path"]).name == entry["id"]
+    if is_active:
+        # The store must be idle before its folder moves.
+        closeSession(session_vars)
+    if renameConversation(user_input, session_vars["memory_dir_path"]) and is_active:
+        reloadSession(session_vars, parts[2].strip())
 
 
 def _handle_restart(session_vars):
-    print_info_message("Restarting AEON...")
-    python = sys.executable
-    os.execv(python, [python] + sys.argv)
+    return restartSession(session_vars, _initialize_session)
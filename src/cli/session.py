@@ -0,0 +1,81 @@
+# src/cli/session.py
+from pathlib import Path
+
+from src.core.modelCache import configMtime
+from src.core.ragSystem import ragSystem
+from src.libs.backgroundTasks import waitForBackgroundTasks
+from src.libs.catalog import get_catalog
+from src.libs.messages import print_info_message, print_success_message
+from src.utils.conversation import loadConversation
+
+# Keys that belong to the running CLI, not to the open conversation.
+PROCESS_KEYS = ("output_dir_path", "memory_dir_path", "plugin_manager", "user_input")
+CONVERSATION_KEYS = (
+    "rag_chain", "vectorstore", "text_splitter", "llama_embeddings", "llm_instance",
+    "current_memory_path", "conversation_filename", "current_chat_history",
+    "loaded_config", "config_mtime", "llm_config", "emb_config", "conv_id",
+    "user_prompt_string",
+)
+
+
+def promptString(conv_id: str) -> str:
+    return f"\033[92m[\033[93m{conv_id}\033[92m@\033[92m>>>>]:\033[0m "
+
+
+def closeSession(session_vars: dict):
+    """Lets the open conversation's store and background tasks finish writing.
+
+    Models are left alone; they live in the shared cache and the next
+    conversation will most likely reuse them.
+    """
+    vectorstore = session_vars.get("vectorstore")
+    if hasattr(vectorstore, "wait_for_maintenance"):
+        vectorstore.wait_for_maintenance()
+    current_memory_path = session_vars.get("current_memory_path")
+    if current_memory_path:
+        waitForBackgroundTasks(Path(current_memory_path) / "db")
+
+
+def switchSession(session_vars: dict, new_session_vars: dict):
+    """Replaces the open conversation with another one, in place."""
+    if new_session_vars.get("vectorstore") is not session_vars.get("vectorstore"):
+        closeSession(session_vars)
+    for key in CONVERSATION_KEYS:
+        if key not in new_session_vars:
+            session_vars.pop(key, None)
+    session_vars.update(new_session_vars)
+
+
+def reloadSession(session_vars: dict, conv_id: str):
+    """Rebuilds the open conversation after its folder moved, e.g. on /rename.
+
+    Only the vector store and paths are new; models come from the cache
+    and the chat history is read back from the renamed file.
+    """
+    closeSession(session_vars)
+    current_memory_path = Path(session_vars["memory_dir_path"]) / conv_id
+    conversation_filename = f"{conv_id}.json"
+    (rag_chain, vectorstore, text_splitter,
+     llama_embeddings, llm_instance) = ragSystem(
+        current_memory_path, current_memory_path / "db", is_new_session=False)
+    session_vars.update({
+        "rag_chain": rag_chain,
+        "vectorstore": vectorstore,
+        "text_splitter": text_splitter,
+        "llama_embeddings": llama_embeddings,
+        "llm_instance": llm_instance,
+        "current_memory_path": current_memory_path,
+        "conversation_filename": conversation_filename,
+        "current_chat_history": loadConversation(current_memory_path, conversation_filename),
+        "config_mtime": configMtime(current_memory_path),
+        "user_prompt_string": promptString(conv_id),
+    })
+    print_success_message(f"Conversation '{conv_id}' reloaded.")
+
+
+def restartSession(session_vars: dict, initialize) -> dict:
+    """The in-process /restart: resync the catalog and pick a conversation again."""
+    print_info_message("Restarting AEON...")
+    closeSession(session_vars)
+    get_catalog().sync()
+    return initialize(session_vars["memory_dir_path"])
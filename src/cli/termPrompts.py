@@ -1,6 +1,7 @@
 # src/cli/termPrompts.py
 from pathlib import Path
 
+from src.libs.catalog import get_catalog
 from src.libs.plugins import PluginManager
 from src.libs.messages import (
     print_info_message,
@@ -10,15 +11,18 @@ from src.libs.messages import (
     print_plugin_message
 )
 
+STARTUP_LIST_LIMIT = 20
+
 
 def startup_prompt(memory_dir_path: Path):
 
     print_info_message("Welcome to AEON.")
     print_info_message("Please choose an option:")
 
-    conversation_dirs = [d for d in memory_dir_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
+    catalog = get_catalog()
+    total = catalog.count()
 
-    if not conversation_dirs:
+    if not total:
         print_note_message("No previous conversations found.")
         print_command_message("[1] Start a new conversation or press <ENTER>.")
         print_note_message("To open a backup file, type: /load <PATH_TO_ZIP>")
@@ -28,16 +32,19 @@ def startup_prompt(memory_dir_path: Path):
         return choice
 
     print_info_message("Existing conversations:")
-    for i, conv_dir in enumerate(conversation_dirs):
-        print_chat_message(f"[{i + 1}] {conv_dir.name}")
+    offset = max(total - STARTUP_LIST_LIMIT, 0)
+    if offset:
+        print_note_message(f"{offset} older conversations hidden. Type their number to open them.")
+    for i, conv in enumerate(catalog.list(limit=STARTUP_LIST_LIMIT, offset=offset), start=offset + 1):
+        print_chat_message(f"[{i}] {conv['title']}")
 
-    print_command_message(f"[{len(conversation_dirs) + 1}] New conversation.")
+    print_command_message(f"[{total + 1}] New conversation.")
     print_note_message("To rename a conversation, type: /rename <NUMBER> <NEW_NAME>")
     print_note_message("To open a backup file, type: /load <PATH_TO_ZIP>")
 
     choice = input("\033[92m[OPTN]:\033[0m ").strip()
     if not choice:
-        return str(len(conversation_dirs) + 1)
+        return str(total + 1)
     return choice
 
 
@@ -48,15 +55,21 @@ def printAeonCmd(plugin_manager: PluginManager):
     print("Commands to use:")
     print_command_message("'/help' Show this screen.")
     print_command_message("'/new' Create a new chat.")
-    print_command_message("'/list' List all chats.")
+    print_command_message("'/list [PAGE]' List all chats.")
     print_command_message("'/open <NUMBER>' Open chat.")
     print_command_message("'/load <PATH>/<FILE>.zip' Load ZIP backup.")
     print_command_message("'/rename <NUMBER> <NEW_NAME>' Rename chat by ID.")
     print_command_message("'/delete <NUMBER>' Delete selected chat.")
-    print_command_message("'/zip' Backup contents to a timestamped zip file.")
+    print_command_message("'/zip [incremental]' Backup contents to a timestamped zip file.")
     print_command_message("'/ingest <PATH> | <PATH><.json, .txt, .md, .sqlite3>'"
                           "Add documents to RAG.")
     print_command_message("'/search' <TERM>' Make web search with DuckDuckGo")
+    print_command_message("'/find <TERM> [--page <NUMBER>]' Search the history of all chats.")
+    print_command_message("'/reindex' Rebuild the chat history search index.")
+    print_command_message("'/dedup' Remove duplicate chunks from this chat's memory.")
+    print_command_message("'/watch [PATH]' Add a folder to the knowledge base and keep it in sync.")
+    print_command_message("'/stats' Show latency, token and cache metrics for this session.")
+    print_command_message("'/profile' Profile the next question and write a flamegraph file.")
     print_command_message("'/restart' Restart AEON")
     print_command_message("'/quit', '/exit' or '/bye'"
                           "to end the chat.")
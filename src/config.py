@@ -11,9 +11,13 @@ from src.libs.messages import (
 
 MEMORY_DIR = "./data/chats"
 INPUT_DIR = "./data/input"
+KNOWLEDGE_BASE_DIR = "./data/kb"
 CHROMA_DB_DIR = "./data/chats"
 BACKUP_DIR = "./data/output/backup"
 OUTPUT_DIR = "./data/output"
+CATALOG_DB = "./data/catalog.sqlite3"
+HISTORY_INDEX_DB = "./data/history_index.sqlite3"
+EMBEDDING_CACHE_DB = "./data/embedding_cache.sqlite3"
 
 CONFIG_FILE = "./config.yml"
 
@@ -33,11 +37,20 @@ try:
 
     SYSTEM_PROMPT = config["llm_config"]["llm_prompt"]
     SYSTEM_RAG_PROMPT = config["llm_config"]["llm_rag_prompt"]
+    LLM_HISTORY_WINDOW = config["llm_config"].get("history_window") or {}
 
     EMB_MODEL = config["emb_config"]["model"]
     EMB_N_CTX = config["emb_config"]["n_ctx"]
     EMB_CHUNK_SIZE = config["emb_config"]["chunk_size"]
     EMB_CHUNK_OVERLAP = config["emb_config"]["chunk_overlap"]
+    EMB_CHUNK_SIZES = config["emb_config"].get("chunk_sizes", {})
+    EMB_VECTOR_STORE = config["emb_config"].get("vector_store", {"backend": "chroma"})
+    EMB_DEDUP = config["emb_config"].get("dedup", {})
+    EMB_LOADERS = config["emb_config"].get("loaders") or {}
+    EMB_CACHE = config["emb_config"].get("cache") or {}
+    MEMORY_CONFIG = config.get("memory_config") or {}
+    TRACING_CONFIG = config.get("tracing_config") or {}
+    WATCH_CONFIG = config.get("watch_config") or {}
     LOADED_PLUGINS = config["load_plugins"]
 except FileNotFoundError:
     print_error_message(f"Config file not found: {CONFIG_FILE}")
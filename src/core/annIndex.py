@@ -0,0 +1,183 @@
+# src/core/annIndex.py
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+ANN_INDEX_TYPES = ("flat", "ivf", "hnsw")
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+ASSIGN_BATCH_ROWS = 65536
+
+
+class FlatIndex:
+    """No index: every row is a candidate."""
+
+    kind = "flat"
+
+    def __init__(self, **params):
+        self.built_count = 0
+
+    def build(self, vectors: np.ndarray, alive: np.ndarray, directory: Path):
+        self.built_count = 0
+
+    def load(self, directory: Path, built_count: int):
+        self.built_count = 0
+
+    def candidates(self, query: np.ndarray, k: int) -> Optional[np.ndarray]:
+        return None
+
+
+class IVFIndex:
+    """Inverted file index: k-means centroids plus row lists per centroid.
+
+    nprobe lists are scanned per query; nlist defaults to sqrt(rows).
+    """
+
+    kind = "ivf"
+
+    def __init__(self, nprobe: int = 8, nlist: int = 0, **params):
+        self.nprobe = max(1, int(nprobe))
+        self.nlist = int(nlist or 0)
+        self.built_count = 0
+        self.centroids: Optional[np.ndarray] = None
+        self.rows: Optional[np.ndarray] = None
+        self.bounds: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        centroid_norms = (centroids ** 2).sum(axis=1)
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), ASSIGN_BATCH_ROWS):
+            batch = np.asarray(vectors[start:start + ASSIGN_BATCH_ROWS], dtype=np.float32)
+            scores = centroid_norms[None, :] - 2.0 * batch @ centroids.T
+            assignments[start:start + len(batch)] = scores.argmin(axis=1)
+        return assignments
+
+    def build(self, vectors: np.ndarray, alive: np.ndarray, directory: Path):
+        count = len(vectors)
+        nlist = min(self.nlist or max(1, int(np.sqrt(count))), count)
+        rng = np.random.default_rng(0)
+        sample_rows = rng.choice(count, size=min(count, nlist * KMEANS_SAMPLE_PER_LIST), replace=False)
+        sample = np.asarray(vectors[np.sort(sample_rows)], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignments = self._nearest(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            sizes = np.bincount(assignments, minlength=nlist)
+            filled = sizes > 0
+            centroids[filled] = sums[filled] / sizes[filled, None]
+
+        assignments = self._nearest(vectors, centroids)
+        live_rows = np.flatnonzero(alive[:count]).astype(np.int64)
+        live_assignments = assignments[live_rows]
+        order = np.argsort(live_assignments, kind='stable')
+        bounds = np.searchsorted(live_assignments[order], np.arange(nlist + 1)).astype(np.int64)
+
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "centroids.npy", centroids)
+        np.save(directory / "rows.npy", live_rows[order])
+        np.save(directory / "bounds.npy", bounds)
+        self.load(directory, count)
+
+    def load(self, directory: Path, built_count: int):
+        self.centroids = np.load(directory / "centroids.npy", mmap_mode='r')
+        self.rows = np.load(directory / "rows.npy", mmap_mode='r')
+        self.bounds = np.load(directory / "bounds.npy")
+        self.built_count = built_count
+
+    def candidates(self, query: np.ndarray, k: int) -> np.ndarray:
+        scores = (self.centroids ** 2).sum(axis=1) - 2.0 * self.centroids @ query
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(scores, nprobe - 1)[:nprobe]
+        return np.concatenate([self.rows[self.bounds[c]:self.bounds[c + 1]] for c in probes])
+
+
+class HNSWIndex:
+    """Hierarchical navigable small-world graph backed by hnswlib.
+
+    M is the graph degree, ef_construction the build-time beam width and
+    ef the query-time beam width; higher values trade speed for recall.
+    """
+
+    kind = "hnsw"
+    # Extra neighbours requested so rows deleted after the build can be dropped.
+    OVERFETCH = 2
+
+    def __init__(self, M: int = 16, ef_construction: int = 200, ef: int = 64, **params):
+        if hnswlib is None:
+            raise ImportError("The 'hnsw' index needs hnswlib. Install it with 'pip install hnswlib'.")
+        self.M = int(M)
+        self.ef_construction = int(ef_construction)
+        self.ef = int(ef)
+        self.built_count = 0
+        self._index = None
+
+    def build(self, vectors: np.ndarray, alive: np.ndarray, directory: Path):
+        count = len(vectors)
+        live_rows = np.flatnonzero(alive[:count])
+        index = hnswlib.Index(space='l2', dim=vectors.shape[1])
+        index.init_index(max_elements=max(len(live_rows), 1), M=self.M,
+                         ef_construction=self.ef_construction)
+        for start in range(0, len(live_rows), ASSIGN_BATCH_ROWS):
+            rows = live_rows[start:start + ASSIGN_BATCH_ROWS]
+            index.add_items(np.asarray(vectors[rows], dtype=np.float32), rows)
+        directory.mkdir(parents=True, exist_ok=True)
+        index.save_index(str(directory / "hnsw.bin"))
+        with open(directory / "hnsw.json", 'w', encoding='utf-8') as f:
+            json.dump({"dim": int(vectors.shape[1]), "M": self.M}, f)
+        index.set_ef(self.ef)
+        self._index = index
+        self.built_count = count
+
+    def load(self, directory: Path, built_count: int):
+        with open(directory / "hnsw.json", 'r', encoding='utf-8') as f:
+            dim = json.load(f)["dim"]
+        index = hnswlib.Index(space='l2', dim=dim)
+        index.load_index(str(directory / "hnsw.bin"))
+        index.set_ef(self.ef)
+        self._index = index
+        self.built_count = built_count
+
+    def candidates(self, query: np.ndarray, k: int) -> np.ndarray:
+        n = min(k * self.OVERFETCH, self._index.get_current_count())
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        self._index.set_ef(max(self.ef, n))
+        labels, _ = self._index.knn_query(query, k=n)
+        return labels[0].astype(np.int64)
+
+
+def createANNIndex(params: Optional[dict] = None):
+    """Returns an empty index of the configured type."""
+    params = dict(params or {})
+    kind = params.pop("type", "ivf")
+    if kind not in ANN_INDEX_TYPES:
+        raise ValueError(f"Unknown ANN index type '{kind}'. Use one of: {', '.join(ANN_INDEX_TYPES)}.")
+    if kind == "hnsw":
+        return HNSWIndex(**params)
+    if kind == "ivf":
+        return IVFIndex(**params)
+    return FlatIndex(**params)
+
+
+def removeIndexDir(directory: Path):
+    """Best effort: on Windows a reader may still map the old files."""
+    for path in directory.glob("*"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    try:
+        directory.rmdir()
+    except OSError:
+        pass
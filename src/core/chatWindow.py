@@ -0,0 +1,71 @@
+# src/core/chatWindow.py
+import re
+from typing import Callable, Optional
+
+from src.config import LLM_HISTORY_WINDOW
+
+WORD_RE = re.compile(r"\w+")
+# Words that say nothing about what a question is about.
+STOPWORDS = frozenset("""
+a an and are as at be but by can could did do does for from had has have how i if in is it its
+me my of on or so than that the their them then there these they this those to too was we were
+what when where which who whom why will with would you your about also more tell please explain
+again just like some any other only into over such very much many say said does did yes no ok
+""".split())
+
+
+def llmTokenCounter(llm) -> Callable[[str], int]:
+    """Counts tokens with the chat model's own vocabulary when it is loaded."""
+    client = getattr(llm, "client", None)
+    if client is not None and hasattr(client, "tokenize"):
+        return lambda text: len(client.tokenize(text.encode("utf-8"), add_bos=False))
+    return lambda text: len(WORD_RE.findall(text))
+
+
+def _turn_text(turn: dict) -> str:
+    aeon = turn.get("aeon", "")
+    # /search turns keep (summary, sources).
+    if isinstance(aeon, (list, tuple)):
+        aeon = aeon[0] if aeon else ""
+    return f"USER: {turn.get('user', '')}\nAEON: {aeon}"
+
+
+def buildHistoryWindow(history: list[dict], count_tokens: Callable[[str], int],
+                       max_turns: Optional[int] = None,
+                       max_tokens: Optional[int] = None) -> tuple[str, int]:
+    """Formats the newest turns, oldest first, within max_turns and max_tokens.
+
+    Returns the window text and how many turns it holds.
+    """
+    max_turns = LLM_HISTORY_WINDOW.get("max_turns", 6) if max_turns is None else max_turns
+    max_tokens = LLM_HISTORY_WINDOW.get("max_tokens", 1024) if max_tokens is None else max_tokens
+    if not history or not max_turns or not max_tokens:
+        return "", 0
+
+    selected, used_tokens = [], 0
+    for turn in reversed(history[-max_turns:]):
+        text = _turn_text(turn)
+        tokens = count_tokens(text) + 1
+        if used_tokens + tokens > max_tokens:
+            break
+        selected.append(text)
+        used_tokens += tokens
+    return "\n".join(reversed(selected)), len(selected)
+
+
+def windowCoversQuestion(question: str, window: str, turns_in_window: int, history_turns: int,
+                         enabled: Optional[bool] = None) -> bool:
+    """True when memory retrieval would only repeat what the window holds.
+
+    That is the case when the whole session history fits in the window, or
+    when every content word of the question already appears in it.
+    """
+    if enabled is None:
+        enabled = LLM_HISTORY_WINDOW.get("skip_memory_retrieval", True)
+    if not turns_in_window or not enabled:
+        return False
+    if turns_in_window >= history_turns:
+        return True
+    window_words = {w.lower() for w in WORD_RE.findall(window)}
+    question_words = {w.lower() for w in WORD_RE.findall(question)} - STOPWORDS
+    return question_words <= window_words
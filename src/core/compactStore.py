@@ -0,0 +1,420 @@
+# src/core/compactStore.py
+import json
+import os
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from src.core.mmapStore import AppendOnlyArray
+from src.libs.quantization import (
+    QUANTIZATION_MODES, truncate_dimensions, quantize_int8, int8_cosine,
+    quantize_binary, binary_cosine, squared_l2_from_cosine
+)
+
+META_FILE = "meta.json"
+DOCS_FILE = "docs.jsonl"
+CHANGES_FILE = "changes.jsonl"
+ARRAY_NAMES = ("norms", "codes", "scales", "floats")
+# A generation is rewritten once this share of its rows is dead, or its
+# change log reaches this share of docs.jsonl.
+COMPACT_RATIO = 0.2
+COMPACT_MIN_ROWS = 1000
+COMPACT_MIN_BYTES = 1 << 20
+
+
+class CompactVectorStore(VectorStore):
+    """Vector store that keeps int8 or 1-bit codes instead of float32 vectors.
+
+    Candidates are ranked on the codes, then the top k * rescore_multiplier
+    are re-scored with float16 copies of the (optionally Matryoshka-
+    truncated) vectors. Distances are reported as squared L2 on the original
+    norms so results merge cleanly with a Chroma store.
+
+    Writes append the new rows to the files of the current generation, and
+    deletes and metadata updates go to a change log; meta.json records how
+    much of each is committed. Once enough rows are dead the live ones are
+    rewritten into a new generation.
+    """
+
+    def __init__(self,
+                 persist_directory: str,
+                 embedding_function: Embeddings,
+                 quantization: str = "int8",
+                 dimensions: Optional[int] = None,
+                 rescore: bool = True,
+                 rescore_multiplier: int = 4):
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization '{quantization}'. "
+                             f"Use one of: {', '.join(QUANTIZATION_MODES)}.")
+        self.persist_directory = Path(persist_directory)
+        self._embedding_function = embedding_function
+        self.quantization = quantization
+        self.dimensions = dimensions
+        self.rescore = rescore
+        self.rescore_multiplier = max(1, int(rescore_multiplier))
+        self._lock = threading.RLock()
+
+        self._ids: list[str] = []
+        self._texts: list[str] = []
+        self._metadatas: list[dict] = []
+        self._codes: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._floats: Optional[np.ndarray] = None
+        self._stored_dimensions: Optional[int] = None
+        self._generation = 0
+        self._file_rows = 0
+        self._docs_size = 0
+        self._changes_size = 0
+        self._files: dict[str, AppendOnlyArray] = {}
+        self._legacy = False
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _segment_dir(self, generation: Optional[int] = None) -> Path:
+        return self.persist_directory / f"g{self._generation if generation is None else generation:06d}"
+
+    def _load(self):
+        meta_path = self.persist_directory / META_FILE
+        if not meta_path.is_file():
+            return
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta["quantization"] != self.quantization or meta.get("dimensions") != self.dimensions:
+            raise ValueError(
+                f"Store at '{self.persist_directory}' was built with "
+                f"quantization={meta['quantization']}, dimensions={meta.get('dimensions')}. "
+                "Migrate it before changing these settings.")
+        self._stored_dimensions = meta["stored_dimensions"]
+        if meta.get("version", 1) < 2:
+            self._load_legacy()
+            return
+
+        self._generation = meta["generation"]
+        self._file_rows = meta["rows"]
+        self._docs_size = meta["docs_size"]
+        self._changes_size = meta["changes_size"]
+        directory = self._segment_dir()
+        with open(directory / DOCS_FILE, 'rb') as f:
+            records = f.read(self._docs_size).splitlines()
+        for record in records:
+            row = json.loads(record)
+            self._ids.append(row["id"])
+            self._texts.append(row["text"])
+            self._metadatas.append(row["metadata"])
+        for name in ARRAY_NAMES:
+            path = directory / f"{name}.npy"
+            if path.is_file():
+                mapped = np.load(path, mmap_mode='r')
+                setattr(self, f"_{name}", np.array(mapped[:self._file_rows]))
+                self._files[name] = AppendOnlyArray(
+                    path, mapped.dtype, mapped.shape[1] if mapped.ndim == 2 else None)
+                self._files[name].open()
+                del mapped
+        self._replay_changes(directory)
+
+    def _replay_changes(self, directory: Path):
+        """Applies logged deletes and metadata updates to the rows loaded so far.
+
+        Each change applies to the rows that existed when it was logged, so
+        an id deleted and then added again keeps its new row.
+        """
+        changes_path = directory / CHANGES_FILE
+        if not self._changes_size or not changes_path.is_file():
+            return
+        with open(changes_path, 'rb') as f:
+            changes = f.read(self._changes_size).splitlines()
+        rows_of: dict[str, list[int]] = {}
+        for row, doc_id in enumerate(self._ids):
+            rows_of.setdefault(doc_id, []).append(row)
+        alive = np.ones(len(self._ids), dtype=bool)
+        for line in changes:
+            change = json.loads(line)
+            before = change["rows"]
+            for doc_id in change.get("delete", []):
+                for row in rows_of.get(doc_id, []):
+                    if row < before:
+                        alive[row] = False
+            for doc_id, metadata in change.get("metadata", {}).items():
+                for row in rows_of.get(doc_id, []):
+                    if row < before and alive[row]:
+                        self._metadatas[row] = metadata
+        if not alive.all():
+            self._keep_rows(alive)
+
+    def _load_legacy(self):
+        """Stores written before version 2 kept whole arrays in the store folder."""
+        with open(self.persist_directory / DOCS_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                row = json.loads(line)
+                self._ids.append(row["id"])
+                self._texts.append(row["text"])
+                self._metadatas.append(row["metadata"])
+        self._norms = np.load(self.persist_directory / "norms.npy")
+        if self.quantization != "none":
+            self._codes = np.load(self.persist_directory / "codes.npy")
+        if self.quantization == "int8":
+            self._scales = np.load(self.persist_directory / "scales.npy")
+        floats_path = self.persist_directory / "floats.npy"
+        if floats_path.is_file():
+            self._floats = np.load(floats_path)
+        # Rewritten in the current layout on the first write.
+        self._legacy = True
+
+    def _write_meta(self):
+        meta = {
+            "version": 2,
+            "quantization": self.quantization,
+            "dimensions": self.dimensions,
+            "stored_dimensions": self._stored_dimensions,
+            "rescore": self._floats is not None,
+            "count": len(self._ids),
+            "generation": self._generation,
+            "rows": self._file_rows,
+            "docs_size": self._docs_size,
+            "changes_size": self._changes_size,
+        }
+        meta_tmp = self.persist_directory / f".{META_FILE}.tmp"
+        with open(meta_tmp, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(meta_tmp, self.persist_directory / META_FILE)
+
+    @staticmethod
+    def _append_bytes(path: Path, committed_size: int, data: bytes) -> int:
+        """Appends after the committed size, dropping any uncommitted tail."""
+        with open(path, 'r+b' if path.is_file() else 'w+b') as f:
+            f.truncate(committed_size)
+            f.seek(committed_size)
+            f.write(data)
+        return committed_size + len(data)
+
+    @staticmethod
+    def _record(doc_id: str, text: str, metadata: dict) -> bytes:
+        return json.dumps({"id": doc_id, "text": text, "metadata": metadata},
+                          ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _array_file(self, name: str, rows: np.ndarray) -> AppendOnlyArray:
+        if name not in self._files:
+            self._files[name] = AppendOnlyArray(
+                self._segment_dir() / f"{name}.npy", rows.dtype, rows.shape[1] if rows.ndim == 2 else None)
+        return self._files[name]
+
+    def _append_rows(self, arrays: dict, records: list[bytes]):
+        """Writes only the new rows; meta.json is replaced last and commits them."""
+        if self._legacy:
+            self._rewrite()
+            return
+        directory = self._segment_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        self._docs_size = self._append_bytes(directory / DOCS_FILE, self._docs_size, b"".join(records))
+        for name, rows in arrays.items():
+            self._array_file(name, rows).append(rows, self._file_rows)
+        self._file_rows += len(records)
+        self._write_meta()
+
+    def _append_change(self, change: dict):
+        if self._legacy:
+            self._rewrite()
+            return
+        directory = self._segment_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        line = json.dumps({"rows": self._file_rows, **change}, ensure_ascii=False).encode("utf-8") + b"\n"
+        self._changes_size = self._append_bytes(directory / CHANGES_FILE, self._changes_size, line)
+        self._write_meta()
+
+        dead = self._file_rows - len(self._ids)
+        if (dead >= max(COMPACT_MIN_ROWS, COMPACT_RATIO * self._file_rows)
+                or self._changes_size >= max(COMPACT_MIN_BYTES, COMPACT_RATIO * self._docs_size)):
+            self._rewrite()
+
+    def _rewrite(self):
+        """Writes the live rows to a new generation and drops the old files."""
+        old_dir = self._segment_dir()
+        self._generation += 1
+        directory = self._segment_dir()
+        if directory.exists():
+            shutil.rmtree(directory)
+        directory.mkdir(parents=True)
+        self._files = {}
+        for name in ARRAY_NAMES:
+            array = getattr(self, f"_{name}")
+            if array is not None and len(array):
+                self._array_file(name, array).append(array, 0)
+        with open(directory / DOCS_FILE, 'wb') as f:
+            for doc_id, text, metadata in zip(self._ids, self._texts, self._metadatas):
+                f.write(self._record(doc_id, text, metadata))
+        self._docs_size = (directory / DOCS_FILE).stat().st_size
+        self._file_rows = len(self._ids)
+        self._changes_size = 0
+        self._write_meta()
+
+        if self._legacy:
+            for name in ARRAY_NAMES:
+                (self.persist_directory / f"{name}.npy").unlink(missing_ok=True)
+            (self.persist_directory / DOCS_FILE).unlink(missing_ok=True)
+            self._legacy = False
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    @staticmethod
+    def _append(existing: Optional[np.ndarray], new: np.ndarray) -> np.ndarray:
+        return new if existing is None or len(existing) == 0 else np.concatenate([existing, new])
+
+    def add_vectors(self, vectors: np.ndarray, texts: list[str],
+                    metadatas: Optional[list[dict]] = None,
+                    ids: Optional[list[str]] = None) -> list[str]:
+        """Adds pre-computed embeddings; used by add_texts and the migration tool."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+
+        units = truncate_dimensions(vectors, self.dimensions)
+        with self._lock:
+            if self._stored_dimensions is None:
+                self._stored_dimensions = units.shape[1]
+            elif units.shape[1] != self._stored_dimensions:
+                raise ValueError(f"Expected {self._stored_dimensions}-d vectors, got {units.shape[1]}.")
+
+            rows = {"norms": np.linalg.norm(vectors, axis=1).astype(np.float32)}
+            if self.quantization == "int8":
+                rows["codes"], rows["scales"] = quantize_int8(units)
+            elif self.quantization == "binary":
+                rows["codes"] = quantize_binary(units)
+            if self.rescore or self.quantization == "none":
+                rows["floats"] = units.astype(np.float16)
+            for name, array in rows.items():
+                setattr(self, f"_{name}", self._append(getattr(self, f"_{name}"), array))
+
+            self._ids.extend(ids)
+            self._texts.extend(texts)
+            self._metadatas.extend(metadatas)
+            self.persist_directory.mkdir(parents=True, exist_ok=True)
+            self._append_rows(rows, [self._record(doc_id, text, metadata)
+                                     for doc_id, text, metadata in zip(ids, texts, metadatas)])
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[list[dict]] = None,
+                  ids: Optional[list[str]] = None, **kwargs: Any) -> list[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self._embedding_function.embed_documents(texts)
+        return self.add_vectors(np.asarray(vectors), texts, metadatas, ids)
+
+    def _keep_rows(self, keep: np.ndarray):
+        self._ids = [v for v, k in zip(self._ids, keep) if k]
+        self._texts = [v for v, k in zip(self._texts, keep) if k]
+        self._metadatas = [v for v, k in zip(self._metadatas, keep) if k]
+        self._norms = self._norms[keep]
+        for name in ("_codes", "_scales", "_floats"):
+            array = getattr(self, name)
+            if array is not None:
+                setattr(self, name, array[keep])
+
+    def delete(self, ids: Optional[list[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        drop = set(ids)
+        with self._lock:
+            keep = np.array([doc_id not in drop for doc_id in self._ids], dtype=bool)
+            if keep.all():
+                return False
+            self._keep_rows(keep)
+            self._append_change({"delete": sorted(drop)})
+        return True
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict]):
+        with self._lock:
+            positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+            updated = {}
+            for doc_id, metadata in zip(ids, metadatas):
+                if doc_id in positions:
+                    self._metadatas[positions[doc_id]] = metadata
+                    updated[doc_id] = metadata
+            if updated:
+                self._append_change({"metadata": updated})
+
+    def get(self, ids: Optional[list[str]] = None, include: Optional[list[str]] = None) -> dict:
+        """Chroma-style bulk read used by maintenance tools."""
+        include = include or ["documents", "metadatas"]
+        with self._lock:
+            wanted = set(ids) if ids is not None else None
+            positions = [i for i, doc_id in enumerate(self._ids)
+                         if wanted is None or doc_id in wanted]
+            result = {"ids": [self._ids[i] for i in positions]}
+            if "documents" in include:
+                result["documents"] = [self._texts[i] for i in positions]
+            if "metadatas" in include:
+                result["metadatas"] = [self._metadatas[i] for i in positions]
+            if "embeddings" in include and self._floats is not None:
+                result["embeddings"] = self._floats[positions].astype(np.float32)
+        return result
+
+    def _cosine(self, query_unit: np.ndarray) -> np.ndarray:
+        if self.quantization == "int8":
+            return int8_cosine(query_unit, self._codes, self._scales)
+        if self.quantization == "binary":
+            return binary_cosine(query_unit, self._codes, self._stored_dimensions)
+        return self._floats.astype(np.float32) @ query_unit
+
+    def similarity_search_by_vector_with_relevance_scores(
+            self, embedding: list[float], k: int = 4, **kwargs: Any) -> list[tuple[Document, float]]:
+        with self._lock:
+            if not self._ids:
+                return []
+            query = np.asarray(embedding, dtype=np.float32)
+            query_norm = float(np.linalg.norm(query))
+            query_unit = truncate_dimensions(query, self.dimensions)
+
+            cosine = self._cosine(query_unit)
+            n_candidates = min(len(cosine), k * self.rescore_multiplier)
+            candidates = np.argpartition(-cosine, n_candidates - 1)[:n_candidates]
+            if self._floats is not None and self.quantization != "none":
+                cosine_candidates = self._floats[candidates].astype(np.float32) @ query_unit
+            else:
+                cosine_candidates = cosine[candidates]
+
+            distances = squared_l2_from_cosine(cosine_candidates, query_norm, self._norms[candidates])
+            order = np.argsort(distances)[:k]
+            return [
+                (Document(page_content=self._texts[candidates[i]],
+                          metadata=dict(self._metadatas[candidates[i]]),
+                          id=self._ids[candidates[i]]),
+                 float(distances[i]))
+                for i in order
+            ]
+
+    def similarity_search_with_score(self, query: str, k: int = 4,
+                                     **kwargs: Any) -> list[tuple[Document, float]]:
+        embedding = self._embedding_function.embed_query(query)
+        return self.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4,
+                                    **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_relevance_scores(embedding, k=k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    @classmethod
+    def from_texts(cls, texts: list[str], embedding: Embeddings,
+                   metadatas: Optional[list[dict]] = None,
+                   persist_directory: str = "", **kwargs: Any) -> "CompactVectorStore":
+        store = cls(persist_directory=persist_directory, embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas)
+        return store
@@ -0,0 +1,292 @@
+# src/core/dedup.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.config import EMB_DEDUP
+from src.core.memoryTiers import turnGuids
+from src.core.vectorStores import addVectors, updateMetadata
+from src.libs.backgroundTasks import startBackgroundTask
+from src.libs.messages import print_error_message, print_info_message, print_success_message
+
+STATE_FILE = "dedup.json"
+# Stored neighbours compared with each chunk in a full pass.
+NEAR_NEIGHBOURS = 8
+# Chroma rejects very large batches in a single call.
+WRITE_BATCH_SIZE = 1000
+WHITESPACE_RE = re.compile(r"\s+")
+
+_running: set[str] = set()
+_running_lock = threading.Lock()
+
+
+def _near_threshold(near_threshold: Optional[float]) -> float:
+    if near_threshold is None:
+        near_threshold = EMB_DEDUP.get("near_threshold", 0)
+    return float(near_threshold or 0)
+
+
+def contentHash(text: str) -> str:
+    """Hash of the text with case and whitespace differences removed."""
+    normalized = WHITESPACE_RE.sub(" ", text).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def contentId(text: str) -> str:
+    return f"c-{contentHash(text)}"
+
+
+def _cosine(a: np.ndarray, b: np.ndarray) -> float:
+    """Cosine on the shared leading dimensions, so Matryoshka-truncated
+    vectors from a compact store compare against full query vectors."""
+    n = min(len(a), len(b))
+    a, b = np.asarray(a[:n], dtype=np.float32), np.asarray(b[:n], dtype=np.float32)
+    return float(a @ b / max(np.linalg.norm(a) * np.linalg.norm(b), 1e-12))
+
+
+def _merge_metadata(keep: dict, extra: dict) -> dict:
+    """Folds a duplicate's metadata into the kept chunk.
+
+    Chroma only stores scalar metadata, so sources and the turns the chunk
+    stands for are joined with '|'.
+    """
+    merged = dict(keep)
+    sources = set(str(keep.get("sources") or keep.get("source") or "").split("|"))
+    sources |= set(str(extra.get("sources") or extra.get("source") or "").split("|"))
+    sources.discard("")
+    if sources:
+        merged["sources"] = "|".join(sorted(sources))
+    merged["duplicates"] = int(keep.get("duplicates", 0)) + 1 + int(extra.get("duplicates", 0))
+    # Consolidating one turn must not delete the only chunk of another.
+    guids = turnGuids(keep) | turnGuids(extra)
+    if guids:
+        merged["turn_guids"] = "|".join(sorted(guids))
+    for key, value in extra.items():
+        merged.setdefault(key, value)
+    return merged
+
+
+def _update_metadatas(vectorstore, ids: list[str], metadatas: list[dict]):
+    if not ids:
+        return
+    for start in range(0, len(ids), WRITE_BATCH_SIZE):
+        batch_ids = ids[start:start + WRITE_BATCH_SIZE]
+        updateMetadata(vectorstore, batch_ids, metadatas[start:start + WRITE_BATCH_SIZE])
+
+
+def addUniqueDocuments(vectorstore, documents: list[Document],
+                       near_threshold: Optional[float] = None) -> tuple[int, int]:
+    """Write-time guard: adds chunks that are not already in the store.
+
+    Chunks are keyed by content hash, so exact repeats only bump the
+    stored chunk's metadata. With a near_threshold, the remaining chunks
+    are embedded once and skipped when the closest stored chunk is at
+    least that similar. Returns (added, skipped).
+    """
+    near_threshold = _near_threshold(near_threshold)
+    pending: dict[str, Document] = {}
+    for doc in documents:
+        doc_id = contentId(doc.page_content)
+        if doc_id in pending:
+            pending[doc_id].metadata = _merge_metadata(pending[doc_id].metadata, doc.metadata)
+        else:
+            pending[doc_id] = Document(page_content=doc.page_content, metadata=dict(doc.metadata))
+    if not pending:
+        return 0, 0
+
+    existing = vectorstore.get(ids=list(pending), include=["metadatas"])
+    if existing["ids"]:
+        _update_metadatas(vectorstore, existing["ids"], [
+            _merge_metadata(metadata or {}, pending.pop(doc_id).metadata)
+            for doc_id, metadata in zip(existing["ids"], existing["metadatas"])
+        ])
+    skipped = len(documents) - len(pending)
+    if not pending:
+        return 0, skipped
+
+    ids = list(pending)
+    docs = [pending[doc_id] for doc_id in ids]
+    if not near_threshold:
+        vectorstore.add_documents(docs, ids=ids)
+        return len(docs), skipped
+
+    vectors = vectorstore.embeddings.embed_documents([doc.page_content for doc in docs])
+    keep_ids, keep_docs, keep_vectors = [], [], []
+    merged_ids, merged_metadatas = [], []
+    for doc_id, doc, vector in zip(ids, docs, vectors):
+        nearest = vectorstore.similarity_search_by_vector_with_relevance_scores(vector, k=1)
+        if nearest and nearest[0][0].id:
+            match = vectorstore.get(ids=[nearest[0][0].id], include=["embeddings", "metadatas"])
+            if len(match["ids"]) and _cosine(vector, match["embeddings"][0]) >= near_threshold:
+                merged_ids.append(match["ids"][0])
+                merged_metadatas.append(_merge_metadata(match["metadatas"][0] or {}, doc.metadata))
+                continue
+        keep_ids.append(doc_id)
+        keep_docs.append(doc)
+        keep_vectors.append(vector)
+
+    _update_metadatas(vectorstore, merged_ids, merged_metadatas)
+    if keep_docs:
+        addVectors(vectorstore, keep_vectors, [doc.page_content for doc in keep_docs],
+                   [doc.metadata for doc in keep_docs], keep_ids)
+    return len(keep_docs), skipped + len(merged_ids)
+
+
+def _dir_size(path: Optional[Path]) -> Optional[int]:
+    if path is None or not path.exists():
+        return None
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def _find_root(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent: list[int], a: int, b: int):
+    a, b = _find_root(parent, a), _find_root(parent, b)
+    if a != b:
+        # The earlier row stays the representative.
+        parent[max(a, b)] = min(a, b)
+
+
+def deduplicateVectorStore(vectorstore, near_threshold: Optional[float] = None,
+                           db_path: Optional[Path] = None) -> dict:
+    """Removes exact and near-duplicate chunks and merges their metadata.
+
+    Exact duplicates share a content hash; near duplicates have a cosine
+    similarity of at least near_threshold with one of a chunk's nearest
+    neighbours, found through the store's own search index. The first
+    chunk of each group is kept.
+    """
+    near_threshold = _near_threshold(near_threshold)
+    size_before = _dir_size(db_path)
+    data = vectorstore.get(include=["documents", "metadatas", "embeddings"])
+    ids, texts = list(data["ids"]), list(data["documents"])
+    metadatas = [m or {} for m in data["metadatas"]]
+    count = len(ids)
+    parent = list(range(count))
+
+    first_by_hash = {}
+    exact = 0
+    for i, text in enumerate(texts):
+        digest = contentHash(text)
+        if digest in first_by_hash:
+            _union(parent, first_by_hash[digest], i)
+            exact += 1
+        else:
+            first_by_hash[digest] = i
+
+    vectors = np.asarray(data["embeddings"], dtype=np.float32) if count else np.zeros((0, 0))
+    if near_threshold and count > 1:
+        row_of = {doc_id: i for i, doc_id in enumerate(ids)}
+        k = int(EMB_DEDUP.get("neighbours", NEAR_NEIGHBOURS)) + 1
+        # Exact copies have the same neighbours, so only the first is searched.
+        for i in first_by_hash.values():
+            hits = vectorstore.similarity_search_by_vector_with_relevance_scores(vectors[i].tolist(), k=k)
+            for doc, _ in hits:
+                j = row_of.get(doc.id)
+                if j is not None and j != i and _cosine(vectors[i], vectors[j]) >= near_threshold:
+                    _union(parent, i, j)
+
+    removed, groups = [], {}
+    for i in range(count):
+        root = _find_root(parent, i)
+        if root != i:
+            removed.append(i)
+            groups.setdefault(root, []).append(i)
+
+    keeper_ids, keeper_metadatas = [], []
+    for root, members in groups.items():
+        merged = metadatas[root]
+        for member in members:
+            merged = _merge_metadata(merged, metadatas[member])
+        keeper_ids.append(ids[root])
+        keeper_metadatas.append(merged)
+
+    if removed:
+        _update_metadatas(vectorstore, keeper_ids, keeper_metadatas)
+        removed_ids = [ids[i] for i in removed]
+        for start in range(0, len(removed_ids), WRITE_BATCH_SIZE):
+            vectorstore.delete(ids=removed_ids[start:start + WRITE_BATCH_SIZE])
+        if hasattr(vectorstore, "compact"):
+            vectorstore.compact()
+
+    width = vectors.shape[1] if vectors.ndim == 2 else 0
+    report = {
+        "chunks_before": count,
+        "exact_duplicates": exact,
+        "near_duplicates": len(removed) - exact,
+        "removed": len(removed),
+        "estimated_bytes_reclaimed": sum(len(texts[i].encode("utf-8")) + width * 4 for i in removed),
+        "disk_bytes_before": size_before,
+        "disk_bytes_after": _dir_size(db_path),
+        "finished_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    return report
+
+
+def _load_state(db_path: Path) -> dict:
+    try:
+        with open(db_path / STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(db_path: Path, state: dict):
+    db_path.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path / f".{STATE_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, db_path / STATE_FILE)
+
+
+def runDeduplication(vectorstore, db_path: Path, near_threshold: Optional[float] = None) -> Optional[dict]:
+    """Runs one pass for a conversation store and records it in dedup.json."""
+    key = str(Path(db_path).resolve())
+    with _running_lock:
+        if key in _running:
+            print_info_message("Deduplication is already running for this conversation.")
+            return None
+        _running.add(key)
+    try:
+        report = deduplicateVectorStore(vectorstore, near_threshold, db_path)
+        _save_state(db_path, {"last_run": time.time(), "report": report})
+        print_success_message(
+            f"Deduplication removed {report['removed']} of {report['chunks_before']} chunks "
+            f"({report['exact_duplicates']} exact, {report['near_duplicates']} near), "
+            f"~{report['estimated_bytes_reclaimed'] / 1024:.0f} KiB reclaimed.")
+        return report
+    finally:
+        with _running_lock:
+            _running.discard(key)
+
+
+def scheduleDeduplication(vectorstore, db_path: Path) -> bool:
+    """Starts a background pass when the last one is older than interval_hours."""
+    interval_hours = EMB_DEDUP.get("interval_hours", 0)
+    if not interval_hours or vectorstore is None:
+        return False
+    last_run = _load_state(db_path).get("last_run", 0)
+    if time.time() - last_run < interval_hours * 3600:
+        return False
+
+    def _run():
+        try:
+            runDeduplication(vectorstore, db_path)
+        except Exception as e:
+            print_error_message(f"Scheduled deduplication failed: {e}")
+
+    startBackgroundTask(db_path, "vector-store-dedup", _run)
+    return True
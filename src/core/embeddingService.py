@@ -0,0 +1,394 @@
+# src/core/embeddingService.py
+import http.client
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.libs.fileLock import FileLock
+from src.libs.messages import print_error_message, print_info_message, print_note_message
+from src.libs.tracing import span
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DAEMON_SCRIPT = PROJECT_ROOT / "src" / "utils" / "embeddingDaemon.py"
+DEFAULT_ADDRESS = "unix:./data/embedder.sock" if hasattr(socket, "AF_UNIX") else "http://127.0.0.1:7861"
+# Vectors travel as a "<II" (rows, dimensions) header and little-endian
+# float32 rows; token IDs as a "<I" count and int32 values.
+VECTORS_HEADER = struct.Struct("<II")
+COUNT_HEADER = struct.Struct("<I")
+
+_clients: dict[str, "EmbeddingServiceClient"] = {}
+_clients_lock = threading.Lock()
+
+
+def encodeVectors(vectors: np.ndarray) -> bytes:
+    vectors = np.ascontiguousarray(vectors, dtype="<f4")
+    rows, dimensions = vectors.shape if vectors.ndim == 2 else (0, 0)
+    return VECTORS_HEADER.pack(rows, dimensions) + vectors.tobytes()
+
+
+def decodeVectors(payload: bytes) -> np.ndarray:
+    rows, dimensions = VECTORS_HEADER.unpack_from(payload)
+    return np.frombuffer(payload, dtype="<f4", count=rows * dimensions,
+                         offset=VECTORS_HEADER.size).reshape(rows, dimensions)
+
+
+def _service_address(service_config: dict) -> str:
+    return service_config.get("address") or DEFAULT_ADDRESS
+
+
+def _unix_path(address: str) -> Optional[Path]:
+    if address.startswith("unix:"):
+        return (PROJECT_ROOT / address[len("unix:"):]).resolve()
+    return None
+
+
+class _Pending:
+    __slots__ = ("texts", "result", "error", "done")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+
+
+class EmbeddingBatcher:
+    """Merges requests that arrive within a short window into one model call.
+
+    llama.cpp packs the texts of a call into shared batches, so many small
+    requests cost about as much as one larger one.
+    """
+
+    def __init__(self, embeddings, window_ms: float = 5, max_texts: int = 64):
+        self.embeddings = embeddings
+        self.window = window_ms / 1000.0
+        self.max_texts = max(1, int(max_texts))
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="aeon-embed-batcher", daemon=True)
+        self._thread.start()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        pending = _Pending(texts)
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _collect(self) -> list[_Pending]:
+        batch = [self._queue.get()]
+        count = len(batch[0].texts)
+        deadline = time.monotonic() + self.window
+        while count < self.max_texts:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            count += len(pending.texts)
+        return batch
+
+    def _embed(self, batch: list[_Pending]):
+        texts = [text for pending in batch for text in pending.texts]
+        with span("embed.batch", requests=len(batch), texts=len(texts)):
+            vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        start = 0
+        for pending in batch:
+            pending.result = vectors[start:start + len(pending.texts)]
+            start += len(pending.texts)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._embed(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0].error = e
+                else:
+                    # Retry one by one so a bad request only fails itself.
+                    for pending in batch:
+                        try:
+                            self._embed([pending])
+                        except Exception as request_error:
+                            pending.error = request_error
+            finally:
+                for pending in batch:
+                    pending.done.set()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "AeonEmbedder/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._reply(status, json.dumps({"message": message}).encode("utf-8"), "application/json")
+
+    def do_GET(self):
+        if self.path in ("/info", "/health"):
+            self._reply(200, json.dumps(self.server.info).encode("utf-8"), "application/json")
+        else:
+            self._error(404, "Not found.")
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            texts = json.loads(self.rfile.read(length) or b"[]")
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                self._error(400, "Body must be a JSON list of strings.")
+                return
+            if self.path == "/embed":
+                vectors = self.server.batcher.embed(texts) if texts else np.zeros((0, 0), np.float32)
+                self._reply(200, encodeVectors(vectors), "application/octet-stream")
+            elif self.path == "/tokenize":
+                # One text per call; used by the splitter to count tokens.
+                ids = self.server.tokenizer.tokenize(texts[0].encode("utf-8"), add_bos=False) if texts else []
+                body = COUNT_HEADER.pack(len(ids)) + np.asarray(ids, dtype="<i4").tobytes()
+                self._reply(200, body, "application/octet-stream")
+            else:
+                self._error(404, "Not found.")
+        except Exception as e:
+            self._error(500, str(e))
+
+
+class _TcpServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def get_request(self):
+            request, _ = super().get_request()
+            # BaseHTTPRequestHandler expects a (host, port) client address.
+            return request, ("local", 0)
+
+
+def _unix_socket_alive(path: Path) -> bool:
+    """True when a server accepts connections on the socket file."""
+    if not path.exists():
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    probe.settimeout(1.0)
+    try:
+        probe.connect(str(path))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def serveEmbeddings(emb_config: dict, address: Optional[str] = None):
+    """Loads the embedding model once and serves it until interrupted."""
+    from src.core.modelCache import getEmbeddings
+
+    service_config = emb_config.get("service") or {}
+    address = address or _service_address(service_config)
+
+    # Bind before loading the model, so a second daemon started at the same
+    # time gives up without the cost of a load.
+    unix_path = _unix_path(address)
+    lock = None
+    try:
+        if unix_path is not None:
+            lock = FileLock(unix_path.with_name(unix_path.name + ".lock"))
+            if not lock.acquire(blocking=False):
+                lock = None
+                raise OSError("the address is locked by another daemon")
+            if _unix_socket_alive(unix_path):
+                raise OSError("another daemon is listening on it")
+            if unix_path.exists():
+                unix_path.unlink()
+            server = _UnixServer(str(unix_path), _Handler)
+        else:
+            parsed = urlparse(address)
+            server = _TcpServer((parsed.hostname or "127.0.0.1", parsed.port or 7861), _Handler)
+    except OSError as e:
+        if lock is not None:
+            lock.release()
+        print_note_message(f"Not starting the embedding service on {address}: {e}.")
+        return
+
+    try:
+        embeddings = getEmbeddings(emb_config, local=True)
+        dimensions = len(embeddings.embed_query("dimension probe"))
+        server.batcher = EmbeddingBatcher(
+            embeddings, service_config.get("batch_window_ms", 5), service_config.get("max_batch_texts", 64))
+        server.tokenizer = embeddings.client
+        server.info = {
+            "model": str(Path(emb_config["model"]).resolve()),
+            "n_ctx": emb_config["n_ctx"],
+            "dimensions": dimensions,
+            "pid": os.getpid(),
+        }
+        print_info_message(f"Embedding service for {emb_config['model']} listening on {address}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if unix_path is not None and unix_path.exists():
+            unix_path.unlink()
+        if lock is not None:
+            lock.release()
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: Path, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = str(path)
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class _RemoteTokenizer:
+    """Stands in for the llama.cpp client so the splitter can count tokens."""
+
+    def __init__(self, service: "EmbeddingServiceClient"):
+        self._service = service
+
+    def tokenize(self, text: bytes, add_bos: bool = False) -> list[int]:
+        payload = self._service._post("/tokenize", [text.decode("utf-8", errors="replace")])
+        (count,) = COUNT_HEADER.unpack_from(payload)
+        return np.frombuffer(payload, dtype="<i4", count=count, offset=COUNT_HEADER.size).tolist()
+
+
+class EmbeddingServiceClient(Embeddings):
+    """Embeddings backed by the shared embedding daemon.
+
+    Keeps one keep-alive connection per thread. model_path and client
+    mirror LlamaCppEmbeddings, so callers that check the model or count
+    tokens work unchanged.
+    """
+
+    def __init__(self, address: str, timeout: float = 60.0):
+        self.address = address
+        self.timeout = timeout
+        self._local = threading.local()
+        self.info = json.loads(self._request("GET", "/info"))
+        self.model_path = self.info["model"]
+        self.dimensions = self.info["dimensions"]
+        self.client = _RemoteTokenizer(self)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            unix_path = _unix_path(self.address)
+            if unix_path is not None:
+                connection = _UnixConnection(unix_path, self.timeout)
+            else:
+                parsed = urlparse(self.address)
+                connection = http.client.HTTPConnection(
+                    parsed.hostname or "127.0.0.1", parsed.port or 7861, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> bytes:
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in (1, 2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                payload = response.read()
+                break
+            except (OSError, http.client.HTTPException):
+                # The daemon may have closed an idle connection; reconnect once.
+                connection.close()
+                self._local.connection = None
+                if attempt == 2:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(f"Embedding service error {response.status}: {payload[:200]!r}")
+        return payload
+
+    def _post(self, path: str, texts: list[str]) -> bytes:
+        return self._request("POST", path, json.dumps(texts).encode("utf-8"))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return decodeVectors(self._post("/embed", list(texts))).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return decodeVectors(self._post("/embed", [text]))[0].tolist()
+
+
+def _start_daemon(address: str):
+    print_info_message(f"Starting the embedding service on {address}...")
+    subprocess.Popen(
+        [sys.executable, str(DAEMON_SCRIPT), "--address", address],
+        cwd=str(PROJECT_ROOT), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def connectEmbeddingService(emb_config: dict) -> Optional[EmbeddingServiceClient]:
+    """A client for the daemon serving emb_config's model, started if allowed.
+
+    Returns None when the service is unreachable or serves another model,
+    so the caller can load the model in process instead.
+    """
+    service_config = emb_config.get("service") or {}
+    address = _service_address(service_config)
+    timeout = service_config.get("timeout_s", 60)
+    with _clients_lock:
+        client = _clients.get(address)
+        if client is None:
+            try:
+                client = EmbeddingServiceClient(address, timeout)
+            except (OSError, http.client.HTTPException, RuntimeError, ValueError):
+                if not service_config.get("autostart", True):
+                    print_note_message(f"Embedding service not reachable at {address}; loading the model here.")
+                    return None
+                _start_daemon(address)
+                deadline = time.monotonic() + service_config.get("startup_timeout_s", 120)
+                while client is None and time.monotonic() < deadline:
+                    time.sleep(0.5)
+                    try:
+                        client = EmbeddingServiceClient(address, timeout)
+                    except (OSError, http.client.HTTPException, RuntimeError, ValueError):
+                        pass
+                if client is None:
+                    print_error_message(f"Embedding service did not start at {address}; loading the model here.")
+                    return None
+            _clients[address] = client
+
+    if (client.model_path != str(Path(emb_config["model"]).resolve())
+            or client.info.get("n_ctx") != emb_config["n_ctx"]):
+        print_note_message(
+            f"Embedding service at {address} serves {client.model_path} (n_ctx {client.info.get('n_ctx')}); "
+            f"loading {emb_config['model']} (n_ctx {emb_config['n_ctx']}) here instead.")
+        return None
+    return client
@@ -0,0 +1,362 @@
+# src/core/knowledgeBase.py
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from langchain_chroma import Chroma
+
+from src.libs.loaders import JsonPlaintextLoader, MarkdownLoader, PlainTextLoader
+from src.config import INPUT_DIR, KNOWLEDGE_BASE_DIR, WATCH_CONFIG
+from src.libs.fileLock import FileLock
+from src.libs.folderWatcher import FolderWatcher
+from src.libs.splitter import splitterFingerprint, splitterSettings
+from src.libs.messages import (
+    print_error_message, print_info_message, print_success_message
+)
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+MANIFEST_NAME = "manifest.json"
+WATCHED_FOLDERS_NAME = "watched_folders.json"
+INPUT_PATTERNS = ("**/*.md", "**/*.txt", "**/*.json")
+INPUT_SUFFIXES = (".md", ".txt", ".json")
+ADD_BATCH_SIZE = 32
+SYNC_LOCK_NAME = "sync.lock"
+
+_sync_locks: dict[Path, FileLock] = {}
+_sync_locks_guard = threading.Lock()
+_watch_lock = threading.Lock()
+_watcher: Optional[FolderWatcher] = None
+_watch_target: Optional[tuple] = None
+
+
+def _kb_dir_for(embedding_model_path: str, text_splitter) -> Path:
+    """Each embedding model and chunking setup gets its own store.
+
+    Vectors of different models are not interchangeable, and conversations
+    with their own chunk settings would otherwise re-index each other's store.
+    """
+    name = f"{Path(embedding_model_path).stem}-{splitterFingerprint(text_splitter)}"
+    return PROJECT_ROOT / KNOWLEDGE_BASE_DIR / name
+
+
+def _sync_lock(kb_dir: Path) -> FileLock:
+    """Serializes index writes across threads and processes.
+
+    The CLI and the web app each run a watcher over the same store and
+    manifest, so a process-local lock is not enough.
+    """
+    with _sync_locks_guard:
+        if kb_dir not in _sync_locks:
+            _sync_locks[kb_dir] = FileLock(kb_dir / SYNC_LOCK_NAME)
+        return _sync_locks[kb_dir]
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_manifest(kb_dir: Path) -> dict:
+    manifest_path = kb_dir / MANIFEST_NAME
+    if not manifest_path.is_file():
+        return {"files": {}}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print_error_message(f"Knowledge base manifest unreadable, re-indexing: {e}")
+        return {"files": {}}
+
+
+def _save_manifest(kb_dir: Path, manifest: dict):
+    manifest_path = kb_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def _save_index_manifest(kb_dir: Path, manifest: dict, embedding_model_path: str, text_splitter):
+    manifest["embedding_model"] = str(embedding_model_path)
+    manifest["splitter"] = splitterSettings(text_splitter)
+    _save_manifest(kb_dir, manifest)
+
+
+def _load_input_file(path: Path) -> list:
+    suffix = path.suffix.lower()
+    if suffix == ".md":
+        loader = MarkdownLoader(str(path))
+    elif suffix == ".json":
+        loader = JsonPlaintextLoader(str(path))
+    else:
+        loader = PlainTextLoader(str(path))
+    documents = loader.load()
+    for doc in documents:
+        doc.metadata["source"] = str(path)
+    return documents
+
+
+def _chunk_ids(key: str, count: int) -> list[str]:
+    prefix = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    return [f"kb-{prefix}-{i}" for i in range(count)]
+
+
+def _watched_roots() -> list[Path]:
+    """data/input first, then folders from watch_config.folders and /watch."""
+    roots = [(PROJECT_ROOT / INPUT_DIR).resolve()]
+    for folder in list(WATCH_CONFIG.get("folders") or []) + registeredFolders():
+        root = Path(folder).expanduser()
+        root = (root if root.is_absolute() else PROJECT_ROOT / root).resolve()
+        if root not in roots:
+            roots.append(root)
+    return roots
+
+
+def _file_key(path: Path, roots: list[Path]) -> Optional[str]:
+    """Manifest key of a file: relative under data/input, absolute elsewhere."""
+    if path.suffix.lower() not in INPUT_SUFFIXES:
+        return None
+    for index, root in enumerate(roots):
+        if path.is_relative_to(root):
+            return path.relative_to(root).as_posix() if index == 0 else path.as_posix()
+    return None
+
+
+def _key_path(key: str) -> Path:
+    path = Path(key)
+    return path if path.is_absolute() else (PROJECT_ROOT / INPUT_DIR).resolve() / path
+
+
+def _scan_roots(present: list[Path], roots: list[Path]) -> dict:
+    files = {}
+    for root in present:
+        for pattern in INPUT_PATTERNS:
+            for path in root.glob(pattern):
+                key = _file_key(path.resolve(), roots)
+                if key and path.is_file():
+                    files[key] = path
+    return files
+
+
+def _affected_files(paths: set, known: dict, roots: list[Path]) -> tuple[dict, set]:
+    """Files on disk and manifest keys under a set of changed paths."""
+    on_disk, keys = {}, set()
+    known_paths = {key: _key_path(key) for key in known}
+    for path in (Path(p).resolve() for p in paths):
+        keys.update(key for key, known_path in known_paths.items()
+                    if known_path == path or known_path.is_relative_to(path))
+        candidates = [path] if path.is_file() else (
+            [p for pattern in INPUT_PATTERNS for p in path.glob(pattern)] if path.is_dir() else [])
+        for candidate in candidates:
+            key = _file_key(candidate.resolve(), roots)
+            if key and candidate.is_file():
+                on_disk[key] = candidate
+                keys.add(key)
+    return on_disk, keys
+
+
+def _apply_changes(vectorstore: Chroma, text_splitter, known: dict, on_disk: dict,
+                   keys: Optional[set], save: Callable[[], None]) -> tuple[int, int]:
+    """Brings the store in line with on_disk for keys (all when None).
+
+    save persists known; it runs once at the end, even when a file fails
+    midway, so files already re-embedded are not redone. A file that could
+    not be indexed loses its manifest entry and is retried on the next
+    sync. Returns (files indexed, files removed).
+    """
+    scope = set(known) | set(on_disk) if keys is None else keys
+    removed = [key for key in scope if key in known and key not in on_disk]
+    changed = 0
+    touched = False
+    try:
+        for key in removed:
+            ids = known[key].get("ids", [])
+            if ids:
+                vectorstore.delete(ids=ids)
+            del known[key]
+            touched = True
+
+        for key in sorted(key for key in scope if key in on_disk):
+            path = on_disk[key]
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entry = known.get(key)
+            if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            sha256 = _sha256_file(path)
+            if entry and entry["sha256"] == sha256:
+                entry["mtime_ns"] = stat.st_mtime_ns
+                touched = True
+                continue
+
+            if entry and entry.get("ids"):
+                vectorstore.delete(ids=entry["ids"])
+            known.pop(key, None)
+            touched = True
+
+            try:
+                chunks = text_splitter.split_documents(_load_input_file(path))
+            except Exception as e:
+                print_error_message(f"Failed to load '{path}': {e}")
+                continue
+
+            ids = _chunk_ids(key, len(chunks))
+            try:
+                for start in range(0, len(chunks), ADD_BATCH_SIZE):
+                    vectorstore.add_documents(chunks[start:start + ADD_BATCH_SIZE],
+                                              ids=ids[start:start + ADD_BATCH_SIZE])
+            except Exception as e:
+                print_error_message(f"Failed to index '{path}': {e}")
+                try:
+                    vectorstore.delete(ids=ids)
+                except Exception as e:
+                    print_error_message(f"Failed to remove partial chunks of '{path}': {e}")
+                continue
+            known[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                          "sha256": sha256, "ids": ids}
+            changed += 1
+            print_info_message(f"Indexed '{key}' ({len(chunks)} chunks).")
+    finally:
+        if touched:
+            save()
+    return changed, len(removed)
+
+
+def _open_store(kb_dir: Path, embeddings) -> Chroma:
+    kb_dir.mkdir(parents=True, exist_ok=True)
+    return Chroma(persist_directory=str(kb_dir / "db"), embedding_function=embeddings)
+
+
+def syncKnowledgeBase(embeddings, text_splitter, embedding_model_path: str) -> Chroma:
+    """Opens the shared data/input index and re-embeds only changed files.
+
+    Unchanged files are detected by size and mtime, then by content hash,
+    so an idle corpus costs one stat per file. Chunks of edited or removed
+    files are deleted before new ones are added. Registered folders are
+    indexed along with data/input.
+    """
+    input_dir_path = PROJECT_ROOT / INPUT_DIR
+    kb_dir = _kb_dir_for(embedding_model_path, text_splitter)
+
+    with _sync_lock(kb_dir):
+        vectorstore = _open_store(kb_dir, embeddings)
+        if not input_dir_path.is_dir():
+            print_error_message(f"Directory '{input_dir_path}' not found. Please create it.")
+
+        manifest = _load_manifest(kb_dir)
+        known = manifest.setdefault("files", {})
+        roots = _watched_roots()
+        missing = [root for root in roots if not root.is_dir()]
+        on_disk = _scan_roots([root for root in roots if root not in missing], roots)
+        # Files under a missing root keep their chunks until it is back.
+        scope = set(on_disk) | {key for key in known if not any(
+            _key_path(key).is_relative_to(root) for root in missing)}
+        changed, removed = _apply_changes(
+            vectorstore, text_splitter, known, on_disk, scope,
+            lambda: _save_index_manifest(kb_dir, manifest, embedding_model_path, text_splitter))
+
+        if changed or removed:
+            print_success_message(
+                f"Knowledge base updated: {changed} files indexed, {removed} removed.")
+        else:
+            print_info_message("Knowledge base is up to date.")
+
+    return vectorstore
+
+
+def refreshKnowledgeBase(embeddings, text_splitter, embedding_model_path: str, paths: set) -> tuple[int, int]:
+    """Re-indexes only the files at or under the changed paths.
+
+    Returns (files indexed, files removed).
+    """
+    kb_dir = _kb_dir_for(embedding_model_path, text_splitter)
+    with _sync_lock(kb_dir):
+        vectorstore = _open_store(kb_dir, embeddings)
+        manifest = _load_manifest(kb_dir)
+        known = manifest.setdefault("files", {})
+        on_disk, keys = _affected_files(paths, known, _watched_roots())
+        if not keys:
+            return 0, 0
+        changed, removed = _apply_changes(
+            vectorstore, text_splitter, known, on_disk, keys,
+            lambda: _save_index_manifest(kb_dir, manifest, embedding_model_path, text_splitter))
+    if changed or removed:
+        print_success_message(
+            f"Knowledge base updated: {changed} files indexed, {removed} removed.")
+    return changed, removed
+
+
+def registeredFolders() -> list[str]:
+    path = PROJECT_ROOT / KNOWLEDGE_BASE_DIR / WATCHED_FOLDERS_NAME
+    if not path.is_file():
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("folders", [])
+    except (OSError, json.JSONDecodeError) as e:
+        print_error_message(f"Watched folder list unreadable: {e}")
+        return []
+
+
+def registerFolder(folder: str) -> Optional[Path]:
+    """Adds a folder to the knowledge base and, when watching, to the watcher."""
+    root = Path(folder).expanduser().resolve()
+    if not root.is_dir():
+        print_error_message(f"Not a directory: '{folder}'")
+        return None
+    roots = _watched_roots()
+    if any(root.is_relative_to(existing) for existing in roots):
+        print_info_message(f"'{root}' is already part of the knowledge base.")
+        return root
+
+    folders = registeredFolders() + [root.as_posix()]
+    path = PROJECT_ROOT / KNOWLEDGE_BASE_DIR / WATCHED_FOLDERS_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"folders": folders}, f, indent=2)
+    os.replace(tmp_path, path)
+
+    with _watch_lock:
+        if _watcher is not None:
+            _watcher.watch(root)
+    return root
+
+
+def _on_watched_change(paths: set):
+    with _watch_lock:
+        target = _watch_target
+    if target is not None:
+        refreshKnowledgeBase(*target, paths)
+
+
+def watchKnowledgeBase(embeddings, text_splitter, embedding_model_path: str) -> Optional[FolderWatcher]:
+    """Starts the background watcher once per process, if watch_config.enabled.
+
+    Later calls only switch the model and splitter it indexes with, so the
+    knowledge base of the conversation opened last is the one kept fresh;
+    others catch up when their conversation is opened.
+    """
+    global _watcher, _watch_target
+    if not WATCH_CONFIG.get("enabled", True):
+        return None
+    with _watch_lock:
+        _watch_target = (embeddings, text_splitter, embedding_model_path)
+        if _watcher is None:
+            _watcher = FolderWatcher(
+                _on_watched_change, INPUT_SUFFIXES,
+                debounce_ms=WATCH_CONFIG.get("debounce_ms", 1500),
+                poll_interval_s=WATCH_CONFIG.get("poll_interval_s", 5),
+                backend=WATCH_CONFIG.get("backend", "auto"))
+            for root in _watched_roots():
+                _watcher.watch(root)
+            _watcher.start()
+        return _watcher
@@ -0,0 +1,136 @@
+# src/core/llamaRuntime.py
+import os
+from typing import Optional
+
+import yaml
+
+from src.libs.messages import print_error_message, print_note_message
+
+# ggml_type values accepted by llama.cpp for the KV cache.
+KV_CACHE_TYPES = {"f32": 0, "f16": 1, "q4_0": 2, "q4_1": 3, "q5_0": 6, "q5_1": 7, "q8_0": 8, "bf16": 30}
+# ggml_numa_strategy values; true means distribute.
+NUMA_STRATEGIES = {"distribute": 1, "isolate": 2, "numactl": 3, "mirror": 4}
+RUNTIME_KEYS = ("n_threads", "n_threads_batch", "n_batch", "n_ubatch", "use_mmap", "use_mlock",
+                "flash_attn", "type_k", "type_v", "numa")
+_INT_KEYS = ("n_threads", "n_threads_batch", "n_batch", "n_ubatch")
+_BOOL_KEYS = ("use_mmap", "use_mlock", "flash_attn")
+
+
+def validateRuntime(runtime: Optional[dict], kind: str = "llm", n_ctx: Optional[int] = None) -> tuple[dict, list[str]]:
+    """Checks a runtime block and returns (llama.cpp keyword arguments, errors).
+
+    Unset or invalid keys are left out, so llama.cpp keeps its default for them.
+    """
+    params, errors = {}, []
+    if runtime is None:
+        return params, errors
+    if not isinstance(runtime, dict):
+        return params, [f"{kind}: runtime must be a mapping."]
+
+    for key in runtime:
+        if key not in RUNTIME_KEYS:
+            errors.append(f"{kind}: unknown runtime setting '{key}'.")
+
+    for key in _INT_KEYS:
+        value = runtime.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            errors.append(f"{kind}: {key} must be a positive integer, got {value!r}.")
+            continue
+        params[key] = value
+    for key in _BOOL_KEYS:
+        value = runtime.get(key)
+        if value is None:
+            continue
+        if not isinstance(value, bool):
+            errors.append(f"{kind}: {key} must be true or false, got {value!r}.")
+            continue
+        params[key] = value
+    for key in ("type_k", "type_v"):
+        value = runtime.get(key)
+        if value is None:
+            continue
+        if str(value).lower() not in KV_CACHE_TYPES:
+            errors.append(f"{kind}: {key} must be one of {', '.join(KV_CACHE_TYPES)}, got {value!r}.")
+            continue
+        params[key] = KV_CACHE_TYPES[str(value).lower()]
+
+    numa = runtime.get("numa")
+    if isinstance(numa, bool):
+        if numa:
+            params["numa"] = NUMA_STRATEGIES["distribute"]
+    elif numa is not None:
+        if str(numa).lower() not in NUMA_STRATEGIES:
+            errors.append(f"{kind}: numa must be false, true or one of {', '.join(NUMA_STRATEGIES)}, got {numa!r}.")
+        else:
+            params["numa"] = NUMA_STRATEGIES[str(numa).lower()]
+
+    if "n_ubatch" in params and "n_batch" in params and params["n_ubatch"] > params["n_batch"]:
+        errors.append(f"{kind}: n_ubatch ({params['n_ubatch']}) cannot exceed n_batch ({params['n_batch']}).")
+        del params["n_ubatch"]
+    if n_ctx and params.get("n_batch", 0) > n_ctx:
+        errors.append(f"{kind}: n_batch ({params['n_batch']}) cannot exceed n_ctx ({n_ctx}).")
+        params.pop("n_batch")
+        params.pop("n_ubatch", None)
+    if params.get("type_v", KV_CACHE_TYPES["f16"]) not in (KV_CACHE_TYPES["f16"], KV_CACHE_TYPES["f32"]) \
+            and not params.get("flash_attn"):
+        errors.append(f"{kind}: a quantized type_v needs flash_attn: true.")
+        params.pop("type_v")
+    if kind == "emb" and "n_batch" in params:
+        # Embedding models encode a whole sequence in one micro-batch.
+        params["n_ubatch"] = params["n_batch"]
+    return params, errors
+
+
+def runtimeParams(model_config: dict, kind: str) -> dict:
+    """Validated runtime settings of an llm_config or emb_config, errors printed."""
+    params, errors = validateRuntime(model_config.get("runtime"), kind, model_config.get("n_ctx"))
+    for error in errors:
+        print_error_message(f"Ignoring invalid setting in {kind}_config.runtime: {error}")
+    threads = params.get("n_threads", 0)
+    if threads > (os.cpu_count() or threads):
+        print_note_message(f"{kind}_config.runtime.n_threads ({threads}) exceeds the {os.cpu_count()} CPUs of this host.")
+    return params
+
+
+def runtimeKey(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+
+def configRuntimeErrors(config_dict: dict) -> list[str]:
+    """Errors in the runtime blocks of a whole config, for rejecting an edit."""
+    errors = []
+    for kind in ("llm", "emb"):
+        section = (config_dict or {}).get(f"{kind}_config") or {}
+        if isinstance(section, dict):
+            errors.extend(validateRuntime(section.get("runtime"), kind, section.get("n_ctx"))[1])
+    return errors
+
+
+def _scalar(value) -> str:
+    return yaml.safe_dump(value, default_flow_style=True).strip().removesuffix("\n...").strip()
+
+
+def updateRuntimeBlock(text: str, section: str, values: dict) -> str:
+    """Writes values into `<section>.runtime` of a config.yml, keeping other lines and comments."""
+    current = ((yaml.safe_load(text) or {}).get(section) or {}).get("runtime") or {}
+    merged = {**current, **values}
+    block = ["  runtime:\n"] + [f"    {key}: {_scalar(value)}\n" for key, value in merged.items()]
+
+    lines = text.splitlines(keepends=True)
+    try:
+        start = next(i for i, line in enumerate(lines) if line.rstrip() == f"{section}:")
+    except StopIteration:
+        return text.rstrip("\n") + f"\n\n{section}:\n" + "".join(block)
+    end = next((i for i in range(start + 1, len(lines))
+                if lines[i].strip() and not lines[i].startswith((" ", "#"))), len(lines))
+    runtime_line = next((i for i in range(start + 1, end) if lines[i].rstrip() == "  runtime:"), None)
+    if runtime_line is None:
+        while end > start + 1 and not lines[end - 1].strip():
+            end -= 1
+        return "".join(lines[:end] + block + lines[end:])
+    block_end = runtime_line + 1
+    while block_end < end and lines[block_end].startswith("    "):
+        block_end += 1
+    return "".join(lines[:runtime_line] + block + lines[block_end:])
@@ -0,0 +1,263 @@
+# src/core/memoryTiers.py
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from src.config import MEMORY_CONFIG
+from src.core.vectorStores import updateMetadata
+from src.libs.backgroundTasks import startBackgroundTask
+from src.libs.messages import print_error_message, print_info_message
+
+STATE_FILE = "memory.json"
+CHAT_DB_NAME = "chat.sqlite3"
+TURN_SOURCE = "memory"
+SUMMARY_SOURCE = "memory_summary"
+# Rough character budget for one summarisation prompt.
+MAX_PROMPT_CHARS = 12000
+
+SUMMARY_PROMPT = (
+    "<|im_start|>system\n"
+    "Summarize the conversation excerpt below as a short memory for later "
+    "reference. Keep names, numbers, facts, decisions and open questions. "
+    "Write plain sentences without commentary.<|im_end|>\n"
+    "<|im_start|>user\n{excerpt}<|im_end|>\n"
+    "<|im_start|>assistant\n"
+)
+
+_llm_locks: dict[int, threading.Lock] = {}
+_llm_locks_guard = threading.Lock()
+_running: set[str] = set()
+_running_lock = threading.Lock()
+
+
+def llmLock(llm) -> threading.Lock:
+    """One lock per model instance; llama.cpp contexts are not thread-safe."""
+    with _llm_locks_guard:
+        return _llm_locks.setdefault(id(llm), threading.Lock())
+
+
+def turnMetadata(turn: Optional[dict]) -> dict:
+    """Metadata that ties a memory chunk to the turn it came from."""
+    metadata = {"source": TURN_SOURCE, "tier": "turn"}
+    if turn:
+        metadata["turn_guid"] = turn["guid"]
+        metadata["timestamp"] = turn["timestamp"]
+    return metadata
+
+
+def turnGuids(metadata: Optional[dict]) -> set[str]:
+    """Every turn a chunk stands for; deduplication folds repeats into one chunk."""
+    metadata = metadata or {}
+    guids = set(str(metadata.get("turn_guids") or "").split("|"))
+    guids.add(str(metadata.get("turn_guid") or ""))
+    guids.discard("")
+    return guids
+
+
+def isMemoryChunk(metadata: Optional[dict]) -> bool:
+    """Turn chunks and their summaries; older turns were tagged "Memory"."""
+    return str((metadata or {}).get("source", "")).lower() in (TURN_SOURCE, SUMMARY_SOURCE)
+
+
+def _setting(name: str, default):
+    value = MEMORY_CONFIG.get(name, default)
+    return default if value is None else value
+
+
+def _load_state(db_path: Path) -> dict:
+    try:
+        with open(db_path / STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"summarized_through": "", "summaries": []}
+
+
+def _save_state(db_path: Path, state: dict):
+    tmp_path = db_path / f".{STATE_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, db_path / STATE_FILE)
+
+
+def _pending_turns(db_path: Path, summarized_through: str) -> list[dict]:
+    """Turns past the verbatim window: older than the newest keep_recent_turns
+    or older than max_age_days, whichever reaches further."""
+    chat_db = db_path / CHAT_DB_NAME
+    if not chat_db.is_file():
+        return []
+    with sqlite3.connect(chat_db) as conn:
+        rows = conn.execute(
+            "SELECT GUID, USER, AEON, TIMESTAMP FROM conversations "
+            "WHERE TIMESTAMP > ? ORDER BY TIMESTAMP", (summarized_through,)).fetchall()
+    turns = [{"guid": g, "user": u or "", "aeon": a or "", "timestamp": t} for g, u, a, t in rows]
+
+    keep_recent = int(_setting("keep_recent_turns", 20))
+    eligible = max(len(turns) - keep_recent, 0)
+    cutoff = _age_cutoff()
+    if cutoff:
+        eligible = max(eligible, sum(1 for turn in turns if turn["timestamp"] < cutoff))
+    return turns[:eligible]
+
+
+def _age_cutoff() -> str:
+    max_age_days = _setting("max_age_days", 0)
+    return (datetime.now() - timedelta(days=max_age_days)).isoformat() if max_age_days else ""
+
+
+def _batch_due(batch: list[dict], batch_size: int, cutoff: str) -> bool:
+    """Full batches are folded right away, a short one once it has all aged out."""
+    return bool(batch) and (len(batch) >= batch_size or bool(cutoff and batch[-1]["timestamp"] < cutoff))
+
+
+def _summarize(llm, excerpt: str) -> str:
+    prompt = SUMMARY_PROMPT.format(excerpt=excerpt[-MAX_PROMPT_CHARS:])
+    with llmLock(llm):
+        summary = llm.invoke(prompt, max_tokens=int(_setting("summary_max_tokens", 200)))
+    return summary.strip()
+
+
+def _turns_excerpt(turns: list[dict]) -> str:
+    return "\n".join(f"USER: {t['user']}\nAEON: {t['aeon']}" for t in turns)
+
+
+def _live_turn_guids(db_path: Path, after: str) -> set[str]:
+    """Turns newer than after, which consolidation has not folded yet."""
+    with sqlite3.connect(db_path / CHAT_DB_NAME) as conn:
+        rows = conn.execute("SELECT GUID FROM conversations WHERE TIMESTAMP > ?", (after,)).fetchall()
+    return {guid for (guid,) in rows}
+
+
+def _chunks_for_turns(vectorstore, guids: set[str]) -> list[tuple[str, dict]]:
+    if hasattr(vectorstore, "_collection"):
+        # Only turn_guid is queryable; a merged chunk is revisited at the
+        # latest when the turn it names is folded, and _release_turns keeps
+        # that name pointing at a live turn.
+        found = vectorstore.get(where={"turn_guid": {"$in": sorted(guids)}}, include=["metadatas"])
+    else:
+        found = vectorstore.get(include=["metadatas"])
+    return [(doc_id, metadata or {}) for doc_id, metadata in zip(found["ids"], found["metadatas"])
+            if turnGuids(metadata) & guids]
+
+
+def _release_turns(vectorstore, guids: set[str], live: set[str]) -> int:
+    """Drops the folded turns from their chunks; returns the chunks deleted.
+
+    A chunk that deduplication shared with a turn still in the verbatim
+    window stays, tagged with the remaining turns only.
+    """
+    stale_ids, kept_ids, kept_metadatas = [], [], []
+    for doc_id, metadata in _chunks_for_turns(vectorstore, guids):
+        remaining = (turnGuids(metadata) - guids) & live
+        if not remaining:
+            stale_ids.append(doc_id)
+            continue
+        kept_ids.append(doc_id)
+        kept_metadatas.append(dict(metadata, turn_guid=min(remaining),
+                                   turn_guids="|".join(sorted(remaining))))
+    if kept_ids:
+        updateMetadata(vectorstore, kept_ids, kept_metadatas)
+    if stale_ids:
+        vectorstore.delete(ids=stale_ids)
+    return len(stale_ids)
+
+
+def _add_summary(vectorstore, text: str, level: int, first: str, last: str, turns: int) -> str:
+    summary_id = f"summary-{uuid.uuid4()}"
+    vectorstore.add_documents([Document(
+        page_content=f"Summary of the conversation from {first} to {last}:\n{text}",
+        metadata={"source": SUMMARY_SOURCE, "tier": "summary", "level": level,
+                  "from": first, "to": last, "turns": turns},
+    )], ids=[summary_id])
+    return summary_id
+
+
+def _roll_up_summaries(vectorstore, llm, state: dict) -> int:
+    """Merges the oldest summaries once there are more than max_summaries."""
+    max_summaries = int(_setting("max_summaries", 50))
+    batch = max(2, int(_setting("batch_turns", 10)))
+    merged = 0
+    while max_summaries and len(state["summaries"]) > max_summaries:
+        oldest = state["summaries"][:batch]
+        excerpt = "\n\n".join(s["text"] for s in oldest)
+        text = _summarize(llm, excerpt)
+        level = max(s["level"] for s in oldest) + 1
+        turns = sum(s["turns"] for s in oldest)
+        summary_id = _add_summary(vectorstore, text, level, oldest[0]["from"], oldest[-1]["to"], turns)
+        vectorstore.delete(ids=[s["id"] for s in oldest])
+        state["summaries"] = [{"id": summary_id, "level": level, "from": oldest[0]["from"],
+                               "to": oldest[-1]["to"], "turns": turns, "text": text}] + state["summaries"][batch:]
+        merged += len(oldest)
+    return merged
+
+
+def consolidateMemory(vectorstore, llm, conv_path: Path) -> int:
+    """Replaces raw chunks of old turns with LLM summaries; returns turns folded.
+
+    Turns are summarised in batches of batch_turns. A shorter final batch is
+    only folded once every turn in it is past max_age_days.
+    """
+    db_path = Path(conv_path) / "db"
+    state = _load_state(db_path)
+    pending = _pending_turns(db_path, state.get("summarized_through", ""))
+    batch_size = max(1, int(_setting("batch_turns", 10)))
+    cutoff = _age_cutoff()
+
+    folded = 0
+    for start in range(0, len(pending), batch_size):
+        batch = pending[start:start + batch_size]
+        if not _batch_due(batch, batch_size, cutoff):
+            break
+        text = _summarize(llm, _turns_excerpt(batch))
+        if not text:
+            continue
+        first, last = batch[0]["timestamp"], batch[-1]["timestamp"]
+        summary_id = _add_summary(vectorstore, text, 0, first, last, len(batch))
+        _release_turns(vectorstore, {turn["guid"] for turn in batch}, _live_turn_guids(db_path, last))
+
+        state.setdefault("summaries", []).append(
+            {"id": summary_id, "level": 0, "from": first, "to": last, "turns": len(batch), "text": text})
+        state["summarized_through"] = last
+        _save_state(db_path, state)
+        folded += len(batch)
+
+    if _roll_up_summaries(vectorstore, llm, state):
+        _save_state(db_path, state)
+    if folded:
+        print_info_message(f"Memory consolidated: {folded} older turns replaced by summaries.")
+    return folded
+
+
+def scheduleMemoryConsolidation(vectorstore, llm, conv_path: Path) -> bool:
+    """Starts a background consolidation when a full batch of turns is due."""
+    if not _setting("enabled", True) or vectorstore is None or llm is None:
+        return False
+    db_path = Path(conv_path) / "db"
+    state = _load_state(db_path)
+    pending = _pending_turns(db_path, state.get("summarized_through", ""))
+    batch_size = max(1, int(_setting("batch_turns", 10)))
+    if not _batch_due(pending[:batch_size], batch_size, _age_cutoff()):
+        return False
+    key = str(db_path.resolve())
+    with _running_lock:
+        if key in _running:
+            return False
+        _running.add(key)
+
+    def _run():
+        try:
+            consolidateMemory(vectorstore, llm, conv_path)
+        except Exception as e:
+            print_error_message(f"Memory consolidation failed: {e}")
+        finally:
+            with _running_lock:
+                _running.discard(key)
+
+    startBackgroundTask(db_path, "memory-consolidation", _run)
+    return True
@@ -0,0 +1,607 @@
+# src/core/mmapStore.py
+import json
+import mmap
+import os
+import shutil
+import struct
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from src.core.annIndex import FlatIndex, createANNIndex, removeIndexDir
+from src.libs.messages import print_error_message, print_info_message
+
+META_FILE = "meta.json"
+DOCS_FILE = "docs.jsonl"
+IDS_FILE = "ids.txt"
+DELETED_FILE = "deleted.txt"
+STORE_VERSION = 2
+# Version 1 kept one generation's files in the store folder itself.
+V1_SEGMENT_FILES = ("vectors.npy", "norms.npy", "offsets.npy", DOCS_FILE, IDS_FILE, DELETED_FILE)
+V1_INDEX_FILES = ("ivf_centroids.npy", "ivf_rows.npy", "ivf_bounds.npy")
+
+NPY_HEADER_SIZE = 128
+GROWTH_ROWS = 1024
+COPY_BATCH_ROWS = 8192
+
+INDEX_MIN_ROWS = 20000
+REBUILD_RATIO = 0.1
+COMPACT_RATIO = 0.2
+COMPACT_MIN_ROWS = 1000
+
+
+def _npy_header(dtype: np.dtype, shape: tuple) -> bytes:
+    """A version 1.0 .npy header padded to a fixed size.
+
+    The fixed size lets the capacity in the shape grow in place without
+    moving any data.
+    """
+    shape_repr = f"({shape[0]},)" if len(shape) == 1 else f"({shape[0]}, {shape[1]})"
+    header = f"{{'descr': '{dtype.str}', 'fortran_order': False, 'shape': {shape_repr}, }}"
+    prefix = b"\x93NUMPY\x01\x00"
+    body_size = NPY_HEADER_SIZE - len(prefix) - 2
+    return prefix + struct.pack("<H", body_size) + header.ljust(body_size - 1).encode("latin1") + b"\n"
+
+
+class AppendOnlyArray:
+    """A .npy file with spare capacity, read through a shared memory map.
+
+    Only the first `count` rows are valid; the count lives in meta.json so
+    a crash between appending rows and committing them leaves no trace.
+    """
+
+    def __init__(self, path: Path, dtype, width: Optional[int] = None):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.width = width
+        self._map: Optional[np.ndarray] = None
+
+    @property
+    def capacity(self) -> int:
+        return 0 if self._map is None else len(self._map)
+
+    def _shape(self, rows: int) -> tuple:
+        return (rows,) if self.width is None else (rows, self.width)
+
+    def _row_bytes(self) -> int:
+        return self.dtype.itemsize * (self.width or 1)
+
+    def open(self):
+        self._map = np.load(self.path, mmap_mode='r') if self.path.is_file() else None
+
+    def close(self):
+        self._map = None
+
+    def view(self, count: int) -> np.ndarray:
+        if self._map is None:
+            return np.empty(self._shape(0), dtype=self.dtype)
+        return self._map[:count]
+
+    def append(self, rows: np.ndarray, count: int):
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        needed = count + len(rows)
+        capacity = self.capacity
+        self.close()
+        mode = 'r+b' if self.path.is_file() else 'w+b'
+        with open(self.path, mode) as f:
+            if needed > capacity:
+                capacity = max(capacity * 2, needed, GROWTH_ROWS)
+                f.seek(0)
+                f.write(_npy_header(self.dtype, self._shape(capacity)))
+                f.truncate(NPY_HEADER_SIZE + capacity * self._row_bytes())
+            f.seek(NPY_HEADER_SIZE + count * self._row_bytes())
+            f.write(rows.tobytes())
+        self.open()
+
+
+class _SegmentSnapshot(NamedTuple):
+    """Read-only views of a segment, safe to use after the lock is released."""
+    vectors: np.ndarray
+    norms: np.ndarray
+    offsets: np.ndarray
+    docs_map: Optional[mmap.mmap]
+    ids: list
+
+
+class _Segment:
+    """The files of one store generation: rows, documents, ids and tombstones."""
+
+    def __init__(self, directory: Path, dimensions: Optional[int]):
+        self.directory = directory
+        self.vectors = AppendOnlyArray(directory / "vectors.npy", np.float32, dimensions)
+        self.norms = AppendOnlyArray(directory / "norms.npy", np.float32)
+        self.offsets = AppendOnlyArray(directory / "offsets.npy", np.int64, 2)
+        self.count = 0
+        self.ids_size = 0
+        self.docs_size = 0
+        self.docs_map: Optional[mmap.mmap] = None
+
+    def open(self, count: int, ids_size: int, docs_size: int):
+        self.count, self.ids_size, self.docs_size = count, ids_size, docs_size
+        for array in (self.vectors, self.norms, self.offsets):
+            array.open()
+        self._map_docs()
+
+    def _map_docs(self):
+        docs_path = self.directory / DOCS_FILE
+        self.docs_map = None
+        if docs_path.is_file() and docs_path.stat().st_size:
+            with open(docs_path, 'rb') as f:
+                self.docs_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_ids(self) -> list[str]:
+        with open(self.directory / IDS_FILE, 'rb') as f:
+            return f.read(self.ids_size).decode("utf-8").splitlines()
+
+    def read_tombstones(self) -> list[int]:
+        deleted_path = self.directory / DELETED_FILE
+        if not deleted_path.is_file():
+            return []
+        with open(deleted_path, 'r', encoding='utf-8') as f:
+            return [row for row in (int(line) for line in f if line.strip()) if row < self.count]
+
+    def snapshot(self, ids: list) -> _SegmentSnapshot:
+        return _SegmentSnapshot(self.vectors.view(self.count), self.norms.view(self.count),
+                                self.offsets.view(self.count), self.docs_map, ids)
+
+    def record(self, row: int) -> bytes:
+        offset, length = self.offsets.view(self.count)[row]
+        return self.docs_map[offset:offset + length]
+
+    def _append_bytes(self, name: str, committed_size: int, data: bytes) -> int:
+        """Appends after the committed size, dropping any uncommitted tail."""
+        path = self.directory / name
+        with open(path, 'r+b' if path.is_file() else 'w+b') as f:
+            f.truncate(committed_size)
+            f.seek(committed_size)
+            f.write(data)
+        return committed_size + len(data)
+
+    def append(self, vectors: np.ndarray, norms: np.ndarray, records: list[bytes], ids: list[str]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        spans = []
+        offset = self.docs_size
+        for record in records:
+            spans.append((offset, len(record)))
+            offset += len(record) + 1
+        self.docs_size = self._append_bytes(
+            DOCS_FILE, self.docs_size, b"".join(record + b"\n" for record in records))
+        self.ids_size = self._append_bytes(
+            IDS_FILE, self.ids_size, "".join(f"{doc_id}\n" for doc_id in ids).encode("utf-8"))
+        self.vectors.append(vectors, self.count)
+        self.norms.append(norms, self.count)
+        self.offsets.append(np.array(spans, dtype=np.int64).reshape(-1, 2), self.count)
+        self.count += len(ids)
+        self._map_docs()
+
+    def append_tombstones(self, rows: Iterable[int]):
+        lines = "".join(f"{row}\n" for row in rows)
+        if lines:
+            with open(self.directory / DELETED_FILE, 'a', encoding='utf-8') as f:
+                f.write(lines)
+
+    def copy_rows(self, source: _SegmentSnapshot, rows: np.ndarray):
+        for start in range(0, len(rows), COPY_BATCH_ROWS):
+            batch = rows[start:start + COPY_BATCH_ROWS]
+            records = [source.docs_map[o:o + n] for o, n in source.offsets[batch]]
+            self.append(source.vectors[batch], source.norms[batch], records,
+                        [source.ids[row] for row in batch])
+
+
+class MmapVectorStore(VectorStore):
+    """Vector store kept in memory-mapped .npy files with append-only writes.
+
+    Opening a store maps the vector, norm and offset matrices of the
+    current generation and reads its id list; documents are decoded lazily
+    from docs.jsonl. Deletes and re-added ids are recorded as tombstones.
+
+    Rows are searched through an ANN index snapshot plus an exhaustive scan
+    of rows added since it was built. Index rebuilds and compaction run on
+    a background thread and swap in when finished, so queries keep using
+    the previous snapshot meanwhile. One process writes a store at a time;
+    any number can read it and share the page cache.
+    """
+
+    def __init__(self,
+                 persist_directory: str,
+                 embedding_function: Embeddings,
+                 index_params: Optional[dict] = None,
+                 compact_ratio: float = COMPACT_RATIO,
+                 background: bool = True):
+        self.persist_directory = Path(persist_directory)
+        self._embedding_function = embedding_function
+        self.index_params = dict(index_params or {"type": "ivf"})
+        self.index_type = self.index_params.get("type", "ivf")
+        self.index_min_rows = int(self.index_params.get("min_rows", INDEX_MIN_ROWS))
+        self.rebuild_ratio = float(self.index_params.get("rebuild_ratio", REBUILD_RATIO))
+        self.compact_ratio = float(compact_ratio)
+        self.background = background
+        self._lock = threading.RLock()
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._reset()
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding_function
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def _segment_dir(self, generation: int) -> Path:
+        return self.persist_directory / f"g{generation:06d}"
+
+    def _reset(self):
+        self._generation = 0
+        self._dimensions: Optional[int] = None
+        self._segment = _Segment(self._segment_dir(0), None)
+        self._ids: list[str] = []
+        self._row_of: dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._index = FlatIndex()
+        self._meta_mtime_ns = None
+
+    def _load(self):
+        meta_path = self.persist_directory / META_FILE
+        if not meta_path.is_file():
+            return
+        self._meta_mtime_ns = meta_path.stat().st_mtime_ns
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        version = meta.get("version", 1)
+        if version == 1:
+            meta = self._migrate_v1(meta)
+        elif version != STORE_VERSION:
+            raise ValueError(
+                f"'{self.persist_directory}' is a version {version} vector store; "
+                f"this build reads version {STORE_VERSION}.")
+        self._generation = meta["generation"]
+        self._dimensions = meta["dimensions"]
+        self._segment = _Segment(self._segment_dir(self._generation), self._dimensions)
+        self._segment.open(meta["count"], meta["ids_size"], meta["docs_size"])
+
+        self._ids = self._segment.read_ids()
+        self._alive = np.ones(self._segment.count, dtype=bool)
+        self._alive[self._segment.read_tombstones()] = False
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self._ids) if self._alive[row]}
+
+        index_meta = meta.get("index") or {}
+        built_count = index_meta.get("built_count", 0)
+        if built_count and index_meta.get("type") == self.index_type:
+            index = createANNIndex(self.index_params)
+            index.load(self._segment.directory / f"index-{built_count}", built_count)
+            self._index = index
+
+    def _migrate_v1(self, meta: dict) -> dict:
+        """Moves a version 1 store's files into generation 0, in place.
+
+        Files are moved before meta.json is rewritten, so an interrupted
+        migration is simply run again on the next open. The old IVF index
+        is dropped and rebuilt by background maintenance.
+        """
+        segment_dir = self._segment_dir(0)
+        segment_dir.mkdir(parents=True, exist_ok=True)
+        for name in V1_SEGMENT_FILES:
+            source = self.persist_directory / name
+            if source.is_file():
+                os.replace(source, segment_dir / name)
+        for name in V1_INDEX_FILES:
+            (self.persist_directory / name).unlink(missing_ok=True)
+        migrated = {
+            "version": STORE_VERSION,
+            "generation": 0,
+            "dimensions": meta["dimensions"],
+            "count": meta["count"],
+            "ids_size": meta["ids_size"],
+            "docs_size": meta["docs_size"],
+            "index": None,
+        }
+        meta_path = self.persist_directory / META_FILE
+        tmp_path = self.persist_directory / f".{META_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(migrated, f, indent=2)
+        os.replace(tmp_path, meta_path)
+        self._meta_mtime_ns = meta_path.stat().st_mtime_ns
+        print_info_message(f"Upgraded vector store '{self.persist_directory}' to version {STORE_VERSION}.")
+        return migrated
+
+    def _refresh(self):
+        """Picks up changes committed by another process since the last read."""
+        meta_path = self.persist_directory / META_FILE
+        try:
+            mtime_ns = meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns != self._meta_mtime_ns:
+            self._reset()
+            self._load()
+
+    def _write_meta(self):
+        meta = {
+            "version": STORE_VERSION,
+            "generation": self._generation,
+            "dimensions": self._dimensions,
+            "count": self._segment.count,
+            "ids_size": self._segment.ids_size,
+            "docs_size": self._segment.docs_size,
+            "index": {"type": self._index.kind, "built_count": self._index.built_count},
+        }
+        self.persist_directory.mkdir(parents=True, exist_ok=True)
+        meta_path = self.persist_directory / META_FILE
+        tmp_path = self.persist_directory / f".{META_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, meta_path)
+        self._meta_mtime_ns = meta_path.stat().st_mtime_ns
+
+    def _tombstone(self, rows: list[int]):
+        if rows:
+            self._segment.append_tombstones(rows)
+            self._alive[rows] = False
+
+    def _document(self, row: int) -> Document:
+        record = json.loads(self._segment.record(row))
+        return Document(page_content=record["text"], metadata=record["metadata"], id=record["id"])
+
+    def add_vectors(self, vectors: np.ndarray, texts: list[str],
+                    metadatas: Optional[list[dict]] = None,
+                    ids: Optional[list[str]] = None) -> list[str]:
+        """Appends pre-computed embeddings; used by add_texts and the migration tool."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+        records = [json.dumps({"id": doc_id, "text": text, "metadata": metadata},
+                              ensure_ascii=False).encode("utf-8")
+                   for doc_id, text, metadata in zip(ids, texts, metadatas)]
+
+        with self._lock:
+            self._refresh()
+            if self._dimensions is None:
+                self._dimensions = vectors.shape[1]
+                self._segment = _Segment(self._segment_dir(self._generation), self._dimensions)
+            elif vectors.shape[1] != self._dimensions:
+                raise ValueError(f"Expected {self._dimensions}-d vectors, got {vectors.shape[1]}.")
+
+            replaced = [self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of]
+            first_row = self._segment.count
+            self._segment.append(vectors, (vectors ** 2).sum(axis=1), records, ids)
+            self._ids.extend(ids)
+            self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+            self._tombstone(replaced)
+            for row, doc_id in enumerate(ids, start=first_row):
+                self._row_of[doc_id] = row
+            self._write_meta()
+            self._schedule_maintenance()
+        return ids
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[list[dict]] = None,
+                  ids: Optional[list[str]] = None, **kwargs: Any) -> list[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self._embedding_function.embed_documents(texts)
+        return self.add_vectors(np.asarray(vectors), texts, metadatas, ids)
+
+    def delete(self, ids: Optional[list[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            self._refresh()
+            rows = [self._row_of.pop(doc_id) for doc_id in set(ids) if doc_id in self._row_of]
+            self._tombstone(rows)
+            if rows:
+                self._write_meta()
+                self._schedule_maintenance()
+        return bool(rows)
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict]):
+        """Re-appends the rows with new metadata; the old rows become tombstones."""
+        with self._lock:
+            self._refresh()
+            known = [(doc_id, metadata) for doc_id, metadata in zip(ids, metadatas)
+                     if doc_id in self._row_of]
+            if not known:
+                return
+            rows = [self._row_of[doc_id] for doc_id, _ in known]
+            vectors = np.array(self._segment.vectors.view(self._segment.count)[rows])
+            texts = [self._document(row).page_content for row in rows]
+            self.add_vectors(vectors, texts, [m for _, m in known], [doc_id for doc_id, _ in known])
+
+    def get(self, ids: Optional[list[str]] = None, include: Optional[list[str]] = None) -> dict:
+        """Chroma-style bulk read used by maintenance tools."""
+        include = include or ["documents", "metadatas"]
+        with self._lock:
+            self._refresh()
+            if ids is None:
+                rows = sorted(self._row_of.values())
+            else:
+                rows = [self._row_of[doc_id] for doc_id in ids if doc_id in self._row_of]
+            docs = [self._document(row) for row in rows]
+            result = {"ids": [doc.id for doc in docs]}
+            if "documents" in include:
+                result["documents"] = [doc.page_content for doc in docs]
+            if "metadatas" in include:
+                result["metadatas"] = [doc.metadata for doc in docs]
+            if "embeddings" in include:
+                result["embeddings"] = np.array(self._segment.vectors.view(self._segment.count)[rows])
+        return result
+
+    # Maintenance
+
+    def _needs_index(self) -> bool:
+        if self.index_type == "flat" or self._segment.count < self.index_min_rows:
+            return False
+        built = self._index.built_count
+        return not built or self._segment.count - built > built * self.rebuild_ratio
+
+    def _needs_compaction(self) -> bool:
+        dead = self._segment.count - len(self._row_of)
+        return (self.compact_ratio > 0 and dead >= COMPACT_MIN_ROWS
+                and dead > self._segment.count * self.compact_ratio)
+
+    def _schedule_maintenance(self):
+        if not (self._needs_compaction() or self._needs_index()):
+            return
+        if not self.background:
+            self._run_maintenance()
+        elif self._maintenance_thread is None or not self._maintenance_thread.is_alive():
+            self._maintenance_thread = threading.Thread(
+                target=self._run_maintenance, name="vector-store-maintenance", daemon=True)
+            self._maintenance_thread.start()
+
+    def _run_maintenance(self):
+        try:
+            while True:
+                with self._lock:
+                    compact, index = self._needs_compaction(), self._needs_index()
+                if compact:
+                    self.compact()
+                elif index:
+                    self.rebuild_index()
+                else:
+                    return
+        except Exception as e:
+            print_error_message(f"Vector store maintenance failed for '{self.persist_directory}': {e}")
+
+    def wait_for_maintenance(self, timeout: Optional[float] = None):
+        thread = self._maintenance_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _build_index(self, vectors: np.ndarray, alive: np.ndarray, directory: Path):
+        if self.index_type == "flat" or len(vectors) < self.index_min_rows:
+            return FlatIndex()
+        index = createANNIndex(self.index_params)
+        index.build(vectors, alive, directory / f"index-{len(vectors)}")
+        return index
+
+    def rebuild_index(self) -> bool:
+        """Builds a new index snapshot off the lock and swaps it in."""
+        with self._lock:
+            self._refresh()
+            generation, count = self._generation, self._segment.count
+            snapshot = self._segment.snapshot(self._ids)
+            alive = self._alive.copy()
+            directory = self._segment.directory
+
+        index = self._build_index(snapshot.vectors, alive, directory)
+        with self._lock:
+            if self._generation != generation or self._index.built_count >= index.built_count:
+                if index.built_count:
+                    removeIndexDir(directory / f"index-{index.built_count}")
+                return False
+            previous, self._index = self._index, index
+            self._write_meta()
+        if previous.built_count:
+            removeIndexDir(directory / f"index-{previous.built_count}")
+        print_info_message(f"Rebuilt {index.kind} index over {count} vectors.")
+        return True
+
+    def compact(self) -> int:
+        """Rewrites live rows into a new generation; returns the rows dropped.
+
+        Rows added or deleted while the copy runs are carried over before
+        the switch, and the new generation gets its index before queries
+        move to it.
+        """
+        with self._lock:
+            self._refresh()
+            generation, count = self._generation, self._segment.count
+            if len(self._row_of) == count:
+                return 0
+            snapshot = self._segment.snapshot(self._ids)
+            keep = np.flatnonzero(self._alive)
+            old_directory = self._segment.directory
+
+        target = _Segment(self._segment_dir(generation + 1), self._dimensions)
+        shutil.rmtree(target.directory, ignore_errors=True)
+        target.directory.mkdir(parents=True)
+        target.copy_rows(snapshot, keep)
+        index = self._build_index(target.vectors.view(target.count),
+                                  np.ones(target.count, dtype=bool), target.directory)
+
+        with self._lock:
+            if self._generation != generation:
+                shutil.rmtree(target.directory, ignore_errors=True)
+                return 0
+            tail = np.arange(count, self._segment.count)
+            target.copy_rows(self._segment.snapshot(self._ids), tail)
+            moved = np.concatenate([keep, tail])
+            target.append_tombstones(np.flatnonzero(~self._alive[moved]))
+
+            self._generation = generation + 1
+            self._segment = target
+            self._index = index
+            self._write_meta()
+            self._reset()
+            self._load()
+        shutil.rmtree(old_directory, ignore_errors=True)
+
+        dropped = count - len(keep)
+        print_info_message(f"Compacted vector store: {dropped} deleted rows reclaimed.")
+        return dropped
+
+    # Search
+
+    def _candidate_rows(self, query: np.ndarray, k: int) -> Optional[np.ndarray]:
+        indexed = self._index.candidates(query, k)
+        if indexed is None:
+            return None
+        tail = np.arange(self._index.built_count, self._segment.count, dtype=np.int64)
+        rows = np.concatenate([indexed, tail])
+        return rows[self._alive[rows]]
+
+    def similarity_search_by_vector_with_relevance_scores(
+            self, embedding: list[float], k: int = 4, **kwargs: Any) -> list[tuple[Document, float]]:
+        with self._lock:
+            self._refresh()
+            if not self._row_of:
+                return []
+            query = np.asarray(embedding, dtype=np.float32)
+            vectors = self._segment.vectors.view(self._segment.count)
+            norms = self._segment.norms.view(self._segment.count)
+
+            rows = self._candidate_rows(query, k)
+            if rows is None:
+                distances = norms - 2.0 * (vectors @ query)
+                distances[~self._alive] = np.inf
+                rows = np.arange(self._segment.count)
+            else:
+                distances = norms[rows] - 2.0 * (vectors[rows] @ query)
+            distances = distances + float(query @ query)
+
+            k = min(k, int(np.isfinite(distances).sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(distances, k - 1)[:k]
+            top = top[np.argsort(distances[top])]
+            return [(self._document(int(rows[i])), float(max(distances[i], 0.0))) for i in top]
+
+    def similarity_search_with_score(self, query: str, k: int = 4,
+                                     **kwargs: Any) -> list[tuple[Document, float]]:
+        embedding = self._embedding_function.embed_query(query)
+        return self.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4,
+                                    **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_relevance_scores(embedding, k=k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k)]
+
+    def _select_relevance_score_fn(self):
+        return self._euclidean_relevance_score_fn
+
+    @classmethod
+    def from_texts(cls, texts: list[str], embedding: Embeddings,
+                   metadatas: Optional[list[dict]] = None,
+                   persist_directory: str = "", **kwargs: Any) -> "MmapVectorStore":
+        store = cls(persist_directory=persist_directory, embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas)
+        return store
@@ -0,0 +1,177 @@
+# src/core/modelCache.py
+import copy
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import yaml
+from langchain_community.embeddings import LlamaCppEmbeddings
+from langchain_community.llms import LlamaCpp
+
+from src.config import config
+from src.core.llamaRuntime import runtimeKey, runtimeParams
+from src.core.speculative import buildDraftModel, speculativeKey
+from src.libs.embeddingCache import cachedEmbeddings
+from src.libs.messages import print_error_message, print_info_message
+from src.libs.metrics import CACHE_LOOKUPS, LOADED_MODELS
+from src.libs.tracing import span
+
+CONFIG_NAME = "config.yml"
+# Loaded models kept per kind; conversations still using an evicted model
+# keep their own reference to it.
+MAX_CACHED_MODELS = 2
+LLM_STOP = ["<|im_end|>", "\nQUESTION:", "\nCONTEXT:", "\nUSER:", "RESPONSE:"]
+
+_llms: "OrderedDict[tuple, LlamaCpp]" = OrderedDict()
+_embeddings: "OrderedDict[tuple, LlamaCppEmbeddings]" = OrderedDict()
+_cache_lock = threading.RLock()
+LOADED_MODELS.set_function(lambda: {("llm",): len(_llms), ("embeddings",): len(_embeddings)})
+
+
+def _deep_merge(base: dict, override: dict) -> dict:
+    merged = copy.deepcopy(base)
+    for key, value in (override or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def configMtime(conversation_memory_path: Path) -> Optional[float]:
+    try:
+        return (Path(conversation_memory_path) / CONFIG_NAME).stat().st_mtime
+    except OSError:
+        return None
+
+
+def conversationSettings(conversation_memory_path: Path) -> dict:
+    """The global config with the conversation's own config.yml laid over it."""
+    config_path = Path(conversation_memory_path) / CONFIG_NAME
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            conv_config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        conv_config = {}
+    except (OSError, yaml.YAMLError) as e:
+        print_error_message(f"Could not read {config_path}, using global config: {e}")
+        conv_config = {}
+    if not isinstance(conv_config, dict):
+        conv_config = {}
+    return _deep_merge(config, conv_config)
+
+
+def _model_key(model_path: str, n_ctx: int) -> tuple:
+    return str(Path(model_path).resolve()), int(n_ctx)
+
+
+def _cache_get(cache: OrderedDict, key: tuple, load, name: str):
+    with _cache_lock:
+        if key in cache:
+            CACHE_LOOKUPS.inc(cache=name, result="hit")
+            cache.move_to_end(key)
+            return cache[key]
+        CACHE_LOOKUPS.inc(cache=name, result="miss")
+        with span("model.load", kind=name, model=key[0], n_ctx=key[1]):
+            instance = load()
+        cache[key] = instance
+        while len(cache) > MAX_CACHED_MODELS:
+            cache.popitem(last=False)
+        return instance
+
+
+def getEmbeddings(emb_config: dict, local: bool = False, cache: bool = True) -> LlamaCppEmbeddings:
+    """Shared embedding model for (model path, n_ctx, runtime settings).
+
+    With emb_config.service enabled, a client for the embedding daemon is
+    returned instead, so all processes share one loaded model; local forces
+    loading it in this process. Either way vectors already in the
+    persistent embedding cache are returned without a model call, unless
+    cache is False (benchmarks measure the model itself).
+    """
+    def _wrap(embeddings):
+        return cachedEmbeddings(embeddings, emb_config["model"]) if cache else embeddings
+
+    if not local and (emb_config.get("service") or {}).get("enabled"):
+        from src.core.embeddingService import connectEmbeddingService
+
+        service = connectEmbeddingService(emb_config)
+        if service is not None:
+            return _wrap(service)
+    runtime = runtimeParams(emb_config, "emb")
+
+    def _load():
+        from llama_cpp import Llama
+
+        print_info_message(f"Loading embedding model: {emb_config['model']}")
+        # LlamaCppEmbeddings only forwards a few llama.cpp settings, so the
+        # client is built here with all of them.
+        client = Llama(
+            model_path=emb_config["model"],
+            embedding=True,
+            n_ctx=emb_config["n_ctx"],
+            verbose=False,
+            **runtime)
+        embeddings = LlamaCppEmbeddings(
+            model_path=emb_config["model"],
+            n_ctx=emb_config["n_ctx"],
+            client=client,
+            verbose=False)
+        test_vector = embeddings.embed_query("Sanity check for embeddings.")
+        print_info_message(
+            f"Embedding model loaded successfully. Vector length = {len(test_vector)}")
+        return embeddings
+
+    key = _model_key(emb_config["model"], emb_config["n_ctx"]) + runtimeKey(runtime)
+    return _wrap(_cache_get(_embeddings, key, _load, "embeddings"))
+
+
+def getLlm(llm_config: dict) -> LlamaCpp:
+    """Shared LLM for (model path, n_ctx).
+
+    Sampling settings are not part of the key; chains bind their own, so
+    conversations that differ only in temperature or top_k share weights.
+    Speculative decoding and runtime settings are, since they are fixed at load.
+    """
+    runtime = runtimeParams(llm_config, "llm")
+
+    def _load():
+        print_info_message(f"Loading LLM: {llm_config['model']}")
+        draft_model = buildDraftModel(llm_config)
+        # LlamaCpp has fields for some llama.cpp settings; the rest go
+        # through model_kwargs.
+        fields = {key: runtime[key] for key in ("n_threads", "n_batch", "use_mmap", "use_mlock")
+                  if key in runtime}
+        model_kwargs = {key: value for key, value in runtime.items() if key not in fields}
+        if draft_model:
+            model_kwargs["draft_model"] = draft_model
+        return LlamaCpp(
+            model_path=llm_config["model"],
+            temperature=llm_config["temperature"],
+            top_p=llm_config["top_p"],
+            top_k=llm_config["top_k"],
+            n_ctx=llm_config["n_ctx"],
+            stop=LLM_STOP,
+            model_kwargs=model_kwargs,
+            verbose=False,
+            **fields,
+        )
+
+    key = (_model_key(llm_config["model"], llm_config["n_ctx"]) + speculativeKey(llm_config)
+           + runtimeKey(runtime))
+    return _cache_get(_llms, key, _load, "llm")
+
+
+def samplingParams(llm_config: dict) -> dict:
+    return {
+        "temperature": llm_config["temperature"],
+        "top_p": llm_config["top_p"],
+        "top_k": llm_config["top_k"],
+        "max_tokens": llm_config["max_new_token"],
+    }
+
+
+def sameEmbeddingModel(embeddings, emb_config: dict) -> bool:
+    """Vectors only stay comparable while the embedding weights are the same."""
+    return Path(embeddings.model_path).resolve() == Path(emb_config["model"]).resolve()
@@ -1,116 +1,122 @@
 import os
 import sys
+import time
 from pathlib import Path
-from langchain_community.document_loaders import (
-    DirectoryLoader, UnstructuredMarkdownLoader, TextLoader
-)
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_chroma import Chroma
-from langchain_core.runnables import RunnablePassthrough, RunnableParallel
-from langchain.chains.combine_documents import create_stuff_documents_chain
+from typing import Optional
+from langchain_core.vectorstores import VectorStore
+from langchain_core.runnables import Runnable, RunnableLambda, RunnablePassthrough, RunnableSerializable
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import LlamaCpp
 from langchain_community.embeddings import LlamaCppEmbeddings
 
-from src.libs.loaders import JsonPlaintextLoader
-
-from src.config import (
-    LLM_MODEL,
-    LLM_TEMPERATURE,
-    EMB_MODEL,
-    EMB_N_CTX,
-    EMB_CHUNK_SIZE,
-    EMB_CHUNK_OVERLAP,
-    INPUT_DIR,
-    SYSTEM_PROMPT,
-    SYSTEM_RAG_PROMPT,
-    LLM_N_CTX,
-    LLM_TOP_P,
-    LLM_TOP_K
+from src.core.chatWindow import buildHistoryWindow, llmTokenCounter, windowCoversQuestion
+from src.core.knowledgeBase import syncKnowledgeBase, watchKnowledgeBase
+from src.core.modelCache import (
+    configMtime, conversationSettings, getEmbeddings, getLlm, sameEmbeddingModel, samplingParams
+)
+from src.core.reranker import getReranker
+from src.core.retriever import MergedRetriever
+from src.core.speculative import draftOf
+from src.core.vectorStores import openVectorStore
+from src.libs.metrics import (
+    DRAFT_ACCEPTANCE, GENERATED_TOKENS, GENERATION_SECONDS, PROMPT_EVAL_SECONDS, PROMPT_TOKENS, TOKENS_PER_SECOND
 )
+from src.libs.splitter import buildTextSplitter
+from src.libs.tracing import span, traced
+
 from src.libs.messages import (
     print_error_message, print_info_message, print_success_message
 )
 
 
-def _load_initial_documents(input_dir_path: Path) -> list:
-    """Loads documents from a specified input directory."""
-    if not os.path.exists(input_dir_path):
-        print_error_message(
-            f"Directory '{input_dir_path}' not found. Please create it.")
-        sys.exit(1)
-
-    print_info_message(f"Loading initial documents...")
-    documents = []
-    documents.extend(DirectoryLoader(str(input_dir_path),
-                     glob="**/*.md", loader_cls=UnstructuredMarkdownLoader).load())
-    documents.extend(DirectoryLoader(str(input_dir_path),
-                     glob="**/*.txt", loader_cls=TextLoader).load())
-    for json_file in input_dir_path.glob("**/*.json"):
-        documents.extend(JsonPlaintextLoader(str(json_file)).load())
-    return documents
-
-
-def _get_or_create_vectorstore(chroma_db_dir_path: Path, chunks: list, embeddings: LlamaCppEmbeddings) -> Chroma:
-    """Loads an existing Chroma vector store or creates a new one with chunks."""
-    batch_size = 32
+def _get_or_create_vectorstore(chroma_db_dir_path: Path, embeddings: LlamaCppEmbeddings) -> VectorStore:
+    """Opens the conversation's own store for memory, uploads and search results."""
     if chroma_db_dir_path.exists() and os.listdir(chroma_db_dir_path):
         print_info_message(
             f"Loading existing vector store...")
-        vectorstore = Chroma(persist_directory=str(
-            chroma_db_dir_path), embedding_function=embeddings)
-        if chunks:
-            print_info_message(
-                f"Adding {len(chunks)} new chunks to vector store.")
-            for i, chunk in enumerate(chunks, start=1):
-                try:
-                    vectorstore.add_documents([chunk])
-                    if i % 20 == 0 or i == len(chunks):
-                        print_info_message(f"Added {i}/{len(chunks)} chunks.")
-                except Exception as e:
-                    print_error_message(f"Failed on chunk {i}: {e}")
-        return vectorstore
     else:
         print_info_message(
             f"Vector store not found. Creating a new one at {chroma_db_dir_path}...")
-        vectorstore = Chroma(persist_directory=str(
-            chroma_db_dir_path), embedding_function=embeddings)
-        if chunks:
-            print_info_message(
-                f"Ingesting {len(chunks)} chunks into new vector store...")
-            for i, chunk in enumerate(chunks, start=1):
-                try:
-                    vectorstore.add_documents([chunk])
-                    if i % 20 == 0 or i == len(chunks):
-                        print_info_message(
-                            f"Ingested chunks {i + 1} to {min(i + batch_size, len(chunks))}.")
-                except Exception as e:
-                    print_error_message(
-                        f"Failed to ingest batch starting at index {i}: {e}")
-            print_success_message("Initial document ingestion complete.")
-        else:
-            print_info_message(
-                "No initial documents to ingest. Creating an empty vector store.")
-        return vectorstore
-
-
-def _initialize_models_and_chain(retriever, llm_model_path, system_prompt_template) -> tuple[LlamaCpp, RunnableParallel]:
-    print_info_message(f"Loading LLM: {llm_model_path}")
-    llm = LlamaCpp(
-        model_path=llm_model_path,
-        temperature=LLM_TEMPERATURE,
-        top_p=LLM_TOP_P,
-        top_k=LLM_TOP_K,
-        n_ctx=LLM_N_CTX,
-        stop=["<|im_end|>", "\nQUESTION:", "\nCONTEXT:","\nUSER:", "RESPONSE:"],
-        verbose=False,
-    )
+    return openVectorStore(chroma_db_dir_path, embeddings)
+
+
+def _prepare_inputs(inputs, count_tokens, window_config: dict) -> dict:
+    """Accepts a bare question or {"question", "history"} and adds the window."""
+    if isinstance(inputs, str):
+        inputs = {"question": inputs}
+    question = inputs["question"]
+    history = inputs.get("history") or []
+    window, turns_in_window = buildHistoryWindow(
+        history, count_tokens, window_config.get("max_turns"), window_config.get("max_tokens"))
+    return {
+        "question": question,
+        "history": window or "None",
+        "skip_memory": windowCoversQuestion(question, window, turns_in_window, len(history),
+                                            window_config.get("skip_memory_retrieval")),
+    }
+
+
+def _answer(inputs: dict, qa_prompt: PromptTemplate, chain_llm, count_tokens, draft=None) -> str:
+    """Stuffs the retrieved documents into the prompt and streams the answer.
+
+    Streaming is only used to time the first token, which marks the end of
+    prompt evaluation.
+    """
+    prompt = qa_prompt.format(
+        context="\n\n".join(doc.page_content for doc in inputs["context"]),
+        history=inputs["history"],
+        question=inputs["question"])
+    with span("rag.generate", context_docs=len(inputs["context"])) as generate_span:
+        drafted_before, accepted_before = draft.counts() if draft else (0, 0)
+        start = time.perf_counter()
+        first_token_at = None
+        pieces = []
+        for piece in chain_llm.stream(prompt):
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+            pieces.append(piece)
+        end = time.perf_counter()
+        answer = "".join(pieces)
+
+        generated = count_tokens(answer)
+        prompt_tokens = count_tokens(prompt)
+        generate_span.set(
+            prompt_tokens=prompt_tokens, generated_tokens=generated,
+            ttft_ms=round((first_token_at - start) * 1000.0, 3) if first_token_at else None)
+        if draft:
+            drafted, accepted = draft.counts()
+            drafted -= drafted_before
+            accepted -= accepted_before
+            generate_span.set(drafted_tokens=drafted, accepted_tokens=accepted)
+            if drafted:
+                DRAFT_ACCEPTANCE.observe(accepted / drafted)
+    PROMPT_TOKENS.observe(prompt_tokens)
+    GENERATED_TOKENS.observe(generated)
+    GENERATION_SECONDS.observe(end - start)
+    if first_token_at is not None:
+        PROMPT_EVAL_SECONDS.observe(first_token_at - start)
+        if generated > 1 and end > first_token_at:
+            TOKENS_PER_SECOND.observe((generated - 1) / (end - first_token_at))
+    return answer
+
+
+def _initialize_models_and_chain(retriever, llm_config: dict,
+                                 system_prompt_template) -> tuple[LlamaCpp, RunnableSerializable]:
+    llm = getLlm(llm_config)
+    # The model may be shared with other conversations, so this chain's own
+    # sampling settings are bound per call instead of set on the instance.
+    chain_llm: Runnable = llm.bind(**samplingParams(llm_config))
 
     qa_prompt = PromptTemplate.from_template(system_prompt_template)
     
-    retrieval_chain = RunnableParallel({"context": retriever, "question": RunnablePassthrough()})
+    count_tokens = llmTokenCounter(llm)
+    window_config = llm_config.get("history_window") or {}
+    retrieval_chain = RunnableLambda(
+        lambda inputs: _prepare_inputs(inputs, count_tokens, window_config)) | RunnablePassthrough.assign(
+        context=lambda inputs: retriever.invoke(inputs["question"], skip_memory=inputs["skip_memory"]))
     
-    answer_chain = create_stuff_documents_chain(llm, qa_prompt)
+    answer_chain = RunnableLambda(
+        lambda inputs: _answer(inputs, qa_prompt, chain_llm, count_tokens, draftOf(llm)))
     
     rag_chain = retrieval_chain | RunnablePassthrough.assign(answer=answer_chain)
 
@@ -118,45 +124,44 @@ def _initialize_models_and_chain(retriever, llm_model_path, system_prompt_templa
     return llm, rag_chain
 
 
+@traced("rag.init")
 def ragSystem(conversation_memory_path: Path,
-              chroma_db_dir_path: Path, is_new_session: bool):
-    project_root = Path(__file__).parent.parent.parent
-    input_dir_path = project_root / INPUT_DIR
-
-    documents = _load_initial_documents(input_dir_path)
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=EMB_CHUNK_SIZE,
-        chunk_overlap=EMB_CHUNK_OVERLAP,
-        length_function=len,
-    )
-    chunks = text_splitter.split_documents(documents)
+              chroma_db_dir_path: Path, is_new_session: bool,
+              vectorstore: Optional[VectorStore] = None):
+    """Builds a conversation's chain from its own config.yml.
 
-    print_info_message(f"Loading embedding model: {EMB_MODEL}")
-    llama_embeddings = LlamaCppEmbeddings(
-        model_path=EMB_MODEL, 
-        n_ctx=EMB_N_CTX, 
-        verbose=False)
+    Models come from a shared cache keyed by model path and n_ctx. An
+    already open vector store can be passed in to be reused.
+    """
+    settings = conversationSettings(conversation_memory_path)
+    llm_config, emb_config = settings["llm_config"], settings["emb_config"]
 
     try:
-        test_vector = llama_embeddings.embed_query(
-            "Sanity check for embeddings.")
-        print_info_message(
-            f"Embedding model loaded successfully. Vector length = {len(test_vector)}")
+        llama_embeddings = getEmbeddings(emb_config)
     except Exception as e:
         print_error_message(f"Failed to run embeddings: {e}")
         sys.exit(1)
 
-    vectorstore = _get_or_create_vectorstore(
-        chroma_db_dir_path, chunks, llama_embeddings)
-    retriever = vectorstore.as_retriever()
+    text_splitter = buildTextSplitter(llama_embeddings, emb_config)
+
+    knowledge_base = syncKnowledgeBase(llama_embeddings, text_splitter, emb_config["model"])
+    watchKnowledgeBase(llama_embeddings, text_splitter, emb_config["model"])
+    if vectorstore is None:
+        vectorstore = _get_or_create_vectorstore(
+            chroma_db_dir_path, llama_embeddings)
+    retriever = MergedRetriever(
+        vectorstores=[knowledge_base, vectorstore],
+        embeddings=llama_embeddings,
+        k=emb_config.get("retrieval_k", 4))
     llm, rag_chain = _initialize_models_and_chain(
         retriever,
-        LLM_MODEL,
+        llm_config,
         "<|im_start|>system\n"
-        f"{SYSTEM_PROMPT}\n"
-        f"{SYSTEM_RAG_PROMPT}"
+        f"{llm_config['llm_prompt']}\n"
+        f"{llm_config['llm_rag_prompt']}"
         "<|im_end|>\n"
         "<|im_start|>user\n"
+        "HISTORY:{history}\n"
         "CONTEXT:{context}\n"
         "QUESTION:{question}\n"
         "<|im_end|>\n"
@@ -164,4 +169,56 @@ def ragSystem(conversation_memory_path: Path,
         "RESPONSE:"
     )
 
+    rerank_config = emb_config.get("rerank") or {}
+    retriever.reranker = getReranker(rerank_config, llm)
+    if retriever.reranker is not None:
+        # A reranker picks fewer, better chunks out of a wider candidate set.
+        retriever.rerank_candidates = rerank_config.get("candidates", retriever.k * 3)
+        retriever.k = rerank_config.get("top_n", retriever.k)
+
     return rag_chain, vectorstore, text_splitter, llama_embeddings, llm
+
+
+def refreshRagSystem(state: dict) -> bool:
+    """Rebuilds a loaded conversation's chain once its config.yml has changed.
+
+    Unchanged models come from the cache and the vector store is kept, so
+    only what the edit touched is loaded. A different embedding model is
+    refused: the stored vectors would no longer be comparable. A model that
+    fails to load leaves the config pending, so it is retried next time.
+    """
+    conv_path = Path(state["current_memory_path"])
+    mtime = configMtime(conv_path)
+    if mtime == state.get("config_mtime"):
+        return False
+
+    settings = conversationSettings(conv_path)
+    embeddings = state.get("llama_embeddings")
+    if embeddings is not None and not sameEmbeddingModel(embeddings, settings["emb_config"]):
+        print_error_message(
+            "Config not applied: this conversation's memory was embedded with "
+            f"{embeddings.model_path}. Start a new conversation to use another embedding model.")
+        state["config_mtime"] = mtime
+        return False
+    try:
+        getEmbeddings(settings["emb_config"])
+        getLlm(settings["llm_config"])
+    except Exception as e:
+        print_error_message(f"Config not applied, model failed to load: {e}")
+        return False
+
+    (rag_chain, vectorstore, text_splitter,
+     llama_embeddings, llm_instance) = ragSystem(
+        conv_path, conv_path / "db", is_new_session=False, vectorstore=state.get("vectorstore"))
+    state.update({
+        "rag_chain": rag_chain,
+        "vectorstore": vectorstore,
+        "text_splitter": text_splitter,
+        "llama_embeddings": llama_embeddings,
+        "llm_instance": llm_instance,
+        "llm_config": settings["llm_config"]["model"],
+        "emb_config": settings["emb_config"]["model"],
+        "config_mtime": mtime,
+    })
+    print_success_message("Conversation config reloaded.")
+    return True
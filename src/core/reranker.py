@@ -0,0 +1,231 @@
+# src/core/reranker.py
+import abc
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from langchain_core.documents import Document
+
+from src.core.dedup import contentId
+from src.libs.messages import print_error_message, print_info_message
+from src.libs.metrics import CACHE_LOOKUPS, RERANK_FALLBACKS, RERANK_SECONDS
+from src.libs.tracing import span
+
+# Joins query and passage on their way through Llama.embed(), which only
+# takes strings; _PairTokenizer turns it into the pair's token IDs.
+PAIR_DELIMITER = "\x1f"
+PASSAGE_CHARS = 600
+SCORE_RE = re.compile(r"^\s*\[?(\d+)\]?\s*[:=-]\s*(\d+(?:\.\d+)?)", re.MULTILINE)
+LLM_SCORING_PROMPT = (
+    "<|im_start|>system\nYou rate how useful each passage is for answering the question, "
+    "from 0 (unrelated) to 10 (answers it). Reply with one line per passage in the form "
+    "'<number>: <score>' and nothing else.<|im_end|>\n"
+    "<|im_start|>user\nQUESTION: {question}\n\n{passages}<|im_end|>\n"
+    "<|im_start|>assistant\n"
+)
+
+_rerankers: dict[tuple, "Reranker"] = {}
+_rerankers_lock = threading.Lock()
+
+
+def chunkId(doc: Document) -> str:
+    """The store ID when the backend returns one, else the dedup content ID."""
+    return getattr(doc, "id", None) or contentId(doc.page_content)
+
+
+class Reranker(abc.ABC):
+    """Reorders retrieved candidates by a relevance model under a time budget.
+
+    Candidates are scored in batches; once the budget is spent the
+    remaining batches are skipped and the vector order is kept. Scores are
+    cached by (query, chunk ID), so repeated questions cost nothing.
+    """
+
+    def __init__(self, batch_size: int = 8, budget_ms: float = 2000, cache_size: int = 4096):
+        self.batch_size = max(1, int(batch_size))
+        self.budget = float(budget_ms) / 1000.0
+        self.cache_size = int(cache_size)
+        self._cache: "OrderedDict[tuple, float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @abc.abstractmethod
+    def score_batch(self, query: str, texts: list[str]) -> list[Optional[float]]:
+        """One score per text, or None where the model gave none."""
+
+    def _cached(self, key: tuple) -> Optional[float]:
+        with self._cache_lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+        CACHE_LOOKUPS.inc(cache="rerank", result="hit" if score is not None else "miss")
+        return score
+
+    def _store(self, key: tuple, score: float):
+        with self._cache_lock:
+            self._cache[key] = score
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def rerank(self, query: str, docs: list[Document], top_n: int) -> list[Document]:
+        """The top_n docs by relevance, or the first top_n in vector order on timeout."""
+        if len(docs) <= 1:
+            return docs[:top_n]
+        started = time.perf_counter()
+        with RERANK_SECONDS.time(), span("rag.rerank", candidates=len(docs), top_n=top_n) as rerank_span:
+            keys = [(query, chunkId(doc)) for doc in docs]
+            scores = [self._cached(key) for key in keys]
+            pending = [i for i, score in enumerate(scores) if score is None]
+            rerank_span.set(cached=len(docs) - len(pending))
+
+            for batch_start in range(0, len(pending), self.batch_size):
+                if time.perf_counter() - started > self.budget:
+                    break
+                batch = pending[batch_start:batch_start + self.batch_size]
+                try:
+                    batch_scores = self.score_batch(query, [docs[i].page_content for i in batch])
+                except Exception as e:
+                    print_error_message(f"Reranking failed, keeping vector order: {e}")
+                    break
+                for i, score in zip(batch, batch_scores):
+                    if score is not None:
+                        scores[i] = score
+                        self._store(keys[i], score)
+
+            if any(score is None for score in scores):
+                RERANK_FALLBACKS.inc()
+                rerank_span.set(fallback=True)
+                return docs[:top_n]
+            # sorted() is stable, so ties keep their vector order.
+            order = sorted(range(len(docs)), key=lambda i: -scores[i])
+            rerank_span.set(fallback=False)
+            return [docs[i] for i in order[:top_n]]
+
+
+def _pair_llama_class(llama_cpp):
+    class _PairTokenizer(llama_cpp.Llama):
+        """Tokenizes 'query<PAIR_DELIMITER>passage' as a cross-encoder pair.
+
+        The pair becomes BOS query EOS SEP passage EOS; XLM-R models such as
+        bge-reranker use </s> for both EOS and SEP. Building the IDs here
+        keeps the special tokens out of the text, where the tokenizer would
+        read them as literal characters, and trims the passage so the
+        closing EOS survives embed()'s truncation.
+        """
+
+        def tokenize(self, text: bytes, add_bos: bool = True, special: bool = False) -> list[int]:
+            delimiter = PAIR_DELIMITER.encode("utf-8")
+            if delimiter not in text:
+                return super().tokenize(text, add_bos, special)
+            query, passage = text.split(delimiter, 1)
+            query_ids = super().tokenize(query, add_bos=False, special=False)[:self.n_batch // 2]
+            budget = max(self.n_batch - len(query_ids) - 4, 0)
+            passage_ids = super().tokenize(passage, add_bos=False, special=False)[:budget]
+            bos, eos = self.token_bos(), self.token_eos()
+            return [bos, *query_ids, eos, eos, *passage_ids, eos]
+
+    return _PairTokenizer
+
+
+class GgufReranker(Reranker):
+    """Cross-encoder reranker (e.g. bge-reranker-v2-m3) run with rank pooling."""
+
+    def __init__(self, model_path: str, n_ctx: int = 512, **kwargs):
+        super().__init__(**kwargs)
+        import llama_cpp
+
+        print_info_message(f"Loading reranker: {model_path}")
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.client = _pair_llama_class(llama_cpp)(
+            model_path=model_path,
+            embedding=True,
+            pooling_type=llama_cpp.LLAMA_POOLING_TYPE_RANK,
+            n_ctx=n_ctx,
+            n_batch=n_ctx,
+            n_ubatch=n_ctx,
+            verbose=False)
+        self._lock = threading.Lock()
+
+    def score_batch(self, query: str, texts: list[str]) -> list[Optional[float]]:
+        # One decode per call: embed() packs the pairs as separate sequences
+        # until n_batch tokens are reached.
+        query = query.replace(PAIR_DELIMITER, " ")
+        pairs = [f"{query}{PAIR_DELIMITER}{text.replace(PAIR_DELIMITER, ' ')}" for text in texts]
+        with self._lock:
+            rows = self.client.embed(pairs, normalize=False, truncate=True)
+        return [float(row[0]) if row else None for row in rows]
+
+
+class LlmReranker(Reranker):
+    """Scores a batch of passages with one prompt to the chat model.
+
+    Runs inside the RAG chain, whose caller already holds the model's
+    llmLock, so it does not lock again.
+    """
+
+    def __init__(self, llm, max_tokens: int = 64, **kwargs):
+        super().__init__(**kwargs)
+        self.llm = llm
+        self.max_tokens = max_tokens
+
+    def score_batch(self, query: str, texts: list[str]) -> list[Optional[float]]:
+        passages = "\n\n".join(
+            f"[{i}] {' '.join(text.split())[:PASSAGE_CHARS]}" for i, text in enumerate(texts, start=1))
+        reply = self.llm.invoke(
+            LLM_SCORING_PROMPT.format(question=query, passages=passages),
+            temperature=0.0, max_tokens=self.max_tokens)
+        scores: list[Optional[float]] = [None] * len(texts)
+        for number, score in SCORE_RE.findall(reply):
+            index = int(number) - 1
+            if 0 <= index < len(texts):
+                scores[index] = float(score)
+        return scores
+
+
+def getReranker(rerank_config: dict, llm=None) -> Optional[Reranker]:
+    """Shared reranker for the configured backend, or None when disabled."""
+    if not rerank_config or not rerank_config.get("enabled"):
+        return None
+    backend = rerank_config.get("backend", "llm")
+    options = {
+        "batch_size": rerank_config.get("batch_size", 8),
+        "budget_ms": rerank_config.get("budget_ms", 2000),
+        "cache_size": rerank_config.get("cache_size", 4096),
+    }
+    if backend == "gguf":
+        model_path = rerank_config.get("model")
+        if not model_path or not Path(model_path).exists():
+            print_error_message(f"Reranker model not found: {model_path}. Reranking disabled.")
+            return None
+        key = ("gguf", str(Path(model_path).resolve()), int(rerank_config.get("n_ctx", 512)))
+    elif backend == "llm":
+        if llm is None:
+            return None
+        key = ("llm", str(getattr(llm, "model_path", id(llm))))
+    else:
+        print_error_message(f"Unknown reranker backend '{backend}'. Reranking disabled.")
+        return None
+
+    with _rerankers_lock:
+        reranker = _rerankers.get(key)
+        if reranker is None:
+            try:
+                if backend == "gguf":
+                    reranker = GgufReranker(model_path, key[2], **options)
+                else:
+                    reranker = LlmReranker(llm, **options)
+            except Exception as e:
+                print_error_message(f"Failed to load reranker, reranking disabled: {e}")
+                return None
+            _rerankers[key] = reranker
+        else:
+            if backend == "llm":
+                # The cached model may have been evicted and reloaded.
+                reranker.llm = llm
+            reranker.batch_size = max(1, int(options["batch_size"]))
+            reranker.budget = float(options["budget_ms"]) / 1000.0
+        return reranker
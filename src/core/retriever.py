@@ -0,0 +1,52 @@
+# src/core/retriever.py
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from src.core.memoryTiers import isMemoryChunk
+from src.libs.metrics import EMBED_QUERY_SECONDS, RETRIEVAL_SECONDS, VECTOR_SEARCH_SECONDS
+from src.libs.tracing import span
+
+
+class MergedRetriever(BaseRetriever):
+    """Queries several vector stores with one query embedding and merges hits.
+
+    All stores must be built with the same embedding model so their
+    distances are comparable; results are ordered by distance across stores.
+    With skip_memory, conversation-memory chunks are left out because the
+    prompt's history window already holds them. With a reranker, the best
+    rerank_candidates hits are reordered by it before the top k are kept.
+    """
+
+    vectorstores: list[Any]
+    embeddings: Any
+    k: int = 4
+    reranker: Any = None
+    rerank_candidates: int = 0
+
+    def _get_relevant_documents(
+            self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+            skip_memory: bool = False) -> list[Document]:
+        with RETRIEVAL_SECONDS.time(), span("rag.retrieve", k=self.k, skip_memory=skip_memory) as retrieve_span:
+            with EMBED_QUERY_SECONDS.time(), span("rag.embed_query", chars=len(query)):
+                query_vector = self.embeddings.embed_query(query)
+            keep = max(self.k, self.rerank_candidates) if self.reranker else self.k
+            fetch_k = keep * 2 if skip_memory else keep
+            scored = []
+            for index, vectorstore in enumerate(self.vectorstores):
+                with VECTOR_SEARCH_SECONDS.time(), span("rag.vector_search", store=index,
+                                                        backend=type(vectorstore).__name__) as search_span:
+                    hits = vectorstore.similarity_search_by_vector_with_relevance_scores(
+                        query_vector, k=fetch_k)
+                    search_span.set(hits=len(hits))
+                scored.extend(hits)
+            if skip_memory:
+                scored = [pair for pair in scored if not isMemoryChunk(pair[0].metadata)]
+            scored.sort(key=lambda pair: pair[1])
+            docs = [doc for doc, _ in scored[:keep]]
+            if self.reranker is not None:
+                docs = self.reranker.rerank(query, docs, self.k)
+            retrieve_span.set(hits=min(len(docs), self.k))
+        return docs[:self.k]
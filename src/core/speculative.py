@@ -0,0 +1,132 @@
+# src/core/speculative.py
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from llama_cpp.llama_speculative import LlamaDraftModel, LlamaPromptLookupDecoding
+
+from src.libs.messages import print_error_message, print_info_message
+from src.libs.metrics import DRAFT_ACCEPTED, DRAFT_TOKENS
+
+SPECULATIVE_MODES = ("off", "prompt_lookup", "draft_model")
+
+
+class GgufDraftModel(LlamaDraftModel):
+    """Greedy drafts from a small GGUF sharing the target model's vocabulary.
+
+    generate() keeps the KV cache for the longest common prefix, so each
+    call only evaluates the tokens accepted since the previous one.
+    """
+
+    def __init__(self, model_path: str, n_ctx: int, num_pred_tokens: int = 8):
+        from llama_cpp import Llama
+
+        print_info_message(f"Loading draft model: {model_path}")
+        self.model = Llama(model_path=model_path, n_ctx=n_ctx, verbose=False)
+        self.num_pred_tokens = num_pred_tokens
+
+    def __call__(self, input_ids: np.ndarray, /, **kwargs: Any) -> np.ndarray:
+        drafted = []
+        eos = self.model.token_eos()
+        for token in self.model.generate(input_ids.tolist(), top_k=1, temp=0.0,
+                                         repeat_penalty=1.0, reset=True):
+            if token == eos:
+                break
+            drafted.append(token)
+            if len(drafted) >= self.num_pred_tokens:
+                break
+        return np.array(drafted, dtype=np.intc)
+
+
+class CountingDraftModel(LlamaDraftModel):
+    """Wraps a draft model and measures how many drafted tokens are accepted.
+
+    llama-cpp verifies a draft by evaluating it in one batch with the target
+    model and keeping the prefix the target's own sampler agrees with, so
+    the output is the one the target alone would give. Each call's input
+    shows which tokens of the previous draft survived.
+    """
+
+    def __init__(self, inner: LlamaDraftModel):
+        self.inner = inner
+        self.drafted = 0
+        self.accepted = 0
+        self._last_input: Optional[np.ndarray] = None
+        self._last_draft: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def _settle(self, input_ids: np.ndarray) -> int:
+        """Accepted tokens of the previous draft, 0 if a new generation began."""
+        last_input, last_draft = self._last_input, self._last_draft
+        if last_input is None or not len(last_draft):
+            return 0
+        start = len(last_input)
+        if len(input_ids) <= start or not np.array_equal(input_ids[:start], last_input):
+            return 0
+        follow = input_ids[start:start + len(last_draft)]
+        mismatch = np.nonzero(follow != last_draft[:len(follow)])[0]
+        return int(mismatch[0]) if len(mismatch) else len(follow)
+
+    def __call__(self, input_ids: np.ndarray, /, **kwargs: Any) -> np.ndarray:
+        draft = np.asarray(self.inner(input_ids, **kwargs), dtype=np.intc)
+        with self._lock:
+            accepted = self._settle(input_ids)
+            self.accepted += accepted
+            self.drafted += len(draft)
+            self._last_input = np.array(input_ids, copy=True)
+            self._last_draft = draft
+        DRAFT_ACCEPTED.inc(accepted)
+        DRAFT_TOKENS.inc(len(draft))
+        return draft
+
+    def counts(self) -> tuple[int, int]:
+        with self._lock:
+            return self.drafted, self.accepted
+
+    def acceptanceRate(self) -> Optional[float]:
+        drafted, accepted = self.counts()
+        return accepted / drafted if drafted else None
+
+
+def speculativeKey(llm_config: dict) -> tuple:
+    """The part of the speculative settings that changes the loaded model."""
+    spec = llm_config.get("speculative") or {}
+    mode = spec.get("mode") or "off"
+    if mode == "prompt_lookup":
+        return mode, spec.get("num_pred_tokens", 10), spec.get("max_ngram_size", 3)
+    if mode == "draft_model":
+        return mode, str(spec.get("draft_model")), spec.get("num_pred_tokens", 8)
+    return ("off",)
+
+
+def buildDraftModel(llm_config: dict) -> Optional[CountingDraftModel]:
+    """The draft model for llm_config.speculative, or None when it is off."""
+    spec = llm_config.get("speculative") or {}
+    mode = spec.get("mode") or "off"
+    if mode not in SPECULATIVE_MODES:
+        print_error_message(f"Unknown speculative mode '{mode}'. Speculative decoding disabled.")
+        return None
+    if mode == "prompt_lookup":
+        # Drafts by copying what followed the latest n-gram elsewhere in the
+        # prompt, which suits answers lifted from the retrieved CONTEXT.
+        return CountingDraftModel(LlamaPromptLookupDecoding(
+            max_ngram_size=spec.get("max_ngram_size", 3),
+            num_pred_tokens=spec.get("num_pred_tokens", 10)))
+    if mode == "draft_model":
+        draft_path = spec.get("draft_model")
+        if not draft_path or not Path(draft_path).exists():
+            print_error_message(f"Draft model not found: {draft_path}. Speculative decoding disabled.")
+            return None
+        try:
+            return CountingDraftModel(GgufDraftModel(
+                draft_path, spec.get("draft_n_ctx", llm_config["n_ctx"]),
+                spec.get("num_pred_tokens", 8)))
+        except Exception as e:
+            print_error_message(f"Failed to load draft model, speculative decoding disabled: {e}")
+    return None
+
+
+def draftOf(llm) -> Optional[CountingDraftModel]:
+    draft = getattr(getattr(llm, "client", None), "draft_model", None)
+    return draft if isinstance(draft, CountingDraftModel) else None
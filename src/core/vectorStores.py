@@ -0,0 +1,69 @@
+# src/core/vectorStores.py
+from pathlib import Path
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.vectorstores import VectorStore
+
+from src.config import EMB_VECTOR_STORE
+from src.core.compactStore import CompactVectorStore
+from src.core.mmapStore import MmapVectorStore
+
+VECTOR_STORE_BACKENDS = ("chroma", "compact", "mmap")
+# Local backends live in a subfolder of db/ so a Chroma store can sit next to them.
+STORE_DIRS = {"compact": "compact", "mmap": "mmap"}
+
+
+def createLocalVectorStore(backend: str, persist_directory: Path, embeddings,
+                           store_config: dict) -> VectorStore:
+    """Builds one of the NumPy-based backends at an explicit location."""
+    if backend == "mmap":
+        return MmapVectorStore(
+            persist_directory=str(persist_directory),
+            embedding_function=embeddings,
+            index_params=store_config.get("index"),
+            compact_ratio=store_config.get("compact_ratio", 0.2),
+            background=store_config.get("background", True),
+        )
+    return CompactVectorStore(
+        persist_directory=str(persist_directory),
+        embedding_function=embeddings,
+        quantization=store_config.get("quantization", "int8"),
+        dimensions=store_config.get("dimensions"),
+        rescore=store_config.get("rescore", True),
+        rescore_multiplier=store_config.get("rescore_multiplier", 4),
+    )
+
+
+def openVectorStore(chroma_db_dir_path: Path, embeddings, store_config: dict = None) -> VectorStore:
+    """Opens a conversation store with the backend selected in emb_config."""
+    store_config = store_config or EMB_VECTOR_STORE
+    backend = store_config.get("backend", "chroma")
+    if backend not in VECTOR_STORE_BACKENDS:
+        raise ValueError(f"Unknown vector store backend '{backend}'. "
+                         f"Use one of: {', '.join(VECTOR_STORE_BACKENDS)}.")
+
+    if backend == "chroma":
+        return Chroma(persist_directory=str(chroma_db_dir_path),
+                      embedding_function=embeddings)
+    return createLocalVectorStore(backend, Path(chroma_db_dir_path) / STORE_DIRS[backend],
+                                  embeddings, store_config)
+
+
+def updateMetadata(vectorstore: VectorStore, ids: list[str], metadatas: list[dict]):
+    """Replaces the metadata of stored chunks without re-embedding them."""
+    if isinstance(vectorstore, Chroma):
+        vectorstore._collection.update(ids=ids, metadatas=metadatas)
+    else:
+        vectorstore.update_metadata(ids, metadatas)
+
+
+def addVectors(vectorstore: VectorStore, vectors, texts: list[str], metadatas: list[dict], ids: list[str]):
+    """Stores chunks with embeddings the caller already computed."""
+    if isinstance(vectorstore, Chroma):
+        # Chroma's LangChain wrapper always embeds; its collection takes vectors.
+        vectorstore._collection.upsert(
+            ids=ids, embeddings=[list(map(float, v)) for v in vectors],
+            documents=texts, metadatas=[m or None for m in metadatas])
+    else:
+        vectorstore.add_vectors(np.asarray(vectors), texts, [m or {} for m in metadatas], ids)
@@ -0,0 +1,37 @@
+# src/libs/backgroundTasks.py
+import threading
+from pathlib import Path
+from typing import Callable
+
+_tasks: dict[str, list[threading.Thread]] = {}
+_tasks_lock = threading.Lock()
+
+
+def _key(db_path: Path) -> str:
+    return str(Path(db_path).resolve())
+
+
+def startBackgroundTask(db_path: Path, name: str, target: Callable[[], None]) -> threading.Thread:
+    """Runs target in a daemon thread tracked under the conversation's store.
+
+    Work like deduplication and consolidation holds the store and writes
+    state files next to it, so the folder must not move or vanish under
+    it; waitForBackgroundTasks lets rename, delete and session switches
+    wait for it first.
+    """
+    thread = threading.Thread(target=target, name=name, daemon=True)
+    with _tasks_lock:
+        running = [t for t in _tasks.get(_key(db_path), []) if t.is_alive()]
+        running.append(thread)
+        _tasks[_key(db_path)] = running
+        thread.start()
+    return thread
+
+
+def waitForBackgroundTasks(db_path: Path):
+    """Joins every background task started for the conversation's store."""
+    with _tasks_lock:
+        threads = _tasks.pop(_key(db_path), [])
+    for thread in threads:
+        if thread is not threading.current_thread():
+            thread.join()
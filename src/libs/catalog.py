@@ -0,0 +1,248 @@
+# src/libs/catalog.py
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import yaml
+
+from src.config import CATALOG_DB, MEMORY_DIR
+from src.libs.messages import print_error_message, print_info_message
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+# Seconds between re-measuring a conversation's store size on new turns.
+STORE_SIZE_INTERVAL_S = 300
+
+SORT_COLUMNS = {
+    "created": "created_at",
+    "updated": "updated_at",
+    "title": "title COLLATE NOCASE",
+    "turns": "turn_count",
+    "size": "store_size",
+}
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+def _store_size(conv_path: Path) -> int:
+    db_path = conv_path / "db"
+    if not db_path.is_dir():
+        return 0
+    return sum(f.stat().st_size for f in db_path.rglob("*") if f.is_file())
+
+
+def _read_models(conv_path: Path) -> tuple:
+    config_path = conv_path / "config.yml"
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            conv_config = yaml.safe_load(f) or {}
+        return (conv_config.get("llm_config", {}).get("model"),
+                conv_config.get("emb_config", {}).get("model"))
+    except (OSError, yaml.YAMLError, AttributeError):
+        return None, None
+
+
+def _count_turns(conv_path: Path) -> int:
+    chat_db = conv_path / "db" / "chat.sqlite3"
+    if chat_db.is_file():
+        try:
+            with sqlite3.connect(chat_db) as conn:
+                return conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+        except sqlite3.Error:
+            pass
+    chat_json = conv_path / f"{conv_path.name}.json"
+    try:
+        with open(chat_json, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return len(data) if isinstance(data, list) else 0
+    except (OSError, json.JSONDecodeError):
+        return 0
+
+
+class ConversationCatalog:
+    """One SQLite row per conversation so listings never scan data/chats.
+
+    Opening the catalog syncs it when data/chats has changed since the last
+    sync, e.g. a folder copied in or removed while AEON was not running.
+    """
+
+    def __init__(self, db_path: Path, memory_dir_path: Path):
+        self.db_path = Path(db_path)
+        self.memory_dir_path = Path(memory_dir_path)
+        self._lock = threading.Lock()
+        self._size_checked: dict[str, float] = {}
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._initialize_db()
+        if self._get_meta("memory_dir_mtime_ns") != self._memory_dir_mtime():
+            self.sync()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _initialize_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS conversations (
+                    id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    turn_count INTEGER NOT NULL DEFAULT 0,
+                    store_size INTEGER NOT NULL DEFAULT 0,
+                    llm_model TEXT,
+                    emb_model TEXT
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_created "
+                         "ON conversations(created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_updated "
+                         "ON conversations(updated_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS catalog_meta "
+                         "(key TEXT PRIMARY KEY, value TEXT)")
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _memory_dir_mtime(self) -> Optional[str]:
+        try:
+            return str(self.memory_dir_path.stat().st_mtime_ns)
+        except OSError:
+            return None
+
+    def _row_from_disk(self, conv_path: Path) -> tuple:
+        stat = conv_path.stat()
+        created_at = datetime.fromtimestamp(stat.st_ctime).isoformat()
+        llm_model, emb_model = _read_models(conv_path)
+        return (conv_path.name, conv_path.name, created_at, created_at,
+                _count_turns(conv_path), _store_size(conv_path), llm_model, emb_model)
+
+    def sync(self):
+        """Reconciles the catalog with the conversation folders on disk."""
+        if not self.memory_dir_path.is_dir():
+            return
+        # Read before listing: a change made during the sync triggers another.
+        mtime = self._memory_dir_mtime()
+        on_disk = {d.name: d for d in self.memory_dir_path.iterdir()
+                   if d.is_dir() and not d.name.startswith('.')}
+        with self._lock, self._connect() as conn:
+            known = {row["id"] for row in conn.execute("SELECT id FROM conversations")}
+            for conv_id in known - on_disk.keys():
+                conn.execute("DELETE FROM conversations WHERE id = ?", (conv_id,))
+            for conv_id in on_disk.keys() - known:
+                conn.execute("INSERT INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             self._row_from_disk(on_disk[conv_id]))
+            conn.execute("INSERT OR REPLACE INTO catalog_meta VALUES ('memory_dir_mtime_ns', ?)",
+                         (mtime,))
+        print_info_message(f"Conversation catalog synced: {len(on_disk)} conversations.")
+
+    def refresh(self, conv_id: str):
+        """Re-reads one conversation from disk, e.g. after a backup restore."""
+        conv_path = self.memory_dir_path / conv_id
+        if not conv_path.is_dir():
+            self.remove(conv_id)
+            return
+        row = self._row_from_disk(conv_path)
+        with self._lock, self._connect() as conn:
+            existing = conn.execute("SELECT created_at FROM conversations WHERE id = ?",
+                                    (conv_id,)).fetchone()
+            created_at = existing["created_at"] if existing else row[2]
+            conn.execute("INSERT OR REPLACE INTO conversations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         (row[0], row[1], created_at, _now()) + row[4:])
+
+    def add(self, conv_id: str, llm_model: str = None, emb_model: str = None):
+        now = _now()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO conversations "
+                "(id, title, created_at, updated_at, llm_model, emb_model) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (conv_id, conv_id, now, now, llm_model, emb_model))
+
+    def rename(self, conv_id: str, new_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE conversations SET id = ?, title = ?, updated_at = ? WHERE id = ?",
+                         (new_id, new_id, _now(), conv_id))
+
+    def remove(self, conv_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM conversations WHERE id = ?", (conv_id,))
+
+    def record_turn(self, conv_id: str):
+        """Counts a saved turn; the store size is re-measured every few minutes."""
+        now = time.monotonic()
+        with self._lock:
+            measure = now - self._size_checked.get(conv_id, float("-inf")) >= STORE_SIZE_INTERVAL_S
+            if measure:
+                self._size_checked[conv_id] = now
+        store_size = _store_size(self.memory_dir_path / conv_id) if measure else None
+        with self._lock, self._connect() as conn:
+            updated = conn.execute(
+                "UPDATE conversations SET turn_count = turn_count + 1, "
+                "store_size = COALESCE(?, store_size), updated_at = ? WHERE id = ?",
+                (store_size, _now(), conv_id)).rowcount
+        if not updated:
+            self.refresh(conv_id)
+
+    def get(self, conv_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM conversations WHERE id = ?", (conv_id,)).fetchone()
+        return dict(row) if row else None
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def list(self, sort: str = "created", descending: bool = False,
+             limit: Optional[int] = None, offset: int = 0) -> list[dict]:
+        column = SORT_COLUMNS.get(sort, SORT_COLUMNS["created"])
+        direction = "DESC" if descending else "ASC"
+        query = f"SELECT * FROM conversations ORDER BY {column} {direction}, id {direction}"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params = (int(limit), int(offset))
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def get_by_position(self, position: int) -> Optional[dict]:
+        """Resolves the 1-based number shown by /list (oldest first)."""
+        if position < 1:
+            return None
+        rows = self.list(limit=1, offset=position - 1)
+        return rows[0] if rows else None
+
+    def resolve(self, reference: str) -> Optional[dict]:
+        """Accepts either a /list number or a conversation ID."""
+        reference = reference.strip()
+        if reference.isdigit():
+            entry = self.get_by_position(int(reference))
+            if entry:
+                return entry
+        return self.get(reference)
+
+
+_catalog: Optional[ConversationCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> ConversationCatalog:
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            try:
+                _catalog = ConversationCatalog(PROJECT_ROOT / CATALOG_DB,
+                                               PROJECT_ROOT / MEMORY_DIR)
+            except sqlite3.Error as e:
+                print_error_message(f"Failed to open conversation catalog: {e}")
+                raise
+    return _catalog
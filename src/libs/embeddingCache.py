@@ -0,0 +1,236 @@
+# src/libs/embeddingCache.py
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.config import EMB_CACHE, EMBEDDING_CACHE_DB
+from src.libs.messages import print_error_message
+from src.libs.metrics import CACHE_LOOKUPS
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+# Bytes hashed from each end of a model file; with its size this tells
+# GGUF files apart without reading gigabytes.
+FINGERPRINT_BYTES = 1 << 20
+# Entries written between checks of the size bound.
+EVICT_EVERY = 1000
+SQL_VARIABLES = 900
+
+_fingerprints: dict[tuple, str] = {}
+
+
+def normalizeText(text: str) -> str:
+    """NFC with runs of whitespace collapsed: variants that embed alike share a key."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def textKey(text: str) -> bytes:
+    return hashlib.sha1(normalizeText(text).encode("utf-8")).digest()
+
+
+def modelFingerprint(model_path: str) -> str:
+    """Hash of a model file's size and its first and last megabyte."""
+    path = Path(model_path).resolve()
+    try:
+        stat = path.stat()
+    except OSError:
+        return hashlib.sha1(str(path).encode("utf-8")).hexdigest()
+    cache_key = (str(path), stat.st_size, stat.st_mtime_ns)
+    if cache_key not in _fingerprints:
+        digest = hashlib.sha1(str(stat.st_size).encode("ascii"))
+        with open(path, "rb") as f:
+            digest.update(f.read(FINGERPRINT_BYTES))
+            if stat.st_size > FINGERPRINT_BYTES:
+                f.seek(-min(FINGERPRINT_BYTES, stat.st_size - FINGERPRINT_BYTES), 2)
+                digest.update(f.read())
+        _fingerprints[cache_key] = digest.hexdigest()
+    return _fingerprints[cache_key]
+
+
+class EmbeddingCache:
+    """Content-addressed vectors in one SQLite file, shared by every store and process.
+
+    Entries are keyed by (model fingerprint, hash of the normalized text)
+    and evicted least recently used once max_entries is passed.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 200000):
+        self.db_path = Path(db_path)
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self._initialize_db()
+
+    def _initialize_db(self):
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    dimensions INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, text_hash)
+                ) WITHOUT ROWID
+            ''')
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)")
+
+    def get_many(self, model: str, keys: list[bytes]) -> dict[bytes, np.ndarray]:
+        found = {}
+        now = time.time()
+        with self._lock:
+            try:
+                for start in range(0, len(keys), SQL_VARIABLES):
+                    part = keys[start:start + SQL_VARIABLES]
+                    rows = self._conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE model = ? "
+                        f"AND text_hash IN ({','.join('?' * len(part))})", (model, *part)).fetchall()
+                    for text_hash, vector in rows:
+                        found[bytes(text_hash)] = np.frombuffer(vector, dtype="<f4")
+                if found:
+                    with self._conn:
+                        self._conn.executemany(
+                            "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                            [(now, model, key) for key in found])
+            except sqlite3.Error as e:
+                print_error_message(f"Embedding cache read failed: {e}")
+                return {}
+        return found
+
+    def put_many(self, model: str, items: list[tuple[bytes, list[float]]]):
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            array = np.asarray(vector, dtype="<f4")
+            rows.append((model, key, int(array.size), array.tobytes(), now))
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (model, text_hash, dimensions, vector, last_used) "
+                        "VALUES (?, ?, ?, ?, ?)", rows)
+                self._writes += len(rows)
+                if self._writes >= EVICT_EVERY:
+                    self._writes = 0
+                    self._evict()
+            except sqlite3.Error as e:
+                print_error_message(f"Embedding cache write failed: {e}")
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE (model, text_hash) IN ("
+                    "SELECT model, text_hash FROM embeddings ORDER BY last_used LIMIT ?)", (excess,))
+
+    def record(self, hits: int, misses: int):
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+        if hits:
+            CACHE_LOOKUPS.inc(hits, cache="embedding", result="hit")
+        if misses:
+            CACHE_LOOKUPS.inc(misses, cache="embedding", result="miss")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "vector_bytes": size,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+class CachedEmbeddings(Embeddings):
+    """Looks texts up in the embedding cache and only embeds the misses.
+
+    Other attributes (model_path, client) come from the wrapped embeddings,
+    so callers see the same interface as LlamaCppEmbeddings.
+    """
+
+    def __init__(self, inner, model_path: str, cache: "EmbeddingCache"):
+        self.inner = inner
+        self.cache = cache
+        self.model_key = modelFingerprint(model_path)
+
+    def __getattr__(self, name):
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        keys = [textKey(text) for text in texts]
+        found = self.cache.get_many(self.model_key, list(dict.fromkeys(keys)))
+        missing: dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        self.cache.record(hits=len(texts) - sum(1 for key in keys if key in missing),
+                          misses=sum(1 for key in keys if key in missing))
+        if missing:
+            vectors = self.inner.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model_key, list(computed.items()))
+            found.update({key: np.asarray(vector, dtype=np.float32) for key, vector in computed.items()})
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = textKey(text)
+        found = self.cache.get_many(self.model_key, [key])
+        if key in found:
+            self.cache.record(hits=1, misses=0)
+            return found[key].tolist()
+        self.cache.record(hits=0, misses=1)
+        vector = self.inner.embed_query(text)
+        self.cache.put_many(self.model_key, [(key, vector)])
+        return vector
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            _embedding_cache = EmbeddingCache(
+                PROJECT_ROOT / EMBEDDING_CACHE_DB, EMB_CACHE.get("max_entries", 200000))
+    return _embedding_cache
+
+
+def embeddingCacheStats() -> Optional[dict]:
+    """Stats of the cache if this process has opened it."""
+    with _embedding_cache_lock:
+        cache = _embedding_cache
+    return cache.stats() if cache is not None else None
+
+
+def cachedEmbeddings(embeddings, model_path: str):
+    """embeddings behind the persistent cache, unless emb_config.cache.enabled is false."""
+    if not EMB_CACHE.get("enabled", True):
+        return embeddings
+    return CachedEmbeddings(embeddings, model_path, get_embedding_cache())
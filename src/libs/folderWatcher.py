@@ -0,0 +1,157 @@
+# src/libs/folderWatcher.py
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+from src.libs.messages import print_error_message, print_info_message
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+WATCH_BACKENDS = ("auto", "watchdog", "polling")
+# Opening or reading a file is not a change; indexing reads every file it
+# is told about, so reacting to those events would loop.
+CHANGE_EVENTS = ("created", "modified", "deleted", "moved", "closed")
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, notify: Callable[[str], None]):
+        self.notify = notify
+
+    def on_any_event(self, event):
+        if event.event_type not in CHANGE_EVENTS:
+            return
+        self.notify(event.src_path)
+        dest_path = getattr(event, "dest_path", "")
+        if dest_path:
+            self.notify(dest_path)
+
+
+class FolderWatcher:
+    """Reports changed paths under a set of folders in debounced batches.
+
+    Uses watchdog (inotify on Linux) when it is installed and polls the
+    folders' files otherwise. on_change gets every path touched since the
+    last call once no change has arrived for debounce_ms, so saving a file
+    in several writes, or copying in a whole directory, is handled once.
+    """
+
+    def __init__(self, on_change: Callable[[set], None], suffixes: Iterable[str],
+                 debounce_ms: int = 1500, poll_interval_s: float = 5.0, backend: str = "auto"):
+        self.on_change = on_change
+        self.suffixes = tuple(s.lower() for s in suffixes)
+        self.debounce_s = max(0, debounce_ms) / 1000
+        self.poll_interval_s = max(0.1, float(poll_interval_s))
+        if backend not in WATCH_BACKENDS:
+            print_error_message(f"Unknown watch backend '{backend}', using auto.")
+            backend = "auto"
+        if backend == "watchdog" and Observer is None:
+            print_error_message("watchdog is not installed; watching folders by polling. "
+                                "Install it with 'pip install watchdog'.")
+        self.backend = "watchdog" if backend != "polling" and Observer is not None else "polling"
+        self.roots: list[Path] = []
+        self._pending: set = set()
+        self._last_change = 0.0
+        self._snapshots: dict[Path, dict] = {}
+        self._observer = None
+        self._stop = threading.Event()
+        self._changed = threading.Condition()
+        self._threads: list[threading.Thread] = []
+
+    def watch(self, root: Path):
+        root = Path(root).resolve()
+        if root in self.roots:
+            return
+        if not root.is_dir():
+            print_error_message(f"Cannot watch '{root}': not a directory.")
+            return
+        self.roots.append(root)
+        if self.backend == "polling":
+            self._snapshots[root] = self._snapshot(root)
+        elif self._observer is not None:
+            self._observer.schedule(_EventHandler(self._notify), str(root), recursive=True)
+
+    def start(self):
+        if self._threads:
+            return
+        if self.backend == "watchdog":
+            self._observer = Observer()
+            self._observer.daemon = True
+            for root in self.roots:
+                self._observer.schedule(_EventHandler(self._notify), str(root), recursive=True)
+            self._observer.start()
+        else:
+            self._threads.append(threading.Thread(target=self._poll_loop, name="folder-watch-poll", daemon=True))
+        self._threads.append(threading.Thread(target=self._dispatch_loop, name="folder-watch", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        print_info_message(
+            f"Watching {len(self.roots)} folders for changes ({self.backend}).")
+
+    def stop(self):
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def _relevant(self, path: str) -> bool:
+        # Directories have no suffix and are kept: a removed or moved-in
+        # folder arrives as a single event.
+        suffix = os.path.splitext(path)[1].lower()
+        return not suffix or suffix in self.suffixes
+
+    def _notify(self, path: str):
+        if not self._relevant(path):
+            return
+        with self._changed:
+            self._pending.add(Path(path))
+            self._last_change = time.monotonic()
+            self._changed.notify_all()
+
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            with self._changed:
+                while not self._pending and not self._stop.is_set():
+                    self._changed.wait()
+                quiet_for = time.monotonic() - self._last_change
+                if quiet_for < self.debounce_s:
+                    self._changed.wait(self.debounce_s - quiet_for)
+                    continue
+                paths, self._pending = self._pending, set()
+            if self._stop.is_set():
+                return
+            try:
+                self.on_change(paths)
+            except Exception as e:
+                print_error_message(f"Updating watched folders failed: {e}")
+
+    def _snapshot(self, root: Path) -> dict:
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                if os.path.splitext(name)[1].lower() not in self.suffixes:
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval_s):
+            for root in list(self.roots):
+                previous = self._snapshots.get(root, {})
+                current = self._snapshot(root)
+                self._snapshots[root] = current
+                for path in previous.keys() | current.keys():
+                    if previous.get(path) != current.get(path):
+                        self._notify(path)
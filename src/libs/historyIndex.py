@@ -0,0 +1,229 @@
+# src/libs/historyIndex.py
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from src.config import HISTORY_INDEX_DB, MEMORY_DIR
+from src.libs.messages import print_error_message, print_info_message
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+INSERT_BATCH_SIZE = 1000
+
+
+def _fts_query(text: str) -> str:
+    """Turns free text into an FTS5 query that ANDs quoted terms.
+
+    Quoting keeps user input from being parsed as FTS5 operators; the last
+    term gets a prefix match so partially typed words still hit.
+    """
+    terms = [t.replace('"', '""') for t in text.split() if t.strip('"')]
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _read_turns(conv_path: Path) -> list[tuple]:
+    """Reads (guid, user, aeon, source, timestamp) rows for one conversation."""
+    chat_db = conv_path / "db" / "chat.sqlite3"
+    if chat_db.is_file():
+        try:
+            with sqlite3.connect(chat_db) as conn:
+                return conn.execute(
+                    "SELECT GUID, USER, AEON, SOURCE, TIMESTAMP FROM conversations "
+                    "ORDER BY TIMESTAMP ASC").fetchall()
+        except sqlite3.Error as e:
+            print_error_message(f"Could not read '{chat_db}': {e}")
+
+    chat_json = conv_path / f"{conv_path.name}.json"
+    try:
+        with open(chat_json, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return []
+    if not isinstance(data, list):
+        return []
+    return [(f"{conv_path.name}:{i}", turn.get("user", ""), str(turn.get("aeon", "")),
+             str(turn.get("source", "")), None) for i, turn in enumerate(data)]
+
+
+class HistoryIndex:
+    """Full-text index over the turns of every conversation.
+
+    Lives in its own SQLite file and never touches the models, so searching
+    old chats does not need a RAG system to be loaded.
+    """
+
+    def __init__(self, db_path: Path, memory_dir_path: Path):
+        self.db_path = Path(db_path)
+        self.memory_dir_path = Path(memory_dir_path)
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._initialize_db():
+            self.rebuild()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _create_tables(conn: sqlite3.Connection):
+        # Turns live in a plain table indexed by conv_id, so renaming or
+        # dropping a conversation touches only its rows; `turns` is an
+        # external-content FTS5 index over it, kept in step by triggers.
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS turn_rows (
+                id INTEGER PRIMARY KEY,
+                conv_id TEXT NOT NULL,
+                guid TEXT,
+                user TEXT,
+                aeon TEXT,
+                source TEXT,
+                timestamp TEXT
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_turn_rows_conv_id ON turn_rows(conv_id)")
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS turns USING fts5(
+                user,
+                aeon,
+                source,
+                conv_id UNINDEXED,
+                guid UNINDEXED,
+                timestamp UNINDEXED,
+                content = 'turn_rows',
+                content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS turn_rows_ai AFTER INSERT ON turn_rows BEGIN
+                INSERT INTO turns (rowid, user, aeon, source)
+                VALUES (new.id, new.user, new.aeon, new.source);
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS turn_rows_ad AFTER DELETE ON turn_rows BEGIN
+                INSERT INTO turns (turns, rowid, user, aeon, source)
+                VALUES ('delete', old.id, old.user, old.aeon, old.source);
+            END
+        ''')
+        # Only the text columns are tokenized; a conv_id update skips the index.
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS turn_rows_au AFTER UPDATE OF user, aeon, source ON turn_rows BEGIN
+                INSERT INTO turns (turns, rowid, user, aeon, source)
+                VALUES ('delete', old.id, old.user, old.aeon, old.source);
+                INSERT INTO turns (rowid, user, aeon, source)
+                VALUES (new.id, new.user, new.aeon, new.source);
+            END
+        ''')
+        # Persist the column weights so ORDER BY rank uses FTS5's fast path.
+        conn.execute("INSERT INTO turns (turns, rank) VALUES ('rank', 'bm25(1.0, 1.0, 0.2)')")
+
+    def _initialize_db(self) -> bool:
+        """Creates the tables; returns True when the index must be (re)built.
+
+        Indexes from before turn_rows existed kept everything in the FTS
+        table and are replaced.
+        """
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            has_rows = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'turn_rows'").fetchone()
+            if not has_rows:
+                conn.execute("DROP TABLE IF EXISTS turns")
+            self._create_tables(conn)
+        return not has_rows
+
+    def add_turn(self, conv_id: str, guid: str, user: str, aeon: str,
+                 source: str, timestamp: Optional[str]):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO turn_rows (user, aeon, source, conv_id, guid, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (user, aeon, source, conv_id, guid, timestamp))
+
+    def rename_conversation(self, conv_id: str, new_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE turn_rows SET conv_id = ? WHERE conv_id = ?", (new_id, conv_id))
+
+    def remove_conversation(self, conv_id: str):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM turn_rows WHERE conv_id = ?", (conv_id,))
+
+    def _insert_conversation(self, conn: sqlite3.Connection, conv_path: Path) -> int:
+        rows = _read_turns(conv_path)
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            conn.executemany(
+                "INSERT INTO turn_rows (user, aeon, source, conv_id, guid, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(user, aeon, source, conv_path.name, guid, timestamp)
+                 for guid, user, aeon, source, timestamp in rows[start:start + INSERT_BATCH_SIZE]])
+        return len(rows)
+
+    def index_conversation(self, conv_id: str):
+        """Replaces the indexed turns of one conversation, e.g. after a restore."""
+        conv_path = self.memory_dir_path / conv_id
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM turn_rows WHERE conv_id = ?", (conv_id,))
+            if conv_path.is_dir():
+                self._insert_conversation(conn, conv_path)
+
+    def rebuild(self) -> int:
+        """Re-indexes every conversation folder from its chat database."""
+        if not self.memory_dir_path.is_dir():
+            return 0
+        total = 0
+        with self._lock, self._connect() as conn:
+            # Dropping beats a row-by-row delete through the triggers; the
+            # explicit transaction keeps searches from seeing no table.
+            conn.execute("BEGIN")
+            conn.execute("DROP TABLE IF EXISTS turns")
+            conn.execute("DROP TABLE IF EXISTS turn_rows")
+            self._create_tables(conn)
+            for conv_path in self.memory_dir_path.iterdir():
+                if conv_path.is_dir() and not conv_path.name.startswith('.'):
+                    total += self._insert_conversation(conn, conv_path)
+            conn.execute("INSERT INTO turns (turns) VALUES ('optimize')")
+        print_info_message(f"Chat history index rebuilt: {total} turns.")
+        return total
+
+    def search(self, text: str, page: int = 1, page_size: int = 10) -> dict:
+        query = _fts_query(text)
+        if not query:
+            return {"query": text, "total": 0, "page": page, "results": []}
+        page = max(int(page), 1)
+        page_size = min(max(int(page_size), 1), 100)
+        with self._connect() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM turns WHERE turns MATCH ?",
+                                 (query,)).fetchone()[0]
+            rows = conn.execute(
+                "SELECT conv_id, guid, timestamp, "
+                "snippet(turns, 0, '[', ']', '...', 12) AS user_snippet, "
+                "snippet(turns, 1, '[', ']', '...', 16) AS aeon_snippet, "
+                "rank AS score "
+                "FROM turns WHERE turns MATCH ? ORDER BY rank LIMIT ? OFFSET ?",
+                (query, page_size, (page - 1) * page_size)).fetchall()
+        return {
+            "query": text,
+            "total": total,
+            "page": page,
+            "results": [dict(row) for row in rows],
+        }
+
+
+_history_index: Optional[HistoryIndex] = None
+_history_index_lock = threading.Lock()
+
+
+def get_history_index() -> HistoryIndex:
+    global _history_index
+    with _history_index_lock:
+        if _history_index is None:
+            _history_index = HistoryIndex(PROJECT_ROOT / HISTORY_INDEX_DB,
+                                          PROJECT_ROOT / MEMORY_DIR)
+    return _history_index
@@ -1,13 +1,51 @@
 # src/libs/loaders.py
 
+import codecs
+import csv
 import json
+import mmap
+import re
 import sys
 import os
+from typing import Iterator, Optional
+
+import yaml
 from langchain_core.documents import Document
 from src.libs.messages import (
     print_error_message, print_warning_message
 )
 
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+SAMPLE_BYTES = 65536
+# Rows per CSV document; the splitter packs them into chunks by tokens.
+CSV_ROWS_PER_DOCUMENT = 256
+CSV_DELIMITERS = ",;\t|"
+# Longest first, since the UTF-32 LE mark starts with the UTF-16 LE one.
+BOM_ENCODINGS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+FRONT_MATTER_RE = re.compile(r"\A---[ \t]*\n(.*?)\n(?:---|\.\.\.)[ \t]*(?:\n|\Z)", re.DOTALL)
+HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+HTML_TAG_RE = re.compile(r"</?[A-Za-z][^<>]*>")
+MD_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+MD_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+SETEXT_RE = re.compile(r"^\s{0,3}(=+|-+)\s*$")
+IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+LINK_RE = re.compile(r"\[([^\]]+)\]\([^)]*\)")
+LINK_DEFINITION_RE = re.compile(r"^\s{0,3}\[[^\]]+\]:\s+\S+")
+# A run of backticks closed by a run of the same length.
+CODE_SPAN_RE = re.compile(r"(`+)(?!`)(.*?[^`])\1(?!`)")
+CODE_SPAN_MARK = "\x00"
+
 
 class JsonPlaintextLoader:
     def __init__(self, file_path: str):
@@ -84,3 +122,184 @@ class JsonPlaintextLoader:
         except Exception as e:
             print_error_message(f"Loading JSON file '{self.file_path}': {e}")
             return []
+
+
+def _detect_encoding(sample: bytes) -> str:
+    """Encoding from a byte-order mark, else UTF-8 if the sample decodes, else a guess."""
+    for bom, encoding in BOM_ENCODINGS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # Not final: the sample may end inside a multi-byte character.
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if charset_normalizer is not None:
+        best = charset_normalizer.from_bytes(sample).best()
+        if best is not None:
+            return best.encoding
+    return "cp1252"
+
+
+def readText(file_path: str) -> str:
+    """Whole file decoded in place from a memory map."""
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            encoding = _detect_encoding(mapped[:SAMPLE_BYTES])
+            return str(mapped, encoding, errors="replace")
+
+
+def looksLikeText(file_path: str) -> bool:
+    with open(file_path, 'rb') as f:
+        sample = f.read(SAMPLE_BYTES)
+    return b"\x00" not in sample or sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE))
+
+
+class PlainTextLoader:
+    """One document per text file, in whatever encoding it was saved with."""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def load(self) -> list[Document]:
+        text = readText(self.file_path)
+        if not text.strip():
+            return []
+        return [Document(page_content=text, metadata={"source": self.file_path})]
+
+
+class MarkdownLoader:
+    """Markdown kept as Markdown, so the splitter can cut it at headings.
+
+    Front matter is dropped (its title kept as metadata), setext headings
+    are rewritten as ATX, and outside code fences links and images become
+    their text and HTML comments and tags are removed. Inline code spans
+    are left as written, like fenced blocks.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def _clean(self, text: str) -> tuple[str, Optional[str]]:
+        title = None
+        front = FRONT_MATTER_RE.match(text)
+        if front:
+            text = text[front.end():]
+            try:
+                meta = yaml.safe_load(front.group(1))
+                if isinstance(meta, dict) and meta.get("title"):
+                    title = str(meta["title"])
+            except yaml.YAMLError:
+                pass
+        text = HTML_COMMENT_RE.sub("", text)
+
+        lines, in_fence = [], False
+        for line in text.splitlines():
+            if MD_FENCE_RE.match(line):
+                in_fence = not in_fence
+                lines.append(line)
+                continue
+            if in_fence:
+                lines.append(line)
+                continue
+            setext = SETEXT_RE.match(line)
+            if setext and lines and lines[-1].strip() and not MD_HEADING_RE.match(lines[-1]):
+                marker = "#" if setext.group(1).startswith("=") else "##"
+                lines[-1] = f"{marker} {lines[-1].strip()}"
+                continue
+            if LINK_DEFINITION_RE.match(line):
+                continue
+            lines.append(self._strip_markup(line))
+            if title is None:
+                heading = MD_HEADING_RE.match(line)
+                if heading:
+                    title = heading.group(2)
+        return "\n".join(lines).strip(), title
+
+    @staticmethod
+    def _strip_markup(line: str) -> str:
+        # Code spans are swapped for placeholders so `List<String>` keeps
+        # its "tag", while a link whose text is code is still unwrapped.
+        spans = []
+
+        def _hold(match):
+            spans.append(match.group(0))
+            return f"{CODE_SPAN_MARK}{len(spans) - 1}{CODE_SPAN_MARK}"
+
+        line = CODE_SPAN_RE.sub(_hold, line.replace(CODE_SPAN_MARK, ""))
+        line = IMAGE_RE.sub(r"\1", line)
+        line = LINK_RE.sub(r"\1", line)
+        line = HTML_TAG_RE.sub("", line)
+        for index, span in enumerate(spans):
+            line = line.replace(f"{CODE_SPAN_MARK}{index}{CODE_SPAN_MARK}", span, 1)
+        return line
+
+    def load(self) -> list[Document]:
+        text, title = self._clean(readText(self.file_path))
+        if not text:
+            return []
+        metadata = {"source": self.file_path}
+        if title:
+            metadata["title"] = title
+        return [Document(page_content=text, metadata=metadata)]
+
+
+class CsvRowLoader:
+    """Streams a CSV file as documents of rows_per_document rows each.
+
+    Each row becomes one line of "column: value" pairs with empty cells
+    left out, which the splitter packs into chunks without cutting rows.
+    """
+
+    def __init__(self, file_path: str, rows_per_document: int = CSV_ROWS_PER_DOCUMENT):
+        self.file_path = file_path
+        self.rows_per_document = max(1, rows_per_document)
+
+    def _render(self, columns: list[str], row: list[str]) -> str:
+        cells = []
+        for index, value in enumerate(row):
+            value = " ".join(value.split())
+            if value:
+                column = columns[index] if index < len(columns) else f"column_{index + 1}"
+                cells.append(f"{column}: {value}")
+        return "; ".join(cells)
+
+    def lazy_load(self) -> Iterator[Document]:
+        with open(self.file_path, 'rb') as f:
+            sample = f.read(SAMPLE_BYTES)
+        encoding = _detect_encoding(sample)
+        head = sample.decode(encoding, errors="replace").rsplit("\n", 1)[0]
+        try:
+            dialect = csv.Sniffer().sniff(head, delimiters=CSV_DELIMITERS)
+        except csv.Error:
+            # Ragged rows defeat the sniffer; the header line still shows the delimiter.
+            header_line = head.lstrip("\ufeff").split("\n", 1)[0]
+            dialect = type("SniffedDialect", (csv.excel,), {
+                "delimiter": max(CSV_DELIMITERS, key=header_line.count)})
+
+        with open(self.file_path, 'r', encoding=encoding, errors="replace", newline='') as f:
+            reader = csv.reader(f, dialect)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = [name.strip() or f"column_{i + 1}" for i, name in enumerate(header)]
+            lines, first_row = [], 1
+            for row_number, row in enumerate(reader, start=1):
+                line = self._render(columns, row)
+                if line:
+                    lines.append(line)
+                if len(lines) >= self.rows_per_document:
+                    yield self._document(lines, first_row, row_number)
+                    lines, first_row = [], row_number + 1
+            if lines:
+                yield self._document(lines, first_row, row_number)
+
+    def _document(self, lines: list[str], first_row: int, last_row: int) -> Document:
+        return Document(page_content="\n".join(lines), metadata={
+            "source": self.file_path, "row_start": first_row, "row_end": last_row})
+
+    def load(self) -> list[Document]:
+        return list(self.lazy_load())
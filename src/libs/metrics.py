@@ -0,0 +1,265 @@
+# src/libs/metrics.py
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# Prometheus default buckets, stretched for multi-second LLM stages.
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+# Recent observations kept per series for the percentiles in /stats.
+RECENT_SAMPLES = 1024
+
+
+def _nearest_rank(ordered: list, quantile: float) -> float:
+    """Nearest-rank percentile of sorted samples: ordered[ceil(quantile * n) - 1]."""
+    if not ordered:
+        return 0.0
+    return ordered[max(math.ceil(quantile * len(ordered)) - 1, 0)]
+
+
+def _label_key(label_names: tuple, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in label_names)
+
+
+def _format_labels(label_names: tuple, key: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(label_names, key)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, label_names=()):
+        super().__init__(name, help_text, label_names)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        return self._header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(self.values().items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, label_names=()):
+        super().__init__(name, help_text, label_names)
+        self._values: dict[tuple, float] = {}
+        self._function: Optional[Callable[[], dict]] = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(self.label_names, labels)] = value
+
+    def set_function(self, function: Callable[[], dict]):
+        """Reads the value at scrape time; the function returns {label tuple: value}."""
+        self._function = function
+
+    def values(self) -> dict:
+        if self._function is not None:
+            try:
+                return dict(self._function())
+            except Exception:
+                return {}
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        return self._header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(self.values().items())]
+
+
+class _Series:
+    __slots__ = ("counts", "total", "count", "recent")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=SECONDS_BUCKETS, label_names=()):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: dict[tuple, _Series] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.counts[i] += 1
+                    break
+            series.total += value
+            series.count += 1
+            series.recent.append(value)
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def summary(self) -> dict:
+        """Count, mean and recent percentiles per label set."""
+        result = {}
+        with self._lock:
+            for key, series in self._series.items():
+                recent = sorted(series.recent)
+                result[key] = {
+                    "count": series.count,
+                    "mean": series.total / series.count if series.count else 0.0,
+                    "p50": _nearest_rank(recent, 0.50),
+                    "p95": _nearest_rank(recent, 0.95),
+                }
+        return result
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        with self._lock:
+            items = sorted((key, list(s.counts), s.total, s.count) for key, s in self._series.items())
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, label_names: tuple = ()) -> Counter:
+        return self._register(Counter(name, help_text, label_names))
+
+    def gauge(self, name: str, help_text: str, label_names: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, label_names))
+
+    def histogram(self, name: str, help_text: str, buckets=SECONDS_BUCKETS,
+                  label_names: tuple = ()) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets, label_names))
+
+    def metrics(self) -> list[_Metric]:
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def summary_lines(self) -> list[str]:
+        """Human-readable digest for the CLI: percentiles of recent samples."""
+        lines = []
+        for metric in self.metrics():
+            if isinstance(metric, Histogram):
+                in_seconds = metric.name.endswith("_seconds")
+                for key, stats in sorted(metric.summary().items()):
+                    scale, unit = (1000.0, " ms") if in_seconds else (1.0, "")
+                    labels = _format_labels(metric.label_names, key)
+                    lines.append(
+                        f"{metric.name}{labels}: n={stats['count']} "
+                        f"mean={stats['mean'] * scale:.1f}{unit} "
+                        f"p50={stats['p50'] * scale:.1f}{unit} p95={stats['p95'] * scale:.1f}{unit}")
+            else:
+                for key, value in sorted(metric.values().items()):
+                    lines.append(f"{metric.name}{_format_labels(metric.label_names, key)}: "
+                                 f"{_format_value(value)}")
+        return lines
+
+    def render(self) -> str:
+        """Prometheus text exposition format, version 0.0.4."""
+        lines = []
+        for metric in self.metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+# Metrics shared across the app. Defined here so /metrics lists every
+# series even before its first observation.
+_m = get_metrics()
+CHAT_SECONDS = _m.histogram("aeon_chat_seconds", "End-to-end time of a chat turn.")
+RETRIEVAL_SECONDS = _m.histogram("aeon_retrieval_seconds", "Retrieval time per question, embedding included.")
+EMBED_QUERY_SECONDS = _m.histogram("aeon_embed_query_seconds", "Time to embed a query.")
+VECTOR_SEARCH_SECONDS = _m.histogram("aeon_vector_search_seconds", "Time of one vector store search.")
+PROMPT_EVAL_SECONDS = _m.histogram("aeon_prompt_eval_seconds", "Time to first generated token.")
+GENERATION_SECONDS = _m.histogram("aeon_generation_seconds", "Total LLM time per answer.")
+PROMPT_TOKENS = _m.histogram("aeon_prompt_tokens", "Prompt size in LLM tokens.", TOKEN_BUCKETS)
+GENERATED_TOKENS = _m.histogram("aeon_generated_tokens", "Answer size in LLM tokens.", TOKEN_BUCKETS)
+TOKENS_PER_SECOND = _m.histogram("aeon_tokens_per_second", "Decode speed after the first token.", RATE_BUCKETS)
+DRAFT_ACCEPTANCE = _m.histogram("aeon_draft_acceptance_ratio",
+                                "Share of speculatively drafted tokens accepted, per answer.", RATIO_BUCKETS)
+RERANK_SECONDS = _m.histogram("aeon_rerank_seconds", "Time to rerank retrieved candidates.")
+PERSIST_SECONDS = _m.histogram("aeon_persist_seconds", "Time to save a turn to JSON, SQLite and the catalogs.")
+INGEST_SECONDS = _m.histogram("aeon_ingest_seconds", "Time to ingest documents into a vector store.",
+                              label_names=("kind",))
+PLUGIN_CALLS = _m.counter("aeon_plugin_calls_total", "Plugin executions.", ("plugin",))
+SEARCH_CALLS = _m.counter("aeon_search_calls_total", "Web searches.")
+RERANK_FALLBACKS = _m.counter("aeon_rerank_fallbacks_total", "Reranks that ran out of budget and kept vector order.")
+DRAFT_TOKENS = _m.counter("aeon_draft_tokens_total", "Tokens proposed by the speculative draft model.")
+DRAFT_ACCEPTED = _m.counter("aeon_draft_accepted_total", "Drafted tokens accepted by the target model.")
+CACHE_LOOKUPS = _m.counter("aeon_cache_lookups_total", "Cache lookups by cache and result.", ("cache", "result"))
+LOADED_MODELS = _m.gauge("aeon_loaded_models", "Models held by the model cache.", ("kind",))
+RESIDENT_SESSIONS = _m.gauge("aeon_resident_sessions", "Conversations with a loaded RAG chain.")
@@ -5,6 +5,7 @@ import importlib.util
 from src.libs.messages import (
     print_error_message, print_info_message, print_plugin_message
 )
+from src.libs.metrics import PLUGIN_CALLS
 
 PLUGINS_DIR = Path(__file__).parent.parent.parent / "plugins"
 
@@ -37,6 +38,7 @@ class Plugin:
         return f"Plugin(name='{self.plugin_name}', command='{self.command}', type='{self.type}')"
 
     def execute(self, *args, **kwargs) -> Optional[str]:
+        PLUGIN_CALLS.inc(plugin=self.command)
         try:
             main_file_path = self.path / "main.py"
             spec = importlib.util.spec_from_file_location(
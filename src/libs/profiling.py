@@ -0,0 +1,106 @@
+# src/libs/profiling.py
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+from src.config import OUTPUT_DIR, TRACING_CONFIG
+from src.libs.messages import print_info_message, print_error_message
+from src.libs.tracing import currentTraceId, event, span
+
+PROFILES_DIR = Path(OUTPUT_DIR) / "profiles"
+DEFAULT_INTERVAL_MS = 5
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a helper thread at a fixed interval.
+
+    Stacks are written in the folded format (``root;caller;callee count``)
+    read by flamegraph.pl, speedscope and inferno. Sampling only reads the
+    target thread's frames, so the profiled code runs unmodified.
+    """
+
+    def __init__(self, name: str, thread_id: Optional[int] = None, interval_ms: Optional[float] = None):
+        self.name = name
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = (interval_ms or TRACING_CONFIG.get("profile_interval_ms", DEFAULT_INTERVAL_MS)) / 1000.0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.trace_id = currentTraceId()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="aeon-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Optional[Path]:
+        """Stops sampling and writes the profile; returns its path."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        seconds = time.perf_counter() - self._started
+        if not self.stacks:
+            return None
+        PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+        suffix = f"-{self.trace_id}" if self.trace_id else ""
+        path = PROFILES_DIR / f"profile-{time.strftime('%Y%m%d-%H%M%S')}-{self.name}{suffix}.folded"
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            print_error_message(f"Failed to write profile: {e}")
+            return None
+        event("profile.written", path=str(path), samples=self.samples, seconds=round(seconds, 3))
+        return path
+
+
+def profileArmed(armed: bool = False) -> bool:
+    return armed or bool(TRACING_CONFIG.get("profile_requests", False))
+
+
+@contextmanager
+def profiledRequest(name: str, armed: bool = False, **attributes):
+    """Runs one request under a root span, profiling it when armed.
+
+    profile_requests in tracing_config profiles every request instead.
+    """
+    with span(name, **attributes) as request_span:
+        if not profileArmed(armed):
+            yield request_span
+            return
+        profiler = SamplingProfiler(name).start()
+        try:
+            yield request_span
+        finally:
+            path = profiler.stop()
+            if path:
+                request_span.set(profile=str(path))
+                print_info_message(f"Profile written to {path} ({profiler.samples} samples).")
@@ -0,0 +1,59 @@
+# src/libs/quantization.py
+import numpy as np
+
+# Number of set bits for every byte value, used for Hamming distances.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+
+def truncate_dimensions(vectors: np.ndarray, dimensions: int | None) -> np.ndarray:
+    """Matryoshka truncation: keep the leading dimensions and re-normalise.
+
+    nomic-embed-text-v1.5 is trained so that prefixes of its 768-d vectors
+    (512, 256, 128, 64) remain usable embeddings on their own.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dimensions and dimensions < vectors.shape[-1]:
+        vectors = vectors[..., :dimensions]
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def quantize_int8(unit_vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-vector int8 quantization; returns (codes, scales)."""
+    unit_vectors = np.atleast_2d(unit_vectors).astype(np.float32)
+    scales = np.abs(unit_vectors).max(axis=1) / 127.0
+    scales = np.maximum(scales, 1e-12).astype(np.float32)
+    codes = np.clip(np.rint(unit_vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def int8_cosine(query: np.ndarray, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Approximate cosine of a unit query against int8 codes of unit vectors."""
+    return (codes.astype(np.float32) @ query.astype(np.float32)) * scales
+
+
+def quantize_binary(unit_vectors: np.ndarray) -> np.ndarray:
+    """Sign-bit quantization packed 8 dimensions per byte."""
+    return np.packbits(np.atleast_2d(unit_vectors) > 0, axis=1)
+
+
+def binary_cosine(query: np.ndarray, packed: np.ndarray, dimensions: int) -> np.ndarray:
+    """Estimates cosine from the Hamming distance between sign bits.
+
+    For random hyperplanes the fraction of differing bits is angle / pi,
+    so cos(pi * hamming / dimensions) recovers the similarity.
+    """
+    query_bits = np.packbits(query > 0)
+    hamming = _POPCOUNT[np.bitwise_xor(packed, query_bits)].sum(axis=1)
+    return np.cos(np.pi * hamming / dimensions).astype(np.float32)
+
+
+def squared_l2_from_cosine(cosine: np.ndarray, query_norm: float, norms: np.ndarray) -> np.ndarray:
+    """Converts cosine back to Chroma's default squared L2 distance.
+
+    Keeping the original vector norms lets scores from a compact store be
+    merged with those of a full-precision Chroma store.
+    """
+    return query_norm ** 2 + norms ** 2 - 2.0 * query_norm * norms * cosine
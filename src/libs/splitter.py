@@ -0,0 +1,277 @@
+# src/libs/splitter.py
+import copy
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from langchain_core.documents import Document
+from langchain.text_splitter import TextSplitter
+
+from src.config import EMB_CHUNK_SIZE, EMB_CHUNK_OVERLAP, EMB_CHUNK_SIZES
+
+TOKEN_CACHE_SIZE = 65536
+# Longer texts (whole documents, sections) are measured once and not cached.
+TOKEN_CACHE_MAX_CHARS = 2048
+# Bump when a change to the splitting rules should re-chunk stored documents.
+SPLITTER_VERSION = 1
+
+# (joiner, split pattern) from coarse to fine. Sentence splitting keeps the
+# punctuation because the lookbehind does not consume it.
+SEPARATORS = [
+    ("\n\n", re.compile(r"\n\s*\n")),
+    ("\n", re.compile(r"\n")),
+    (" ", re.compile(r"(?<=[.!?;:])\s+")),
+    (" ", re.compile(r"\s+")),
+]
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s*(```|~~~)")
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _approximate_token_count(text: str) -> int:
+    """Fallback when no tokenizer is available: words plus punctuation."""
+    return len(WORD_RE.findall(text))
+
+
+def embeddingTokenizer(embeddings) -> Optional[Callable[[str], int]]:
+    """Returns a token counter backed by the embedding model's own vocabulary."""
+    client = getattr(embeddings, "client", None)
+    if client is None or not hasattr(client, "tokenize"):
+        return None
+
+    def _count(text: str) -> int:
+        return len(client.tokenize(text.encode("utf-8"), add_bos=False))
+
+    return _count
+
+
+def _cached_counter(count: Callable[[str], int]) -> Callable[[str], int]:
+    """Memoises count for short texts only, so the cache holds lines and paragraphs."""
+    cached = lru_cache(maxsize=TOKEN_CACHE_SIZE)(count)
+
+    def _count(text: str) -> int:
+        return cached(text) if len(text) <= TOKEN_CACHE_MAX_CHARS else count(text)
+
+    _count.cache_clear = cached.cache_clear
+    return _count
+
+
+def _document_type(doc: Document) -> str:
+    file_type = str(doc.metadata.get("file_type", "")).lower()
+    if file_type == "json_plaintext":
+        return "json"
+    if file_type:
+        return file_type
+    source = str(doc.metadata.get("source", ""))
+    if source.lower() == "memory":
+        return "memory"
+    return Path(source).suffix.lstrip(".").lower()
+
+
+class StructuredTextSplitter(TextSplitter):
+    """Splits by embedding-model tokens and respects document structure.
+
+    Markdown is cut at headings and never inside fenced code, CSV text at row
+    boundaries, and everything else from paragraphs down to words. Chunk
+    size can be set per file type; token counts of short texts are memoised
+    within a split_documents call because the same lines and paragraphs are
+    measured several times while packing.
+    """
+
+    def __init__(self,
+                 chunk_size: int = EMB_CHUNK_SIZE,
+                 chunk_overlap: int = EMB_CHUNK_OVERLAP,
+                 chunk_sizes: Optional[dict] = None,
+                 token_counter: Optional[Callable[[str], int]] = None,
+                 **kwargs):
+        counter = _cached_counter(token_counter or _approximate_token_count)
+        super().__init__(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                         length_function=counter, **kwargs)
+        self._count_tokens = counter
+        self.chunk_sizes = dict(chunk_sizes or {})
+        self.model_tokens = token_counter is not None
+
+    def _size_for(self, doc_type: str) -> int:
+        return int(self.chunk_sizes.get(doc_type, self._chunk_size))
+
+    def _overlap_for(self, size: int) -> int:
+        return min(self._chunk_overlap, size // 4)
+
+    def _pack(self, units: Iterable[str], size: int, overlap: int, joiner: str) -> list[str]:
+        chunks, current, lengths = [], [], []
+        total = 0
+        for unit in units:
+            n = self._count_tokens(unit)
+            if current and total + n > size:
+                chunks.append(joiner.join(current))
+                while current and (total > overlap or total + n > size):
+                    total -= lengths.pop(0)
+                    current.pop(0)
+            current.append(unit)
+            lengths.append(n)
+            total += n
+        if current:
+            chunks.append(joiner.join(current))
+        return chunks
+
+    def _hard_split(self, text: str, size: int) -> list[str]:
+        """Last resort for a single 'word' longer than the budget."""
+        width = max(1, len(text) * size // max(self._count_tokens(text), 1))
+        return [text[i:i + width] for i in range(0, len(text), width)]
+
+    def _split_recursive(self, text: str, size: int, overlap: int, level: int = 0) -> list[str]:
+        if self._count_tokens(text) <= size:
+            return [text] if text.strip() else []
+        if level >= len(SEPARATORS):
+            return self._hard_split(text, size)
+
+        joiner, pattern = SEPARATORS[level]
+        units = []
+        for piece in pattern.split(text):
+            if not piece.strip():
+                continue
+            if self._count_tokens(piece) > size:
+                units.extend(self._split_recursive(piece, size, overlap, level + 1))
+            else:
+                units.append(piece)
+        return self._pack(units, size, overlap, joiner)
+
+    def split_text(self, text: str) -> list[str]:
+        size = self._chunk_size
+        return self._split_recursive(text, size, self._overlap_for(size))
+
+    def _markdown_sections(self, text: str) -> list[tuple[list[str], list[str]]]:
+        """Groups lines into (heading path, blocks); fenced code is one block."""
+        sections = []
+        headings: list[tuple[int, str]] = []
+        blocks: list[str] = []
+        paragraph: list[str] = []
+        fence: list[str] = []
+
+        def _flush_paragraph():
+            if paragraph:
+                blocks.append("\n".join(paragraph))
+                paragraph.clear()
+
+        def _flush_section():
+            _flush_paragraph()
+            if blocks:
+                sections.append(([h for _, h in headings], list(blocks)))
+                blocks.clear()
+
+        for line in text.splitlines():
+            if fence:
+                fence.append(line)
+                if FENCE_RE.match(line):
+                    blocks.append("\n".join(fence))
+                    fence.clear()
+                continue
+            if FENCE_RE.match(line):
+                _flush_paragraph()
+                fence.append(line)
+                continue
+            heading = HEADING_RE.match(line)
+            if heading:
+                _flush_section()
+                level = len(heading.group(1))
+                headings = [h for h in headings if h[0] < level] + [(level, heading.group(2))]
+                blocks.append(line)
+                continue
+            if not line.strip():
+                _flush_paragraph()
+            else:
+                paragraph.append(line)
+
+        if fence:
+            blocks.append("\n".join(fence))
+        _flush_section()
+        return sections
+
+    def _split_markdown(self, text: str, size: int, overlap: int) -> list[tuple[str, list[str]]]:
+        results = []
+        for path, blocks in self._markdown_sections(text):
+            breadcrumb = " > ".join(path)
+            budget = max(size - self._count_tokens(breadcrumb), size // 2)
+            units = []
+            for block in blocks:
+                if self._count_tokens(block) > budget:
+                    # Oversized code blocks are cut at lines, prose recursively.
+                    level = 1 if FENCE_RE.match(block) else 0
+                    units.extend(self._split_recursive(block, budget, overlap, level))
+                else:
+                    units.append(block)
+            for chunk in self._pack(units, budget, overlap, "\n\n"):
+                if breadcrumb and not HEADING_RE.match(chunk.split("\n", 1)[0]):
+                    chunk = f"{breadcrumb}\n{chunk}"
+                results.append((chunk, path))
+        return results
+
+    def _split_rows(self, text: str, size: int) -> list[str]:
+        rows = []
+        for row in text.splitlines():
+            if not row.strip():
+                continue
+            if self._count_tokens(row) > size:
+                rows.extend(self._split_recursive(row, size, 0, 2))
+            else:
+                rows.append(row)
+        return self._pack(rows, size, 0, "\n")
+
+    def split_documents(self, documents: Iterable[Document]) -> list[Document]:
+        chunks = []
+        try:
+            for doc in documents:
+                doc_type = _document_type(doc)
+                size = self._size_for(doc_type)
+                overlap = self._overlap_for(size)
+
+                if doc_type in ("md", "markdown"):
+                    pieces = self._split_markdown(doc.page_content, size, overlap)
+                elif doc_type == "csv":
+                    pieces = [(c, None) for c in self._split_rows(doc.page_content, size)]
+                else:
+                    pieces = [(c, None) for c in self._split_recursive(doc.page_content, size, overlap)]
+
+                for index, (text, headings) in enumerate(pieces):
+                    metadata = copy.deepcopy(doc.metadata)
+                    metadata["chunk_index"] = index
+                    if headings:
+                        metadata["headings"] = " > ".join(headings)
+                    chunks.append(Document(page_content=text, metadata=metadata))
+        finally:
+            # Splitters live as long as the session; don't pin its texts.
+            self._count_tokens.cache_clear()
+        return chunks
+
+
+def splitterSettings(text_splitter) -> dict:
+    """The settings that decide how a splitter cuts documents into chunks."""
+    return {
+        "splitter": type(text_splitter).__name__,
+        "version": SPLITTER_VERSION,
+        "chunk_size": getattr(text_splitter, "_chunk_size", None),
+        "chunk_overlap": getattr(text_splitter, "_chunk_overlap", None),
+        "chunk_sizes": dict(sorted(getattr(text_splitter, "chunk_sizes", {}).items())),
+        "model_tokens": getattr(text_splitter, "model_tokens", False),
+    }
+
+
+def splitterFingerprint(text_splitter) -> str:
+    """Short hash of splitterSettings; equal for splitters that chunk alike."""
+    settings = json.dumps(splitterSettings(text_splitter), sort_keys=True)
+    return hashlib.sha1(settings.encode("utf-8")).hexdigest()[:10]
+
+
+def buildTextSplitter(embeddings=None, emb_config: Optional[dict] = None) -> StructuredTextSplitter:
+    """Splitter for the global chunk settings, or a conversation's emb_config."""
+    emb_config = emb_config or {}
+    return StructuredTextSplitter(
+        chunk_size=emb_config.get("chunk_size", EMB_CHUNK_SIZE),
+        chunk_overlap=emb_config.get("chunk_overlap", EMB_CHUNK_OVERLAP),
+        chunk_sizes=emb_config.get("chunk_sizes", EMB_CHUNK_SIZES),
+        token_counter=embeddingTokenizer(embeddings),
+    )
@@ -0,0 +1,155 @@
+# src/libs/tracing.py
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+from src.config import TRACING_CONFIG
+
+TRACE_LOG = "./data/output/logs/trace.jsonl"
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "aeon_current_span", default=None)
+_logger: Optional[logging.Logger] = None
+_logger_lock = threading.Lock()
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def _trace_logger() -> Optional[logging.Logger]:
+    """The JSON-lines logger, built on first use; None when tracing is off."""
+    global _logger
+    if not TRACING_CONFIG.get("enabled", True):
+        return None
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                path = Path(TRACING_CONFIG.get("log_file", TRACE_LOG))
+                path.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(
+                    path, maxBytes=int(TRACING_CONFIG.get("max_bytes", 10 * 1024 * 1024)),
+                    backupCount=int(TRACING_CONFIG.get("backup_count", 5)), encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger = logging.getLogger("aeon.trace")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                logger.addHandler(handler)
+                _logger = logger
+    return _logger
+
+
+def _excluded(name: str) -> bool:
+    return any(name.startswith(prefix) for prefix in TRACING_CONFIG.get("exclude") or ())
+
+
+def _write(record: dict):
+    logger = _trace_logger()
+    if logger is not None:
+        logger.info(json.dumps(record, default=str, ensure_ascii=False))
+
+
+class Span:
+    """One timed step of a trace. Attributes set while open are logged on close."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "started", "start_time")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else _new_id()
+        self.span_id = _new_id()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_time = time.time()
+        self.started = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class _NullSpan:
+    """Stands in when tracing is off so call sites need no checks."""
+
+    trace_id = span_id = parent_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Times a block as a child of the current span and logs it as one JSON line."""
+    if _trace_logger() is None or _excluded(name):
+        yield _NULL_SPAN
+        return
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    status, error = "ok", None
+    try:
+        yield current
+    except BaseException as e:
+        status, error = "error", f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        record = {
+            "ts": current.start_time,
+            "type": "span",
+            "name": name,
+            "trace_id": current.trace_id,
+            "span_id": current.span_id,
+            "parent_id": current.parent_id,
+            "duration_ms": round((time.perf_counter() - current.started) * 1000.0, 3),
+            "status": status,
+            "pid": os.getpid(),
+            "thread": threading.current_thread().name,
+            "attributes": current.attributes,
+        }
+        if error:
+            record["error"] = error
+        _write(record)
+
+
+def traced(name: str):
+    """Decorator form of span() for functions traced as a whole."""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def event(name: str, level: str = "info", **attributes):
+    """Logs a point-in-time event under the current span, if any."""
+    if _trace_logger() is None or _excluded(name):
+        return
+    current = _current_span.get()
+    _write({
+        "ts": time.time(),
+        "type": "event",
+        "name": name,
+        "level": level,
+        "trace_id": current.trace_id if current else None,
+        "span_id": current.span_id if current else None,
+        "pid": os.getpid(),
+        "thread": threading.current_thread().name,
+        "attributes": attributes,
+    })
+
+
+def currentTraceId() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace_id if current else None
@@ -4,8 +4,11 @@ from pathlib import Path
 from src.config import OUTPUT_DIR, MEMORY_DIR, LOADED_PLUGINS, LLM_MODEL, EMB_MODEL
 from src.libs.plugins import PluginManager
 from src.libs.messages import print_error_message, print_aeon_message, print_info_message
+from src.libs.metrics import RESIDENT_SESSIONS
+from src.libs.profiling import profiledRequest
 from src.libs.termLayout import printAeonLayout
 from src.cli.termPrompts import printAeonCmd
+from src.cli.session import switchSession
 from src.cli.handlers import (
     _initialize_session,
     _handle_rag_chat,
@@ -13,6 +16,12 @@ from src.cli.handlers import (
     _handle_zip,
     _handle_load,
     _handle_search,
+    _handle_find,
+    _handle_reindex,
+    _handle_dedup,
+    _handle_watch,
+    _handle_stats,
+    _handle_profile,
     _handle_delete,
     _handle_rename,
     _handle_restart
@@ -31,6 +40,7 @@ def main():
         print_error_message("Failed to initialize AEON. Exiting.")
         sys.exit()
 
+    RESIDENT_SESSIONS.set(1)
     session_vars["output_dir_path"] = output_dir_path
     session_vars["memory_dir_path"] = memory_dir_path
     
@@ -50,11 +60,18 @@ def main():
 
     command_handlers = {
         "/help": lambda sv: printAeonCmd(sv['plugin_manager']),
-        "/list": lambda sv: listConversations(sv["memory_dir_path"]),
+        "/list": lambda sv: listConversations(
+            sv["memory_dir_path"], sv['user_input'][len("/list"):].strip()),
         "/ingest": _handle_ingest,
         "/zip": _handle_zip,
         "/load": _handle_load,
         "/search": _handle_search,
+        "/find": _handle_find,
+        "/reindex": _handle_reindex,
+        "/dedup": _handle_dedup,
+        "/watch": _handle_watch,
+        "/stats": _handle_stats,
+        "/profile": _handle_profile,
         "/delete": _handle_delete,
         "/rename": _handle_rename,
         "/restart": lambda sv: _handle_restart(sv),
@@ -106,13 +123,14 @@ def main():
             if command in ["/restart", "/new", "/open"]:
                 new_session_vars = handler(session_vars)
                 if new_session_vars:
-                    session_vars.update(new_session_vars)
+                    switchSession(session_vars, new_session_vars)
             elif command in ["/help", "/list"]:
                 handler(session_vars)
             else:
                 handler(user_input, session_vars)
         else:
-            _handle_rag_chat(user_input, session_vars)
+            with profiledRequest("chat.turn", session_vars.pop("profile_next", False)):
+                _handle_rag_chat(user_input, session_vars)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
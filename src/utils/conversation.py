@@ -1,11 +1,15 @@
 import json
 import os
 import sqlite3
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
 
+from src.libs.catalog import get_catalog
+from src.libs.historyIndex import get_history_index
 from src.libs.messages import print_error_message
+from src.libs.metrics import PERSIST_SECONDS
 
 
 def _initialize_db(db_path: Path):
@@ -35,6 +39,7 @@ def saveConversation(
         memory_dir: Path,
         filename: str):
     
+    started = time.perf_counter()
     json_file_path = memory_dir / filename
 
     new_turn = {
@@ -73,14 +78,14 @@ def saveConversation(
     
     _initialize_db(db_file_path)
 
+    guid = str(uuid.uuid4())
+    timestamp = datetime.now().isoformat()
+    chat_id = Path(filename).stem
+
     try:
         with sqlite3.connect(db_file_path) as conn:
             cursor = conn.cursor()
             
-            guid = str(uuid.uuid4())
-            timestamp = datetime.now().isoformat()
-            chat_id = Path(filename).stem
-            
             cursor.execute('''
                 INSERT INTO conversations (GUID, USER, AEON, CHAT_ID, SOURCE, TIMESTAMP)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -90,6 +95,20 @@ def saveConversation(
     except sqlite3.Error as e:
         print_error_message(f"Failed to save chat to SQLite database: {e}")
 
+    try:
+        get_catalog().record_turn(memory_dir.name)
+    except sqlite3.Error as e:
+        print_error_message(f"Failed to update conversation catalog: {e}")
+
+    try:
+        get_history_index().add_turn(
+            memory_dir.name, guid, user_message, aeon_message, aeon_source, timestamp)
+    except sqlite3.Error as e:
+        print_error_message(f"Failed to index turn for history search: {e}")
+
+    PERSIST_SECONDS.observe(time.perf_counter() - started)
+    return {"guid": guid, "timestamp": timestamp}
+
 
 def loadConversation(memory_dir: Path, filename: str) -> list:
     """Loads conversation data from a JSON file."""
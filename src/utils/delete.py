@@ -2,6 +2,9 @@
 import shutil
 from pathlib import Path
 
+from src.libs.backgroundTasks import waitForBackgroundTasks
+from src.libs.catalog import get_catalog
+from src.libs.historyIndex import get_history_index
 from src.libs.messages import (
     print_info_message,
     print_success_message,
@@ -18,23 +21,16 @@ def deleteConversation(user_input: str, session_vars: dict):
             return
 
         conv_id = command_parts[1]
-        memory_dir_path = Path(MEMORY_DIR)
+        memory_dir_path = Path(session_vars.get("memory_dir_path") or MEMORY_DIR)
 
-        if not memory_dir_path:
-            print_error_message("MEMORY_DIR is not set in session variables.")
-            return
+        catalog = get_catalog()
+        entry = catalog.resolve(conv_id)
+
+        if entry:
+            selected_conv_path = memory_dir_path / entry["id"]
+            current_memory_path = session_vars.get("current_memory_path")
 
-        conversation_dirs = [d for d in memory_dir_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
-        
-        if session_vars.get("current_memory_path") and session_vars["current_memory_path"] in conversation_dirs:
-            conversation_dirs.remove(session_vars["current_memory_path"])
-
-        idx = int(conv_id) - 1
-        
-        if 0 <= idx < len(conversation_dirs):
-            selected_conv_path = conversation_dirs[idx]
-            
-            if selected_conv_path == session_vars.get("current_memory_path"):
+            if current_memory_path and Path(current_memory_path).name == entry["id"]:
                 print_error_message("Cannot delete the current active conversation.")
                 return
 
@@ -45,18 +41,17 @@ def deleteConversation(user_input: str, session_vars: dict):
             confirmation = input().strip().lower()
 
             if confirmation == 'y':
-                shutil.rmtree(selected_conv_path)
+                waitForBackgroundTasks(selected_conv_path / "db")
+                if selected_conv_path.is_dir():
+                    shutil.rmtree(selected_conv_path)
+                catalog.remove(entry["id"])
+                get_history_index().remove_conversation(entry["id"])
                 print_success_message(f"Conversation '{selected_conv_path.name}' successfully deleted.")
             else:
                 print_info_message("Deletion cancelled.")
         else:
             print_error_message("Invalid conversation number.")
             print_info_message("Use /list to see available conversations.")
-            
-    except ValueError:
-        print_error_message("Invalid input. Please provide a valid number.")
-    except IndexError:
-        print_error_message("Invalid conversation number.")
-        print_info_message("Use /list to see available conversations.")
+
     except Exception as e:
         print_error_message(f"An unexpected error occurred: {e}")
@@ -0,0 +1,25 @@
+# src/utils/embeddingDaemon.py
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import config  # noqa: E402
+from src.core.embeddingService import serveEmbeddings  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="aeon.py embedder",
+        description="Serve the embedding model to every AEON process on this host.")
+    parser.add_argument("--address", default=None,
+                        help="unix:<path> or http://127.0.0.1:<port>; defaults to emb_config.service.address.")
+    args = parser.parse_args(argv)
+    serveEmbeddings(config["emb_config"], args.address)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
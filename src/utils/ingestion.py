@@ -1,18 +1,22 @@
 import json
+import os
 import sqlite3
+import time
+from contextlib import closing
 from pathlib import Path
+from typing import Iterator, Optional
 from langchain_core.documents import Document
-from langchain_community.document_loaders import (
-    DirectoryLoader,
-    UnstructuredMarkdownLoader,
-    UnstructuredFileLoader,
-    TextLoader,
-    CSVLoader)
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.text_splitter import TextSplitter
 from langchain_chroma import Chroma
 from langchain_community.embeddings import LlamaCppEmbeddings
 
-from src.libs.loaders import JsonPlaintextLoader
+from src.config import EMB_LOADERS
+from src.core.dedup import addUniqueDocuments
+from src.libs.loaders import (
+    CsvRowLoader, JsonPlaintextLoader, MarkdownLoader, PlainTextLoader, looksLikeText
+)
+from src.libs.metrics import INGEST_SECONDS
+from src.libs.tracing import event, span, traced
 
 from src.libs.messages import (
     print_info_message,
@@ -22,6 +26,18 @@ from src.libs.messages import (
 )
 
 
+# Per target store: the last (TIMESTAMP, GUID) ingested from each chat database.
+SQLITE_MARKS_FILE = "sqlite_sources.json"
+SQLITE_FETCH_ROWS = 500
+
+# Loaders for the file types read from directories, in load order.
+NATIVE_LOADERS = {
+    ".md": MarkdownLoader,
+    ".txt": PlainTextLoader,
+    ".csv": CsvRowLoader,
+}
+
+
 def _parse_file_metadata(path: Path) -> dict:
     """Extracts metadata from a file path."""
     metadata = {
@@ -34,19 +50,56 @@ def _parse_file_metadata(path: Path) -> dict:
     return metadata
 
 
-def _load_sqlite_db(path: Path) -> list[Document]:
+def _marks_dir(vectorstore) -> Optional[Path]:
+    """Folder of a persistent store, where its ingestion marks are kept."""
+    directory = getattr(vectorstore, "persist_directory", None) or getattr(vectorstore, "_persist_directory", None)
+    return Path(directory) if directory else None
+
+
+def _load_sqlite_marks(vectorstore) -> dict:
+    directory = _marks_dir(vectorstore)
+    if directory is None:
+        return {}
+    try:
+        with open(directory / SQLITE_MARKS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_sqlite_marks(vectorstore, marks: dict):
+    directory = _marks_dir(vectorstore)
+    if directory is None:
+        return
+    directory.mkdir(parents=True, exist_ok=True)
+    tmp_path = directory / f".{SQLITE_MARKS_FILE}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(marks, f, indent=2)
+    os.replace(tmp_path, directory / SQLITE_MARKS_FILE)
+
+
+def _load_sqlite_db(path: Path, since: tuple = ("", "")) -> Iterator[tuple[list[Document], dict]]:
     """
-    Loads documents from a SQLite3 database file.
+    Loads documents from a SQLite3 database file, SQLITE_FETCH_ROWS rows at a time.
     Assumes a table named 'conversations' with columns: GUID, USER, AEON, CHAT_ID, TIMESTAMP.
+
+    Only rows after the (TIMESTAMP, GUID) high-water mark since are read.
+    Each batch is yielded with the mark of its last row, for the caller to
+    save once the batch is stored.
     """
-    documents = []
-    try:
-        with sqlite3.connect(path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM conversations ORDER BY TIMESTAMP ASC")
-            rows = cursor.fetchall()
-            
+    with closing(sqlite3.connect(path)) as conn:
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM conversations "
+            "WHERE COALESCE(TIMESTAMP, '') > ? OR (COALESCE(TIMESTAMP, '') = ? AND GUID > ?) "
+            "ORDER BY COALESCE(TIMESTAMP, ''), GUID", (since[0], since[0], since[1]))
+
+        while True:
+            rows = cursor.fetchmany(SQLITE_FETCH_ROWS)
+            if not rows:
+                return
+            documents = []
             for row in rows:
                 content = f"user: {row['USER']}\naeon: {row['AEON']}\nsource: {row['SOURCE']}"
                 metadata = {
@@ -56,40 +109,45 @@ def _load_sqlite_db(path: Path) -> list[Document]:
                     "timestamp": row['TIMESTAMP']
                 }
                 documents.append(Document(page_content=content, metadata=metadata))
-            
-            print_success_message(f"Successfully loaded {len(documents)} records from the database.")
-    except sqlite3.Error as e:
-        print_error_message(f"SQLite database error when loading '{path}': {e}")
-        return []
-    except Exception as e:
-        print_error_message(f"An unexpected error occurred while loading the database file: {e}")
-        return []
-        
-    return documents
+            yield documents, {"timestamp": rows[-1]['TIMESTAMP'] or "", "guid": rows[-1]['GUID']}
+
+
+def _fallback_loader(path: Path):
+    """unstructured for other file types when enabled, else plain text if it is text."""
+    if EMB_LOADERS.get("unstructured_fallback", False):
+        from langchain_community.document_loaders import UnstructuredFileLoader
+
+        print_info_message(
+            "Attempting to load with UnstructuredFileLoader for unknown type.")
+        return UnstructuredFileLoader(str(path))
+    if looksLikeText(str(path)):
+        print_info_message("Unknown file type. Loading as plain text.")
+        return PlainTextLoader(str(path))
+    print_note_message(
+        f"Skipping '{path}': unsupported file type. Set "
+        "emb_config.loaders.unstructured_fallback to load it with unstructured.")
+    return None
 
 
 def _load_single_file(path: Path) -> list[Document]:
     """Load a single document based on its file extension and parse metadata."""
     if path.suffix.lower() == ".md":
-        loader = UnstructuredMarkdownLoader(str(path))
+        loader = MarkdownLoader(str(path))
     elif path.suffix.lower() == ".txt":
         print_info_message("Detected .txt file. Loading as plain text.")
-        loader = TextLoader(str(path))
+        loader = PlainTextLoader(str(path))
     elif path.suffix.lower() == ".json":
         print_info_message(
             "Detected .json file. Loading with custom JSON plaintext loader.")
         loader = JsonPlaintextLoader(str(path))
     elif path.suffix.lower() == ".csv":
-        print_info_message("Detected .csv file. Loading with CSVLoader.")
-        loader = CSVLoader(str(path))
-    elif path.suffix.lower() == ".sqlite3":
-        print_info_message("Detected .sqlite3 file. Loading as SQLite database.")
-        return _load_sqlite_db(path)
+        print_info_message("Detected .csv file. Loading rows in batches.")
+        loader = CsvRowLoader(str(path))
     else:
-        print_info_message(
-            "Attempting to load with UnstructuredFileLoader for unknown type.")
-        loader = UnstructuredFileLoader(str(path))
-        
+        loader = _fallback_loader(path)
+        if loader is None:
+            return []
+
     documents = loader.load()
     metadata = _parse_file_metadata(path)
     for doc in documents:
@@ -102,26 +160,19 @@ def _load_directory_documents(path: Path) -> list[Document]:
 
     all_documents = []
 
-    md_loader = DirectoryLoader(
-        str(path), glob="**/*.md", loader_cls=UnstructuredMarkdownLoader)
-    md_docs = md_loader.load()
-    for doc in md_docs:
-        doc.metadata.update(_parse_file_metadata(Path(doc.metadata['source'])))
-    all_documents.extend(md_docs)
-
-    txt_loader = DirectoryLoader(
-        str(path), glob="**/*.txt", loader_cls=TextLoader)
-    txt_docs = txt_loader.load()
-    for doc in txt_docs:
-        doc.metadata.update(_parse_file_metadata(Path(doc.metadata['source'])))
-    all_documents.extend(txt_docs)
-
-    csv_loader = DirectoryLoader(
-        str(path), glob="**/*.csv", loader_cls=CSVLoader)
-    csv_docs = csv_loader.load()
-    for doc in csv_docs:
-        doc.metadata.update(_parse_file_metadata(Path(doc.metadata['source'])))
-    all_documents.extend(csv_docs)
+    for suffix, loader_cls in NATIVE_LOADERS.items():
+        for file_path in sorted(path.glob(f"**/*{suffix}")):
+            if not file_path.is_file():
+                continue
+            try:
+                docs = loader_cls(str(file_path)).load()
+            except (OSError, UnicodeError, ValueError) as e:
+                print_error_message(f"Failed to load '{file_path}': {e}")
+                continue
+            metadata = _parse_file_metadata(file_path)
+            for doc in docs:
+                doc.metadata.update(metadata)
+            all_documents.extend(docs)
 
     json_files = list(path.glob("**/*.json"))
     for json_file in json_files:
@@ -133,21 +184,72 @@ def _load_directory_documents(path: Path) -> list[Document]:
         for doc in json_docs:
             doc.metadata.update(_parse_file_metadata(json_file))
         all_documents.extend(json_docs)
-        
-    db_files = list(path.glob("**/*.sqlite3"))
-    for db_file in db_files:
-        print_info_message(
-            f"Found SQLite database file: '{db_file}'. "
-            "Loading conversation history from it.")
-        all_documents.extend(_load_sqlite_db(db_file))
 
     return all_documents
 
 
+def _add_chunks(vectorstore, chunks: list[Document]) -> tuple[int, int, int]:
+    """Adds chunks one by one; returns (added, duplicates, failed)."""
+    success, duplicates, failed = 0, 0, 0
+    for i, chunk in enumerate(chunks, start=1):
+        try:
+            with span("ingest.batch", index=i, size=1,
+                      source=chunk.metadata.get("source")) as batch_span:
+                added, skipped = addUniqueDocuments(vectorstore, [chunk])
+                batch_span.set(added=added, duplicates=skipped)
+            success += added
+            duplicates += skipped
+            if i % 20 == 0 or i == len(chunks):
+                print_success_message(
+                    f"Added {success}/{i} chunks so far.")
+        except Exception as e:
+            failed += 1
+            event("ingest.chunk_failed", level="error", index=i,
+                  source=chunk.metadata.get("source"), error=str(e))
+            print_error_message(f" Failed on chunk {i}: {e}")
+    return success, duplicates, failed
+
+
+def _ingest_sqlite_db(path: Path, vectorstore, text_splitter: TextSplitter,
+                      marks: dict) -> tuple[int, int, int, int]:
+    """Stores a chat database batch by batch; returns (added, duplicates, failed, chunks).
+
+    The database's mark advances after each fully stored batch, so an
+    interrupted ingest resumes at the first batch that did not make it.
+    """
+    key = str(path.resolve())
+    mark = marks.get(key) or {}
+    since = (mark.get("timestamp", ""), mark.get("guid", ""))
+    records = 0
+    totals = [0, 0, 0, 0]
+    try:
+        for documents, batch_mark in _load_sqlite_db(path, since):
+            records += len(documents)
+            chunks = text_splitter.split_documents(documents)
+            added, duplicates, failed = _add_chunks(vectorstore, chunks)
+            for index, value in enumerate((added, duplicates, failed, len(chunks))):
+                totals[index] += value
+            if failed:
+                print_error_message(
+                    f"Stopped reading '{path}': {failed} chunks failed. "
+                    "The remaining records are read again next time.")
+                break
+            marks[key] = batch_mark
+            _save_sqlite_marks(vectorstore, marks)
+    except sqlite3.Error as e:
+        print_error_message(f"SQLite database error when loading '{path}': {e}")
+    if mark and not records:
+        print_info_message(f"No new records in '{path}' since {since[0]}.")
+    else:
+        print_success_message(f"Successfully loaded {records} records from the database.")
+    return tuple(totals)
+
+
+@traced("ingest.documents")
 def ingestDocuments(
         path_to_ingest: str,
         vectorstore: Chroma,
-        text_splitter: RecursiveCharacterTextSplitter,
+        text_splitter: TextSplitter,
         embeddings: LlamaCppEmbeddings):
 
     path = Path(path_to_ingest)
@@ -156,56 +258,59 @@ def ingestDocuments(
         print_error_message(f"Path not found: '{path_to_ingest}'")
         return
 
+    started = time.perf_counter()
     try:
         if path.is_file():
             print_info_message(
                 f"Ingesting single file: '{path_to_ingest}'")
-            ingested_documents = _load_single_file(path)
+            is_database = path.suffix.lower() == ".sqlite3"
+            ingested_documents = [] if is_database else _load_single_file(path)
+            db_files = [path] if is_database else []
         elif path.is_dir():
             print_info_message(
                 f"Ingesting documents from directory: '{path_to_ingest}'")
             ingested_documents = _load_directory_documents(path)
+            db_files = sorted(path.glob("**/*.sqlite3"))
         else:
             print_error_message(
                 f"Invalid path type: '{path_to_ingest}'. "
                 "Please provide a file or a directory.")
             return
 
-        if not ingested_documents:
+        if not ingested_documents and not db_files:
             print_note_message(
                 f"No documents found to ingest at '{path_to_ingest}'.")
             return
 
-        print_info_message(f"Loaded {len(ingested_documents)} new documents.")
+        success, duplicates, failed, total = 0, 0, 0, 0
         if ingested_documents:
+            print_info_message(f"Loaded {len(ingested_documents)} new documents.")
             first_doc_meta = ingested_documents[0].metadata
             print_info_message(f"Sample metadata: {first_doc_meta}")
 
-        new_chunks = text_splitter.split_documents(ingested_documents)
-        print_info_message(f"Split into {len(new_chunks)} chunks.")
+            new_chunks = text_splitter.split_documents(ingested_documents)
+            print_info_message(f"Split into {len(new_chunks)} chunks.")
 
-        print_info_message("Adding new chunks to "
-                           "vector store (safe mode: 1 by 1)...")
-        success, failed = 0, 0
-        for i, chunk in enumerate(new_chunks, start=1):
-            try:
-                vectorstore.add_documents([chunk])
-                success += 1
-                if i % 20 == 0 or i == len(new_chunks):
-                    print_success_message(
-                        f"Added {success}/{i} chunks so far.")
-            except Exception as e:
-                failed += 1
-                print_error_message(f" Failed on chunk {i}: {e}")
+            print_info_message("Adding new chunks to "
+                               "vector store (safe mode: 1 by 1)...")
+            success, duplicates, failed = _add_chunks(vectorstore, new_chunks)
+            total = len(new_chunks)
 
-        print_info_message(
-            f"Ingestion finished. Success: {success}, "
-            f"Failed: {failed}, Total: {len(new_chunks)}")
+        # Chat databases are streamed in batches; their marks are saved as
+        # each batch is stored, so a failed ingest reads the rest again.
+        sqlite_marks = _load_sqlite_marks(vectorstore)
+        for db_file in db_files:
+            print_info_message(
+                f"Found SQLite database file: '{db_file}'. "
+                "Loading conversation history from it.")
+            counts = _ingest_sqlite_db(db_file, vectorstore, text_splitter, sqlite_marks)
+            success, duplicates, failed, total = (
+                a + b for a, b in zip((success, duplicates, failed, total), counts))
 
-        if new_chunks:
-            sample = new_chunks[0].page_content[:100].replace("\n", " ")
-            vec = embeddings.embed_query(sample)
-            print_info_message(f"Verified embedding vector size: {len(vec)}")
+        print_info_message(
+            f"Ingestion finished. Success: {success}, Duplicates: {duplicates}, "
+            f"Failed: {failed}, Total: {total}")
+        INGEST_SECONDS.observe(time.perf_counter() - started, kind="documents")
 
     except Exception as e:
         print_error_message(
@@ -231,10 +336,10 @@ def ingestConversationHistory(
     new_chunks = text_splitter.split_documents(documents_to_ingest)
     if new_chunks:
         try:
-            vectorstore.add_documents(new_chunks)
+            added, skipped = addUniqueDocuments(vectorstore, new_chunks)
             print_success_message(
-                f"Successfully added {len(new_chunks)} "
-                "conversation chunks to the vector store.")
+                f"Successfully added {added} "
+                f"conversation chunks to the vector store ({skipped} duplicates skipped).")
         except Exception as e:
             print_error_message(
                 f"Failed to add conversation chunks to vector store: {e}")
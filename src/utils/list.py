@@ -1,17 +1,26 @@
 # src/utils/list.py
 from pathlib import Path
+from src.libs.catalog import get_catalog
 from src.libs.messages import print_info_message, print_note_message
 
 
-def listConversations(memory_dir_path: Path):
+def listConversations(memory_dir_path: Path, page: str = "", page_size: int = 50):
 
     print_info_message("Available conversations:")
-    conversation_dirs = [d for d in memory_dir_path.iterdir() if d.is_dir()
-                         and not d.name.startswith('.')]
-    if not conversation_dirs:
+    page = int(page) if str(page).isdigit() else 1
+    catalog = get_catalog()
+    offset = (max(page, 1) - 1) * page_size
+    conversations = catalog.list(limit=page_size, offset=offset)
+    if not conversations:
         print_note_message("No conversations found.")
     else:
-        for i, conv_dir in enumerate(conversation_dirs):
-            print_info_message(f"[{i+1}] {conv_dir.name}")
+        for i, conv in enumerate(conversations, start=offset + 1):
+            print_info_message(
+                f"[{i}] {conv['title']} "
+                f"({conv['turn_count']} turns, updated {conv['updated_at'][:16]})")
+        total = catalog.count()
+        if total > offset + len(conversations):
+            print_note_message(f"Showing {offset + 1}-{offset + len(conversations)} of {total}. "
+                               f"Type: /list {page + 1}")
 
     print_info_message("To open conversation type: /open <NUMBER>")
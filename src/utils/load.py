@@ -1,26 +1,254 @@
 # src/utils/load.py
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import uuid
 import zipfile
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import Optional
+
 from src.config import MEMORY_DIR
-from src.libs.messages import print_success_message, print_error_message
+from src.libs.catalog import get_catalog
+from src.libs.historyIndex import get_history_index
+from src.utils.zipBackup import MANIFEST_NAME, READ_CHUNK_SIZE, sha256File
+from src.libs.messages import (print_success_message, print_error_message,
+                               print_info_message)
+
+MAX_MEMBERS = 100_000
+MAX_MEMBER_SIZE = 8 * 1024 ** 3
+MAX_TOTAL_SIZE = 32 * 1024 ** 3
+PARALLEL_MIN_SIZE = 16 * 1024 * 1024
+EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+
+
+class BackupValidationError(Exception):
+    """Raised when a backup archive is unsafe or does not match its manifest."""
+
+
+def _safe_relative_path(name: str) -> Optional[PurePosixPath]:
+    """Returns the member path if it stays inside the extraction root."""
+    if not name or "\\" in name or name.startswith("/"):
+        return None
+    path = PurePosixPath(name)
+    if any(part in ("..", "") for part in path.parts) or ":" in path.parts[0]:
+        return None
+    return path
+
+
+def _read_manifest(zf: zipfile.ZipFile) -> Optional[dict]:
+    try:
+        info = zf.getinfo(MANIFEST_NAME)
+    except KeyError:
+        return None
+    if info.file_size > MAX_MEMBER_SIZE:
+        raise BackupValidationError("Backup manifest is too large.")
+    try:
+        return json.loads(zf.read(info))
+    except json.JSONDecodeError as e:
+        raise BackupValidationError(f"Backup manifest is corrupt: {e}")
+
+
+def _plan_members(zf: zipfile.ZipFile, manifest: Optional[dict], zip_file: Path):
+    """Validates every member and maps it to a path inside the conversation.
+
+    Archives written by iterBackup (and the old web backup) nest files under
+    '<conversation_id>/'. Old CLI backups store them at the root instead.
+    """
+    infos = [i for i in zf.infolist() if i.filename != MANIFEST_NAME]
+    if len(infos) > MAX_MEMBERS:
+        raise BackupValidationError(f"Backup has too many entries ({len(infos)}).")
+
+    total_size = 0
+    paths = []
+    for info in infos:
+        path = _safe_relative_path(info.filename)
+        if path is None:
+            raise BackupValidationError(f"Unsafe path in backup: '{info.filename}'.")
+        if stat.S_ISLNK(info.external_attr >> 16):
+            raise BackupValidationError(f"Symlinks are not allowed in backups: '{info.filename}'.")
+        if info.file_size > MAX_MEMBER_SIZE:
+            raise BackupValidationError(f"Entry '{info.filename}' exceeds the size limit.")
+        total_size += info.file_size
+        paths.append(path)
+
+    if total_size > MAX_TOTAL_SIZE:
+        raise BackupValidationError("Backup exceeds the total size limit.")
+
+    top_levels = {p.parts[0] for p in paths}
+    nested = len(top_levels) == 1 and all(len(p.parts) > 1 or i.is_dir()
+                                          for p, i in zip(paths, infos))
+    if manifest and manifest.get("conversation_id"):
+        conv_id = manifest["conversation_id"]
+    elif nested:
+        conv_id = next(iter(top_levels))
+    else:
+        chat_json = next((p for p in paths if len(p.parts) == 1 and p.suffix == ".json"), None)
+        conv_id = chat_json.stem if chat_json else zip_file.stem
+
+    if _safe_relative_path(conv_id) is None or len(PurePosixPath(conv_id).parts) != 1 \
+            or conv_id.startswith("."):
+        raise BackupValidationError(f"Invalid conversation ID in backup: '{conv_id}'.")
+
+    plan = []
+    for info, path in zip(infos, paths):
+        if info.is_dir():
+            continue
+        rel = PurePosixPath(*path.parts[1:]) if nested else path
+        plan.append((info, rel.as_posix()))
+    return conv_id, plan
+
+
+def _extract_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo,
+                    target: Path, expected_sha256: Optional[str]):
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    written = 0
+    with zf.open(info, 'r') as src, open(target, 'wb') as dst:
+        while True:
+            block = src.read(READ_CHUNK_SIZE)
+            if not block:
+                break
+            written += len(block)
+            if written > info.file_size:
+                raise BackupValidationError(f"Entry '{info.filename}' is larger than declared.")
+            digest.update(block)
+            dst.write(block)
+
+    if expected_sha256 and digest.hexdigest() != expected_sha256:
+        raise BackupValidationError(f"Checksum mismatch for '{info.filename}'.")
 
 
-def loadBackup(zip_path: str, destination_path: Path):
+def _extract_all(zip_file: Path, plan: list, staging_path: Path, manifest_files: dict):
+    """Streams members to disk; large members are extracted in parallel."""
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+    small = [m for m in plan if m[0].file_size < PARALLEL_MIN_SIZE]
+    large = [m for m in plan if m[0].file_size >= PARALLEL_MIN_SIZE]
+
+    def _run(member):
+        # ZipFile handles are not safe to share, so each thread opens its own.
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(zip_file, 'r')
+            with handles_lock:
+                handles.append(local.zf)
+        info, rel = member
+        expected = manifest_files.get(rel, {}).get("sha256")
+        _extract_member(local.zf, info, staging_path / rel, expected)
+
+    try:
+        with ThreadPoolExecutor(max_workers=EXTRACT_WORKERS) as executor:
+            futures = [executor.submit(_run, member) for member in large]
+            for member in small:
+                _run(member)
+            for future in futures:
+                future.result()
+    finally:
+        for zf in handles:
+            zf.close()
+
+
+def _copy_unchanged(manifest: dict, extracted: set, current_path: Path, staging_path: Path):
+    """Fills in files an incremental backup left out from the live conversation."""
+    for rel, entry in manifest.get("files", {}).items():
+        if rel in extracted:
+            continue
+        if _safe_relative_path(rel) is None:
+            raise BackupValidationError(f"Unsafe path in backup manifest: '{rel}'.")
+        source = current_path / rel
+        if not source.is_file() or sha256File(source) != entry["sha256"]:
+            raise BackupValidationError(
+                f"Incremental backup needs '{rel}', which is missing or changed locally. "
+                "Restore the full backup first.")
+        target = staging_path / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, target)
+
+
+def _swap_into_place(staging_path: Path, final_path: Path):
+    """Replaces final_path with staging_path using directory renames."""
+    if not final_path.exists():
+        os.replace(staging_path, final_path)
+        return
+    retired_path = final_path.with_name(f".retired-{final_path.name}-{uuid.uuid4().hex[:8]}")
+    os.replace(final_path, retired_path)
+    try:
+        os.replace(staging_path, final_path)
+    except OSError:
+        os.replace(retired_path, final_path)
+        raise
+    shutil.rmtree(retired_path, ignore_errors=True)
+
+
+def _warm_restored_store(conv_path: Path):
+    """Reads the restored vector store once so its pages are already cached."""
+    db_path = conv_path / "db"
+    if not db_path.is_dir():
+        return
+    for file_path in db_path.rglob("*"):
+        if not file_path.is_file():
+            continue
+        try:
+            with open(file_path, 'rb') as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                else:
+                    while f.read(READ_CHUNK_SIZE):
+                        pass
+        except OSError:
+            continue
+
+
+def loadBackup(zip_path: str, destination_path: Path = None):
     zip_file = Path(zip_path)
-    destination_path = MEMORY_DIR
-    
+    destination_path = Path(destination_path or MEMORY_DIR)
+
     if not zip_file.exists():
         print_error_message(f"Error: The file '{zip_path}' does not exist.")
         return False
     if not zipfile.is_zipfile(zip_file):
         print_error_message(f"Error: The file '{zip_path}' is not a valid zip archive.")
         return False
-        
+
+    staging_path = None
     try:
-        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-            zip_ref.extractall(destination_path)
-        print_success_message(f"Successfully unzipped '{zip_path}' to '{destination_path}'.")
-        return True
+        with zipfile.ZipFile(zip_file, 'r') as zf:
+            manifest = _read_manifest(zf)
+            conv_id, plan = _plan_members(zf, manifest, zip_file)
+
+        manifest_files = manifest.get("files", {}) if manifest else {}
+        final_path = destination_path / conv_id
+        staging_path = destination_path / f".restore-{conv_id}-{uuid.uuid4().hex[:8]}"
+        staging_path.mkdir(parents=True)
+
+        print_info_message(f"Restoring {len(plan)} files for '{conv_id}'...")
+        _extract_all(zip_file, plan, staging_path, manifest_files)
+
+        if manifest and manifest.get("base"):
+            _copy_unchanged(manifest, {rel for _, rel in plan}, final_path, staging_path)
+
+        _swap_into_place(staging_path, final_path)
+        staging_path = None
+        _warm_restored_store(final_path)
+
+        catalog = get_catalog()
+        if catalog.memory_dir_path.resolve() == destination_path.resolve():
+            catalog.refresh(conv_id)
+            get_history_index().index_conversation(conv_id)
+
+        print_success_message(f"Successfully restored '{zip_path}' to '{final_path}'.")
+        return conv_id
+    except BackupValidationError as e:
+        print_error_message(f"Backup rejected: {e}")
+        return False
     except Exception as e:
         print_error_message(f"An error occurred during unzipping: {e}")
-        return False
\ No newline at end of file
+        return False
+    finally:
+        if staging_path is not None:
+            shutil.rmtree(staging_path, ignore_errors=True)
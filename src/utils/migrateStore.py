@@ -0,0 +1,146 @@
+# src/utils/migrateStore.py
+import argparse
+import shutil
+import sys
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_chroma import Chroma  # noqa: E402
+
+from src.config import MEMORY_DIR, EMB_VECTOR_STORE  # noqa: E402
+from src.core.vectorStores import STORE_DIRS, createLocalVectorStore  # noqa: E402
+from src.libs.messages import (  # noqa: E402
+    print_info_message, print_success_message, print_error_message, print_note_message
+)
+
+RECALL_K = 10
+RECALL_SAMPLE = 200
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) if path.exists() else 0
+
+
+def _chroma_paths(db_path: Path) -> list[Path]:
+    """Chroma's own files: chroma.sqlite3 plus one folder per HNSW segment."""
+    paths = [p for p in db_path.iterdir()
+             if p.is_dir() and p.name not in STORE_DIRS.values() and not p.name.startswith('.')]
+    chroma_sqlite = db_path / "chroma.sqlite3"
+    if chroma_sqlite.exists():
+        paths.append(chroma_sqlite)
+    return paths
+
+
+def _measure_recall(store, vectors: np.ndarray, ids: list[str]) -> float:
+    """Recall@k of the migrated store against exact float32 search."""
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(vectors), size=min(RECALL_SAMPLE, len(vectors)), replace=False)
+    norms = (vectors ** 2).sum(axis=1)
+    hits = 0
+    total = 0
+    k = min(RECALL_K, len(vectors))
+    for i in sample:
+        query = vectors[i]
+        exact = np.argsort(norms - 2.0 * vectors @ query)[:k]
+        expected = {ids[j] for j in exact}
+        found = {doc.id for doc, _ in
+                 store.similarity_search_by_vector_with_relevance_scores(query, k=k)}
+        hits += len(expected & found)
+        total += k
+    return hits / total if total else 1.0
+
+
+def migrateVectorStore(conv_path: Path, store_config: dict, drop_chroma: bool = False) -> dict:
+    db_path = conv_path / "db"
+    if not db_path.is_dir():
+        raise FileNotFoundError(f"No vector store found at '{db_path}'.")
+
+    chroma_size = sum(_dir_size(p) if p.is_dir() else p.stat().st_size
+                      for p in _chroma_paths(db_path))
+    data = Chroma(persist_directory=str(db_path)).get(
+        include=["embeddings", "documents", "metadatas"])
+    ids = list(data["ids"])
+    if not ids:
+        print_note_message(f"'{conv_path.name}' has no vectors to migrate.")
+        return {"conversation": conv_path.name, "vectors": 0}
+    vectors = np.asarray(data["embeddings"], dtype=np.float32)
+
+    backend = store_config.get("backend", "compact")
+    staging = db_path / f".{STORE_DIRS[backend]}-{uuid.uuid4().hex[:8]}"
+    store = createLocalVectorStore(backend, staging, None, store_config)
+    store.add_vectors(vectors, list(data["documents"]),
+                      [m or {} for m in data["metadatas"]], ids)
+    recall = _measure_recall(store, vectors, ids)
+
+    del store
+    target = db_path / STORE_DIRS[backend]
+    if target.exists():
+        shutil.rmtree(target)
+    staging.rename(target)
+    migrated_size = _dir_size(target)
+
+    if drop_chroma:
+        for path in _chroma_paths(db_path):
+            shutil.rmtree(path) if path.is_dir() else path.unlink()
+
+    report = {
+        "conversation": conv_path.name,
+        "backend": backend,
+        "vectors": len(ids),
+        "chroma_bytes": chroma_size,
+        "migrated_bytes": migrated_size,
+        f"recall_at_{RECALL_K}": round(recall, 4),
+    }
+    print_success_message(
+        f"Migrated '{conv_path.name}' to {backend}: {len(ids)} vectors, "
+        f"{chroma_size / 1024:.0f} KiB -> {migrated_size / 1024:.0f} KiB, "
+        f"recall@{RECALL_K} = {recall:.3f}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert conversation Chroma stores to a local vector backend.")
+    parser.add_argument("conversations", nargs="*",
+                        help="Conversation IDs to migrate (default: all).")
+    parser.add_argument("--backend", choices=sorted(STORE_DIRS), default="compact")
+    parser.add_argument("--quantization", choices=["int8", "binary", "none"],
+                        default=EMB_VECTOR_STORE.get("quantization", "int8"))
+    parser.add_argument("--dimensions", type=int,
+                        default=EMB_VECTOR_STORE.get("dimensions"))
+    parser.add_argument("--no-rescore", action="store_true",
+                        help="Do not keep float16 vectors for re-scoring.")
+    parser.add_argument("--drop-chroma", action="store_true",
+                        help="Delete the Chroma files after a successful migration.")
+    args = parser.parse_args()
+
+    store_config = {
+        **EMB_VECTOR_STORE,
+        "backend": args.backend,
+        "background": False,
+        "quantization": args.quantization,
+        "dimensions": args.dimensions,
+        "rescore": not args.no_rescore,
+        "rescore_multiplier": EMB_VECTOR_STORE.get("rescore_multiplier", 4),
+    }
+    memory_dir_path = project_root / MEMORY_DIR
+    names = args.conversations or sorted(
+        d.name for d in memory_dir_path.iterdir() if d.is_dir() and not d.name.startswith('.'))
+
+    for name in names:
+        try:
+            migrateVectorStore(memory_dir_path / name, store_config, args.drop_chroma)
+        except Exception as e:
+            print_error_message(f"Failed to migrate '{name}': {e}")
+
+    print_info_message(
+        f"Set emb_config.vector_store.backend to '{args.backend}' to use the migrated stores.")
+
+
+if __name__ == "__main__":
+    main()
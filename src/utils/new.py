@@ -3,8 +3,10 @@ import hashlib
 from datetime import datetime
 from pathlib import Path
 from src.libs.messages import print_boot_message, print_success_message
+from src.core.modelCache import configMtime
 from src.core.ragSystem import ragSystem
-from src.config import copy_config_to_chat
+from src.config import copy_config_to_chat, LLM_MODEL, EMB_MODEL
+from src.libs.catalog import get_catalog
 
 def newConversation(memory_dir_path: Path):
     print_boot_message("Starting a new conversation...")
@@ -16,6 +18,7 @@ def newConversation(memory_dir_path: Path):
     current_memory_path = memory_dir_path / conversation_hash
     current_memory_path.mkdir(parents=True, exist_ok=True)
     copy_config_to_chat(conversation_hash)
+    get_catalog().add(conversation_hash, LLM_MODEL, EMB_MODEL)
     chroma_db_dir_path = current_memory_path / 'db'
     conversation_filename = f"{conversation_hash}.json"
     current_chat_history = []
@@ -36,5 +39,6 @@ def newConversation(memory_dir_path: Path):
         "current_memory_path": current_memory_path,
         "conversation_filename": conversation_filename,
         "current_chat_history": current_chat_history,
+        "config_mtime": configMtime(current_memory_path),
         "user_prompt_string": f"\033[92m[\033[93m{conversation_hash}\033[92m@\033[92m>>>>]:\033[0m "
     }
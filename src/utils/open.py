@@ -1,8 +1,10 @@
 import yaml
 from pathlib import Path
+from src.libs.catalog import get_catalog
 from src.libs.messages import (print_boot_message,
                                print_success_message, print_error_message,
                                print_info_message)
+from src.core.modelCache import configMtime
 from src.core.ragSystem import ragSystem
 from src.utils.conversation import loadConversation
 
@@ -17,62 +19,56 @@ def openConversation(
     llm_instance
 ):
 
-    conversation_dirs = [d for d in memory_dir_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
+    entry = get_catalog().resolve(conv_id)
+    if not entry or not (memory_dir_path / entry["id"]).is_dir():
+        print_error_message("Invalid input. Please provide a number from the list.")
+        return None
 
-    try:
-        idx = int(conv_id) - 1
-        if 0 <= idx < len(conversation_dirs):
-            selected_conv_path = conversation_dirs[idx]
-            conversation_hash_name = selected_conv_path.name
+    conversation_hash_name = entry["id"]
 
-            print_boot_message(f"Opening conversation: {conversation_hash_name}")
-            
-            current_memory_path = memory_dir_path / conversation_hash_name
-            config_path = current_memory_path / "config.yml"
-            
-            # Load the config file for the selected conversation
-            try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    conversation_config = yaml.safe_load(f)
-                print_info_message(f"Loaded config from: {config_path}")
-            except FileNotFoundError:
-                print_error_message(f"Configuration file not found for this conversation: {config_path}")
-                return None
-            except Exception as e:
-                print_error_message(f"Failed to load config file: {e}")
-                return None
+    print_boot_message(f"Opening conversation: {conversation_hash_name}")
 
-            chroma_db_dir_path = current_memory_path / "db"
-            conversation_filename = (f"{conversation_hash_name}.json")
+    current_memory_path = memory_dir_path / conversation_hash_name
+    config_path = current_memory_path / "config.yml"
 
-            (rag_chain, vectorstore, text_splitter,
-                llama_embeddings, llm_instance) = ragSystem(
-                current_memory_path, chroma_db_dir_path, is_new_session=False)
+    # Load the config file for the selected conversation
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            conversation_config = yaml.safe_load(f)
+        print_info_message(f"Loaded config from: {config_path}")
+    except FileNotFoundError:
+        print_error_message(f"Configuration file not found for this conversation: {config_path}")
+        return None
+    except Exception as e:
+        print_error_message(f"Failed to load config file: {e}")
+        return None
 
-            current_chat_history = loadConversation(
-                current_memory_path, conversation_filename)
+    chroma_db_dir_path = current_memory_path / "db"
+    conversation_filename = (f"{conversation_hash_name}.json")
 
-            print_success_message(
-                "Successfully loaded conversation"
-                f" from '{conversation_hash_name}'.")
+    (rag_chain, vectorstore, text_splitter,
+        llama_embeddings, llm_instance) = ragSystem(
+        current_memory_path, chroma_db_dir_path, is_new_session=False)
 
-            return {
-                "rag_chain": rag_chain,
-                "vectorstore": vectorstore,
-                "text_splitter": text_splitter,
-                "llama_embeddings": llama_embeddings,
-                "llm_instance": llm_instance,
-                "current_memory_path": current_memory_path,
-                "conversation_filename": conversation_filename,
-                "current_chat_history": current_chat_history,
-                "loaded_config": conversation_config,
-                "user_prompt_string": f"\033[92m[\033[93m{conversation_hash_name}\033[92m@\033[92m>>>>]:\033[0m "
-            }
-        
-        else:
-            print_error_message("Invalid input. Please provide a number from the list.")
-            return None
+    current_chat_history = loadConversation(
+        current_memory_path, conversation_filename)
 
-    except ValueError:
-        print_error_message("Invalid input. Please provide a number from the list.")
-        return None
+    print_success_message(
+        "Successfully loaded conversation"
+        f" from '{conversation_hash_name}'.")
+
+    return {
+        "rag_chain": rag_chain,
+        "vectorstore": vectorstore,
+        "text_splitter": text_splitter,
+        "llama_embeddings": llama_embeddings,
+        "llm_instance": llm_instance,
+        "current_memory_path": current_memory_path,
+        "conversation_filename": conversation_filename,
+        "current_chat_history": current_chat_history,
+        "loaded_config": conversation_config,
+        "config_mtime": configMtime(current_memory_path),
+        "llm_config": llm_instance.model_path,
+        "emb_config": llama_embeddings.model_path,
+        "user_prompt_string": f"\033[92m[\033[93m{conversation_hash_name}\033[92m@\033[92m>>>>]:\033[0m "
+    }
@@ -5,6 +5,9 @@ from src.libs.messages import (
     print_error_message
 )
 from src.config import MEMORY_DIR
+from src.libs.backgroundTasks import waitForBackgroundTasks
+from src.libs.catalog import get_catalog
+from src.libs.historyIndex import get_history_index
 
 def renameConversation(user_input: str, memory_dir_path: Path):
     try:
@@ -22,21 +25,13 @@ def renameConversation(user_input: str, memory_dir_path: Path):
             print_error_message("New name cannot be empty.")
             return False
 
-        conversation_dirs = [d for d in memory_dir_path.iterdir() if d.is_dir()
-                                   and not d.name.startswith('.')]
-
-        try:
-            conv_index = int(conv_number_str) - 1
-            if not (0 <= conv_index < len(conversation_dirs)):
-                print_error_message(
-                    "Invalid conversation number.")
-                return False
-        except ValueError:
+        entry = get_catalog().resolve(conv_number_str)
+        if not entry:
             print_error_message(
-                "Invalid input. Please enter a number for the conversation.")
+                "Invalid conversation number.")
             return False
 
-        current_conv_dir = conversation_dirs[conv_index]
+        current_conv_dir = memory_dir_path / entry["id"]
         current_name = current_conv_dir.name
 
         new_conv_dir = memory_dir_path / new_name
@@ -45,6 +40,7 @@ def renameConversation(user_input: str, memory_dir_path: Path):
                 f"A conversation named '{new_name}' already exists.")
             return False
 
+        waitForBackgroundTasks(current_conv_dir / "db")
         current_conv_dir.rename(new_conv_dir)
 
         old_json_file = next((f for f in new_conv_dir.glob("*.json")), None)
@@ -52,6 +48,9 @@ def renameConversation(user_input: str, memory_dir_path: Path):
             new_json_path = new_conv_dir / f"{new_name}.json"
             old_json_file.rename(new_json_path)
 
+        get_catalog().rename(current_name, new_name)
+        get_history_index().rename_conversation(current_name, new_name)
+
         print_info_message(
             f"Chat '{current_name}' successfully renamed to '{new_name}'.")
         return True 
@@ -74,6 +73,7 @@ def renameConversationForWeb(conv_id: str, new_name: str, memory_dir_path: Path)
         if new_conv_dir.exists():
             return False, f"A conversation named '{new_name}' already exists."
 
+        waitForBackgroundTasks(current_conv_dir / "db")
         current_conv_dir.rename(new_conv_dir)
 
         old_json_file = next((f for f in new_conv_dir.glob("*.json")), None)
@@ -81,6 +81,9 @@ def renameConversationForWeb(conv_id: str, new_name: str, memory_dir_path: Path)
             new_json_path = new_conv_dir / f"{new_name}.json"
             old_json_file.rename(new_json_path)
 
+        get_catalog().rename(conv_id, new_name)
+        get_history_index().rename_conversation(conv_id, new_name)
+
         print_info_message(f"Chat '{conv_id}' successfully renamed to '{new_name}'.")
         return True, new_name
     except Exception as e:
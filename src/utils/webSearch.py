@@ -5,11 +5,15 @@ from langchain_core.documents import Document
 from langchain.prompts import PromptTemplate
 from langchain_community.llms import LlamaCpp
 from langchain_core.documents import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.text_splitter import TextSplitter
 from langchain_chroma import Chroma
 from ddgs import DDGS
 
 from src.config import SYSTEM_PROMPT
+from src.core.dedup import addUniqueDocuments
+from src.core.memoryTiers import llmLock
+from src.libs.metrics import INGEST_SECONDS, SEARCH_CALLS
+from src.libs.tracing import traced
 from src.libs.messages import (
     print_success_message,
     print_info_message,
@@ -39,7 +43,7 @@ def _perform_search_and_get_context(search_query: str) -> list:
 
 def _ingest_search_results(
         search_docs: list[Document],
-        text_splitter: RecursiveCharacterTextSplitter,
+        text_splitter: TextSplitter,
         vectorstore: Chroma) -> bool:
 
     try:
@@ -59,11 +63,11 @@ def _ingest_search_results(
         success_count = 0
         for i, chunk in enumerate(all_chunks):
             try:
-                vectorstore.add_documents([chunk])
+                added, _ = addUniqueDocuments(vectorstore, [chunk])
                 success_count += 1
                 print_info_message(
                     f"Ingested chunk {i + 1}/{len(all_chunks)} "
-                    "successfully.")
+                    f"{'successfully' if added else '(duplicate, merged)'}.")
             except Exception as e_chunk_ingest:
                 print_error_message(
                     "FAILED to ingest chunk "
@@ -112,18 +116,21 @@ def _generate_summary(
         context=search_context,
         query=search_query
     )
-    summary_response = llm_instance.invoke(formatted_summary_input)
+    with llmLock(llm_instance):
+        summary_response = llm_instance.invoke(formatted_summary_input)
     print_success_message("Search results summarized.")
 
     return summary_response
 
 
+@traced("web.search")
 def webSearch(
         search_query: str,
         llm_instance: LlamaCpp,
-        text_splitter: RecursiveCharacterTextSplitter,
+        text_splitter: TextSplitter,
         vectorstore: Chroma) -> None:
 
+    SEARCH_CALLS.inc()
     try:
         search_results = _perform_search_and_get_context(search_query)
 
@@ -142,12 +149,15 @@ def webSearch(
                     page_content=result['body'],
                     metadata={
                         "source": result['href'], 
-                        "query": search_query
+                        "query": search_query,
+                        "file_type": "web"
                     }
                 )
             )
 
-        if not _ingest_search_results(search_docs, text_splitter, vectorstore):
+        with INGEST_SECONDS.time(kind="search"):
+            ingested = _ingest_search_results(search_docs, text_splitter, vectorstore)
+        if not ingested:
             return (
                 "I found search results, but encountered an error "
                 "ingesting them into my knowledge base. Please check "
@@ -1,13 +1,186 @@
-# src/libs/zip.py
-import shutil
+# src/utils/zipBackup.py
+import hashlib
+import json
+import os
+import zipfile
 from datetime import datetime
 from pathlib import Path
+from typing import Iterator, Optional
 
 from src.libs.messages import (print_info_message,
                                print_success_message, print_error_message)
 
+MANIFEST_NAME = "aeon_manifest.json"
+MANIFEST_VERSION = 1
+READ_CHUNK_SIZE = 1024 * 1024
 
-def zipBackup(source_dir: Path, output_dir: str):
+# Already-compressed media and binary vector store files barely shrink
+# under DEFLATE, so they are stored as-is to keep backups CPU-cheap.
+STORED_SUFFIXES = {
+    ".sqlite3", ".bin", ".pickle", ".parquet", ".npy", ".gguf",
+    ".zip", ".gz", ".bz2", ".xz", ".7z",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp",
+    ".wav", ".mp3", ".ogg", ".flac", ".mp4", ".webm",
+}
+
+
+class _StreamSink:
+    """Write-only, non-seekable buffer that ZipFile writes into.
+
+    ZipFile falls back to data descriptors when the target cannot seek,
+    so the archive can be drained chunk by chunk while it is written.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def sha256File(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _manifest_path(manifest_dir: Path, conversation_id: str) -> Path:
+    return manifest_dir / f"{conversation_id}.json"
+
+
+def _load_manifest(manifest_dir: Optional[Path], conversation_id: str) -> Optional[dict]:
+    if manifest_dir is None:
+        return None
+    path = _manifest_path(manifest_dir, conversation_id)
+    if not path.is_file():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print_error_message(f"Ignoring unreadable backup manifest '{path}': {e}")
+        return None
+
+
+def _save_manifest(manifest_dir: Path, manifest: dict):
+    manifest_dir.mkdir(parents=True, exist_ok=True)
+    path = _manifest_path(manifest_dir, manifest["conversation_id"])
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _compression_for(path: Path) -> int:
+    if path.suffix.lower() in STORED_SUFFIXES:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _walk_files(source_path: Path) -> Iterator[Path]:
+    for root, dirs, files in os.walk(source_path):
+        dirs.sort()
+        for name in sorted(files):
+            yield Path(root) / name
+
+
+def iterBackup(
+        source_path: Path,
+        incremental: bool = False,
+        manifest_dir: Optional[Path] = None) -> Iterator[bytes]:
+    """Yields a zip archive of a conversation folder as it is written.
+
+    Every member is stored as '<conversation_id>/<relative path>' and a
+    content-hash manifest is appended last. With incremental=True, files
+    whose content hash matches the previous manifest are left out of the
+    archive and only listed in the manifest; an unchanged size and mtime
+    skips the hashing. The manifest is persisted to
+    manifest_dir once the archive has been fully produced.
+    """
+    source_path = Path(source_path)
+    if not source_path.is_dir():
+        raise FileNotFoundError(source_path)
+
+    conversation_id = source_path.name
+    previous = _load_manifest(manifest_dir, conversation_id) if incremental else None
+    previous_files = previous.get("files", {}) if previous else {}
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "conversation_id": conversation_id,
+        "created_at": datetime.now().isoformat(),
+        "base": previous.get("created_at") if previous else None,
+        "files": {},
+        "included": [],
+    }
+
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, 'w', allowZip64=True) as zf:
+        for file_path in _walk_files(source_path):
+            rel_path = file_path.relative_to(source_path).as_posix()
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+
+            known = previous_files.get(rel_path)
+            if known and known["size"] == stat.st_size and (
+                    known["mtime_ns"] == stat.st_mtime_ns or sha256File(file_path) == known["sha256"]):
+                manifest["files"][rel_path] = dict(known, mtime_ns=stat.st_mtime_ns)
+                continue
+
+            zinfo = zipfile.ZipInfo.from_file(
+                file_path, arcname=f"{conversation_id}/{rel_path}")
+            zinfo.compress_type = _compression_for(file_path)
+
+            digest = hashlib.sha256()
+            size = 0
+            with open(file_path, 'rb') as src, zf.open(zinfo, 'w', force_zip64=True) as dst:
+                while True:
+                    block = src.read(READ_CHUNK_SIZE)
+                    if not block:
+                        break
+                    digest.update(block)
+                    size += len(block)
+                    dst.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+            manifest["files"][rel_path] = {
+                "sha256": digest.hexdigest(),
+                "size": size,
+                "mtime_ns": stat.st_mtime_ns,
+            }
+            manifest["included"].append(rel_path)
+            data = sink.drain()
+            if data:
+                yield data
+
+        zf.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2),
+                    compress_type=zipfile.ZIP_DEFLATED)
+
+    data = sink.drain()
+    if data:
+        yield data
+
+    if manifest_dir is not None:
+        _save_manifest(manifest_dir, manifest)
+
+
+def zipBackup(source_dir: Path, output_dir: str, incremental: bool = False):
 
     try:
         project_root = Path(__file__).parent.parent.parent
@@ -17,19 +190,19 @@ def zipBackup(source_dir: Path, output_dir: str):
         output_path.mkdir(parents=True, exist_ok=True)
 
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-        zip_filename_base = f"chat_backup_{timestamp}"
+        kind = "incremental" if incremental else "backup"
+        archive_path = output_path / f"chat_{kind}_{timestamp}.zip"
 
-        print_info_message(f"Creating zip backup of '{source_path}'...")
+        print_info_message(f"Creating zip {kind} of '{source_path}'...")
 
-        archive_path = shutil.make_archive(
-            base_name=str(output_path / zip_filename_base),
-            format='zip',
-            root_dir=str(source_path)
-        )
+        with open(archive_path, 'wb') as f:
+            for data in iterBackup(source_path, incremental=incremental,
+                                   manifest_dir=output_path / "manifests"):
+                f.write(data)
 
         print_success_message("Backup successfully "
                               f"created at: {archive_path}")
-        return archive_path
+        return str(archive_path)
 
     except FileNotFoundError:
         print_error_message("Error: The source directory "
@@ -1,10 +1,14 @@
 # src/web/ragWeb.py
 from pathlib import Path
 
+from src.core.modelCache import configMtime
 from src.core.ragSystem import ragSystem
+from src.utils.conversation import loadConversation
 from src.libs.messages import print_info_message, print_error_message, print_success_message
+from src.libs.metrics import RESIDENT_SESSIONS
 
 rag_system_state = {}
+RESIDENT_SESSIONS.set_function(lambda: {(): len(rag_system_state)})
 
 def initialize_rag_system(
     conv_id: str,
@@ -33,7 +37,8 @@ def initialize_rag_system(
             "current_memory_path": conv_dir_path,
             "conversation_filename": f"{conv_id}.json",
             "current_conversation_id": conv_id,
-            "current_chat_history": []
+            "config_mtime": configMtime(conv_dir_path),
+            "current_chat_history": loadConversation(conv_dir_path, f"{conv_id}.json")
         }
     except Exception as e:
         print_error_message(f"Error loading conversation '{conv_id}': {e}")
@@ -3,21 +3,33 @@ import os
 import sys
 import json
 import shutil
-import zipfile
+import time
 import yaml
 import glob
 from pathlib import Path
 from langchain.docstore.document import Document
 from werkzeug.utils import secure_filename
-from flask import request, jsonify, render_template, url_for, send_from_directory
+from flask import (request, jsonify, render_template, url_for,
+                   send_from_directory, Response, stream_with_context)
 
 from src.utils.new import newConversation
 from src.utils.conversation import loadConversation, saveConversation
 from src.utils.rename import renameConversationForWeb
 from src.utils.load import loadBackup
+from src.utils.zipBackup import iterBackup
 from src.utils.ingestion import ingestDocuments
 from src.utils.webSearch import webSearch
 from src.webapp.ragweb import initialize_rag_system, rag_system_state
+from src.core.dedup import addUniqueDocuments, runDeduplication, scheduleDeduplication
+from src.core.llamaRuntime import configRuntimeErrors
+from src.core.memoryTiers import llmLock, scheduleMemoryConsolidation, turnMetadata
+from src.core.ragSystem import refreshRagSystem
+from src.core.vectorStores import openVectorStore
+from src.libs.backgroundTasks import waitForBackgroundTasks
+from src.libs.catalog import get_catalog
+from src.libs.historyIndex import get_history_index
+from src.libs.metrics import CHAT_SECONDS, INGEST_SECONDS, get_metrics
+from src.libs.profiling import profiledRequest
 from src.libs.messages import print_error_message, print_info_message
 from src.webapp.plugin import get_plugin_manager, handle_plugin_command
 from src.config import LLM_MODEL, EMB_MODEL
@@ -25,24 +37,18 @@ from src.config import LLM_MODEL, EMB_MODEL
 from src.libs.plugins import PluginManager
 
 
-def _ingest_conversation_turn(user_input, aeon_output, vectorstore, text_splitter, llama_embeddings):
+def _ingest_conversation_turn(user_input, aeon_output, vectorstore, text_splitter, llama_embeddings, turn=None):
     try:
         conversation_text = f"{user_input}\n\n{aeon_output}"
         
         conversation_document = Document(
             page_content=conversation_text,
-            metadata={"source": "Memory"}
+            metadata=turnMetadata(turn)
         )
         
-        docs = text_splitter.split_documents([conversation_document])
-        success, failed = 0, 0
-        for i, chunk in enumerate(docs, start=1):
-            try:
-                vectorstore.add_documents([chunk])
-                success += 1
-            except Exception as e:
-                failed += 1
-                print_error_message(f" Failed on chunk {i}: {e}")
+        with INGEST_SECONDS.time(kind="memory"):
+            docs = text_splitter.split_documents([conversation_document])
+            addUniqueDocuments(vectorstore, docs)
     except Exception as e:
         print_error_message(f"Failed to ingest conversation turn: {e}")
 
@@ -93,6 +99,12 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
 
     @app.route("/chat", methods=["POST"])
     def chat():
+        # ?profile=1 samples this one request into data/output/profiles.
+        with profiledRequest("chat.turn", request.args.get("profile") == "1"):
+            return _chat_turn()
+
+    def _chat_turn():
+        started = time.perf_counter()
         data = request.get_json()
         user_input = data.get("message", "").strip()
         conv_id = data.get("conversation_id")
@@ -128,7 +140,10 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
             if is_plugin:
                 return jsonify({"response": plugin_response, "source": plugin_source, "conversation_id": conv_id})
 
-            response = current_rag["rag_chain"].invoke(user_input)
+            refreshRagSystem(current_rag)
+            with llmLock(current_rag.get("llm_instance")):
+                response = current_rag["rag_chain"].invoke(
+                    {"question": user_input, "history": current_rag["current_chat_history"]})
 
             answer = response.get("answer", "No answer found.")
             context_docs = response.get("context", [])
@@ -149,7 +164,7 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
 
             final_answer = f"{answer}"
             source_answer = f"{formatted_sources}"
-            saveConversation(
+            turn = saveConversation(
                 user_input,
                 final_answer,
                 source_answer,
@@ -161,8 +176,17 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
                 final_answer,
                 current_rag["vectorstore"],
                 current_rag["text_splitter"],
-                current_rag["llama_embeddings"]
+                current_rag["llama_embeddings"],
+                turn
             )
+            current_rag["current_chat_history"].append(
+                {"user": user_input, "aeon": final_answer, "source": source_answer})
+            scheduleDeduplication(current_rag["vectorstore"],
+                                  Path(current_rag["current_memory_path"]) / "db")
+            scheduleMemoryConsolidation(current_rag["vectorstore"],
+                                        current_rag.get("llm_instance"),
+                                        current_rag["current_memory_path"])
+            CHAT_SECONDS.observe(time.perf_counter() - started)
 
             return jsonify({"response": final_answer, "source": source_answer, "conversation_id": conv_id})
         
@@ -185,12 +209,66 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
 
     @app.route('/conversations', methods=["GET"])
     def list_conversations_route():
-        conversation_dirs = [d.name for d in abs_memory_dir.iterdir(
-        ) if d.is_dir() and not d.name.startswith('.')]
-        conversations = [{"id": conv_id, "name": conv_id}
-                         for conv_id in sorted(conversation_dirs, reverse=True)]
+        sort = request.args.get('sort', 'updated')
+        descending = request.args.get('order', 'desc') != 'asc'
+        limit = request.args.get('limit', type=int)
+        offset = request.args.get('offset', 0, type=int)
+        conversations = [
+            {
+                "id": conv["id"],
+                "name": conv["title"],
+                "created_at": conv["created_at"],
+                "updated_at": conv["updated_at"],
+                "turn_count": conv["turn_count"],
+                "store_size": conv["store_size"],
+                "llm_model": conv["llm_model"],
+                "emb_model": conv["emb_model"],
+            }
+            for conv in get_catalog().list(sort=sort, descending=descending,
+                                           limit=limit, offset=offset)
+        ]
         return jsonify(conversations)
 
+    @app.route('/api/history/search', methods=["GET"])
+    def search_history_route():
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"message": "Missing search query."}), 400
+        page = request.args.get('page', 1, type=int)
+        page_size = request.args.get('page_size', 10, type=int)
+        try:
+            return jsonify(get_history_index().search(query, page, page_size))
+        except Exception as e:
+            return jsonify({"message": f"History search failed: {e}"}), 500
+
+    @app.route('/api/history/rebuild', methods=["POST"])
+    def rebuild_history_route():
+        try:
+            total = get_history_index().rebuild()
+            return jsonify({"message": "History index rebuilt.", "turns": total}), 200
+        except Exception as e:
+            return jsonify({"message": f"Failed to rebuild history index: {e}"}), 500
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics_route():
+        return Response(get_metrics().render(), mimetype="text/plain; version=0.0.4")
+
+    @app.route('/api/dedup/<string:conv_id>', methods=["POST"])
+    def dedup_conversation_route(conv_id):
+        db_path = abs_memory_dir / conv_id / "db"
+        if not db_path.is_dir():
+            return jsonify({"message": "Conversation not found."}), 404
+        try:
+            # A full pass needs no embedding model, so idle chats are not loaded.
+            current_rag = rag_system_state.get(conv_id)
+            vectorstore = current_rag["vectorstore"] if current_rag else openVectorStore(db_path, None)
+            report = runDeduplication(vectorstore, db_path)
+        except Exception as e:
+            return jsonify({"message": f"Deduplication failed: {e}"}), 500
+        if report is None:
+            return jsonify({"message": "Deduplication is already running."}), 409
+        return jsonify({"message": "Deduplication finished.", "report": report}), 200
+
     @app.route('/conversation/<string:conv_id>', methods=["GET"])
     def get_conversation_history(conv_id):
         conv_dir = abs_memory_dir / conv_id
@@ -214,7 +292,11 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
             return jsonify({"message": "Conversation not found."}), 404
 
         try:
+            waitForBackgroundTasks(conv_dir_path / "db")
             shutil.rmtree(conv_dir_path)
+            get_catalog().remove(conv_id)
+            get_history_index().remove_conversation(conv_id)
+            rag_system_state.pop(conv_id, None)
             return jsonify({"message": "Conversation deleted successfully."}), 200
         except Exception as e:
             return jsonify({"message": f"Failed to delete conversation: {e}"}), 500
@@ -271,23 +353,47 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
         if not conv_dir_path.is_dir():
             return jsonify({"message": "Conversation not found."}), 404
 
-        zip_filename = f"{conv_id}_web_backup.zip"
-        zip_path = backup_dir / zip_filename
+        incremental = request.args.get('incremental', '0') == '1'
+        download_url = url_for(
+            "stream_backup_route", conv_id=conv_id,
+            incremental=int(incremental))
+        return jsonify({"message": "Backup ready.", "download_url": download_url}), 200
 
-        try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, _, files in os.walk(conv_dir_path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(
-                            file_path, conv_dir_path.parent)
-                        zipf.write(file_path, arcname)
+    @app.route('/stream_backup/<string:conv_id>')
+    def stream_backup_route(conv_id):
+        conv_dir_path = abs_memory_dir / conv_id
+        if not conv_dir_path.is_dir():
+            return jsonify({"message": "Conversation not found."}), 404
 
-            return jsonify({"message": "Backup created.", "zip_file": zip_filename}), 200
+        incremental = request.args.get('incremental', '0') == '1'
+        kind = "incremental" if incremental else "web_backup"
+        zip_filename = f"{conv_id}_{kind}.zip"
 
+        try:
+            stream = iterBackup(
+                conv_dir_path,
+                incremental=incremental,
+                manifest_dir=backup_dir / "manifests")
+            # Errors before the first bytes still get a JSON 500.
+            first = next(stream, b"")
         except Exception as e:
             return jsonify({"message": f"Failed to create backup: {e}"}), 500
 
+        def _stream():
+            try:
+                yield first
+                yield from stream
+            except Exception as e:
+                # Headers are sent; dropping the connection mid-body is the
+                # only way left to tell the client the download failed.
+                print_error_message(f"Backup of '{conv_id}' failed while streaming: {e}")
+                raise
+
+        return Response(
+            stream_with_context(_stream()),
+            mimetype="application/zip",
+            headers={"Content-Disposition": f"attachment; filename={zip_filename}"})
+
     @app.route('/download_backup/<path:filename>')
     def download_backup_route(filename):
         file_path = backup_dir / filename
@@ -349,10 +455,18 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
         config_path = abs_memory_dir / conv_id / 'config.yml'
 
         try:
-            yaml.safe_load(config_content)
+            runtime_errors = configRuntimeErrors(yaml.safe_load(config_content))
+            if runtime_errors:
+                return jsonify({"message": "Invalid runtime settings: " + " ".join(runtime_errors)}), 400
             with open(config_path, 'w', encoding='utf-8') as f:
                 f.write(config_content)
+            get_catalog().refresh(conv_id)
 
+            if conv_id in rag_system_state:
+                applied = refreshRagSystem(rag_system_state[conv_id])
+                message = ("Configuration saved and applied." if applied else
+                           "Configuration saved, but it could not be applied to the loaded conversation.")
+                return jsonify({"message": message, "applied": applied})
             return jsonify({"message": "Configuration saved successfully."})
         except yaml.YAMLError as e:
             return jsonify({"message": f"Invalid YAML content: {e}"}), 400
@@ -451,6 +565,8 @@ def init_routes(app, abs_output_dir, abs_memory_dir):
                 current_rag["current_memory_path"],
                 current_rag["conversation_filename"]
             )
+            current_rag["current_chat_history"].append(
+                {"user": f"/search {search_term}", "aeon": summary, "source": sources})
 
             return jsonify({'response': summary, 'source':sources})
 
@@ -0,0 +1,79 @@
+import sqlite3
+import zlib
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from src.core import memoryTiers
+from src.core.dedup import addUniqueDocuments, contentId
+from src.core.memoryTiers import consolidateMemory, turnGuids, turnMetadata
+from src.core.mmapStore import MmapVectorStore
+
+
+class FakeEmbeddings:
+    """Deterministic unit vectors keyed by text."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        vector = np.random.default_rng(zlib.crc32(text.encode())).normal(size=16)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+@pytest.fixture
+def conversation(tmp_path, monkeypatch):
+    db_path = tmp_path / "db"
+    db_path.mkdir()
+    with sqlite3.connect(db_path / memoryTiers.CHAT_DB_NAME) as conn:
+        conn.execute("CREATE TABLE conversations (GUID TEXT PRIMARY KEY, USER TEXT, AEON TEXT, "
+                     "CHAT_ID TEXT, SOURCE TEXT, TIMESTAMP TEXT)")
+    monkeypatch.setattr(memoryTiers, "MEMORY_CONFIG",
+                        {"keep_recent_turns": 1, "batch_turns": 1, "max_age_days": 0})
+    monkeypatch.setattr(memoryTiers, "_summarize", lambda llm, excerpt: "summary")
+    store = MmapVectorStore(str(db_path / "vectors"), FakeEmbeddings(), background=False)
+    return tmp_path, store
+
+
+def _say(conv_path, store, guid, timestamp, text):
+    turn = {"guid": guid, "timestamp": timestamp}
+    with sqlite3.connect(conv_path / "db" / memoryTiers.CHAT_DB_NAME) as conn:
+        conn.execute("INSERT INTO conversations (GUID, USER, AEON, TIMESTAMP) VALUES (?, ?, '', ?)",
+                     (guid, text, timestamp))
+    addUniqueDocuments(store, [Document(page_content=text, metadata=turnMetadata(turn))])
+
+
+def test_duplicate_chunk_records_every_turn(conversation):
+    conv_path, store = conversation
+    _say(conv_path, store, "old", "2024-01-01T00:00:00", "the meeting is on friday")
+    _say(conv_path, store, "new", "2024-01-02T00:00:00", "the meeting is on friday")
+
+    found = store.get(ids=[contentId("the meeting is on friday")], include=["metadatas"])
+    assert turnGuids(found["metadatas"][0]) == {"old", "new"}
+
+
+def test_consolidation_keeps_chunk_shared_with_recent_turn(conversation):
+    conv_path, store = conversation
+    chunk_id = contentId("the meeting is on friday")
+    _say(conv_path, store, "old", "2024-01-01T00:00:00", "the meeting is on friday")
+    _say(conv_path, store, "new", "2024-01-02T00:00:00", "the meeting is on friday")
+
+    assert consolidateMemory(store, None, conv_path) == 1
+    found = store.get(ids=[chunk_id], include=["metadatas"])
+    assert found["ids"] == [chunk_id]
+    assert turnGuids(found["metadatas"][0]) == {"new"}
+
+    _say(conv_path, store, "later", "2024-01-03T00:00:00", "something else entirely")
+    assert consolidateMemory(store, None, conv_path) == 1
+    assert store.get(ids=[chunk_id])["ids"] == []
+
+
+def test_consolidation_deletes_unshared_chunks(conversation):
+    conv_path, store = conversation
+    _say(conv_path, store, "old", "2024-01-01T00:00:00", "only said once")
+    _say(conv_path, store, "new", "2024-01-02T00:00:00", "said later")
+
+    assert consolidateMemory(store, None, conv_path) == 1
+    assert store.get(ids=[contentId("only said once")])["ids"] == []
+    assert store.get(ids=[contentId("said later")])["ids"] == [contentId("said later")]
@@ -407,8 +407,8 @@ function zipConversation(convId) {
     fetch(`/zip_backup/${convId}`)
         .then(response => response.json())
         .then(data => {
-            if (data.zip_file) {
-                const downloadUrl = `/download_backup/${data.zip_file}`;
+            if (data.download_url) {
+                const downloadUrl = data.download_url;
                 const messageBox = document.createElement('div');
                 messageBox.className = 'info-message-box';
                 messageBox.innerHTML = `Backup created successfully. <a href="${downloadUrl}" class="download-backup" download>Click to download.</a>`;